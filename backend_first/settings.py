@@ -101,19 +101,50 @@ DATABASES['default'].update(db_from_env)
 if DEBUG:
     REST_FRAMEWORK = {
         'DEFAULT_AUTHENTICATION_CLASSES': (
-            'rest_framework_simplejwt.authentication.JWTAuthentication',
+            'user.authentication.ClaimsJWTAuthentication',
         )
     }
 else:
     REST_FRAMEWORK = {
         'DEFAULT_AUTHENTICATION_CLASSES': (
-            'rest_framework_simplejwt.authentication.JWTAuthentication',
+            'user.authentication.ClaimsJWTAuthentication',
         ),
         'DEFAULT_PARSER_CLASSES': [
             'rest_framework.parsers.JSONParser',
         ]
     }
 
+# Password hashing - PASSWORD_HASHER_PROFILE hashes new passwords, the other
+# profiles only verify old hashes, which are rehashed on login. Check the cost
+# with `manage.py benchmark_hashers`, argon2 needs the argon2-cffi package.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'user.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'user.hashers.TunedScryptPasswordHasher',
+    'argon2': 'user.hashers.TunedArgon2PasswordHasher',
+}
+PASSWORD_HASHER_PARAMS = {
+    'pbkdf2': {'iterations': int(os.environ.get('PBKDF2_ITERATIONS', 320000))},
+    'scrypt': {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 1},
+    'argon2': {'time_cost': 2, 'memory_cost': 19456, 'parallelism': 1},
+}
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher for profile, hasher in PASSWORD_HASHER_PROFILES.items() if profile != PASSWORD_HASHER_PROFILE
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# hashing in a pool of processes, one pool of WORKERS per web process - requests
+# get 503 when MAX_PENDING hashes of their process are already running or queued.
+# Enabling it also switches gunicorn to threaded workers, see gunicorn.conf.py
+PASSWORD_HASHING_POOL = {
+    'ENABLED': os.environ.get('PASSWORD_HASHING_POOL', False) == 'True',
+    'WORKERS': int(os.environ.get('PASSWORD_HASHING_WORKERS', 2)),
+    'MAX_PENDING': 8,
+    'TIMEOUT': 10.0,
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -165,6 +196,15 @@ EMAIL_PORT = 587
 EMAIL_HOST_USER = 'camille14109@gmail.com'
 EMAIL_HOST_PASSWORD = os.environ['EMAIL_PASSWORD']
 
+# emails are queued and sent by the send_queued_emails worker, retries wait
+# RETRY_BACKOFF seconds, doubled after every failed attempt
+EMAIL_OUTBOX = {
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 60,
+    'LEASE': 300,
+}
+
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
@@ -196,6 +236,23 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+
+# users of tokens without username/is_active claims, see user.authentication
+AUTH_USER_CACHE = {
+    'MAX_SIZE': 10000,
+    'TIMEOUT': 60,
+}
+
+# bloom filter in front of the refresh token blacklist, see user.blacklist -
+# CACHE_ALIAS must be a cache shared by all processes (see REDIS_URL)
+TOKEN_BLACKLIST_FILTER = {
+    'ENABLED': os.environ.get('TOKEN_BLACKLIST_FILTER', False) == 'True',
+    'CACHE_ALIAS': os.environ.get('TOKEN_BLACKLIST_FILTER_CACHE'),
+    'SIZE': 2 ** 23,
+    'HASHES': 7,
+    'REBUILD_INTERVAL': 3600,
+}
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
@@ -205,6 +262,51 @@ CORS_ALLOWED_ORIGINS = [
 
 FRONT_END = 'https://sharp-toothed-tiger.herokuapp.com/'
 
+# with REDIS_URL the cache is shared by all processes, otherwise every process
+# has its own one - caches invalidated by signals work only with a shared one
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# serialized profiles of active users, ALIAS must point to a cache shared by all processes
+USER_PROFILE_CACHE = {
+    'ENABLED': bool(REDIS_URL),
+    'ALIAS': 'default',
+    'TIMEOUT': 60 * 60,
+}
+
+# serialized post trees, ALIAS must point to a cache shared by all processes
+POST_DETAIL_CACHE = {
+    'ENABLED': bool(REDIS_URL),
+    'ALIAS': 'default',
+    'TIMEOUT': 60 * 60,
+}
+
+# BUFFERED coalesces engagement increments in memory and writes them
+# every FLUSH_INTERVAL seconds instead of one UPDATE per comment/reply
+ENGAGEMENT_COUNTER = {
+    'BUFFERED': os.environ.get('ENGAGEMENT_COUNTER_BUFFERED', False) == 'True',
+    'SHARDS': 16,
+    'FLUSH_INTERVAL': 2.0,
+}
+
+# engagement in the hot feed loses half of its weight every HALF_LIFE seconds,
+# changing it needs the rebuild_hot_scores command
+HOT_FEED = {
+    'HALF_LIFE': 12 * 60 * 60,
+}
+
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
     SECURE_HSTS_SECONDS = 2592000
@@ -0,0 +1,7 @@
+import os
+
+# with the password hashing pool a request thread waits while its password is
+# hashed in another process, threaded workers keep serving other requests
+if os.environ.get('PASSWORD_HASHING_POOL', False) == 'True':
+    worker_class = 'gthread'
+    threads = int(os.environ.get('PASSWORD_HASHING_THREADS', 4))
@@ -2,4 +2,13 @@ from django.contrib import admin
 from .models import Post
 
 
-admin.site.register(Post)
+@admin.register(Post)
+class PostAdmin(admin.ModelAdmin):
+    # kept up to date with F() updates, the admin would write back the values it loaded
+    readonly_fields = ('comment_count', 'engagement_rate', 'hot_score')
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            obj.save(update_fields=form.changed_data)
+        else:
+            super().save_model(request, obj, form, change)
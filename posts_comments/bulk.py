@@ -0,0 +1,108 @@
+"""
+Bulk creation of comments and replies for importers and bots. Items are
+validated one by one with the create serializers, valid ones are inserted
+with one bulk_create and the counters their signals would update are
+increased per post/comment in aggregated UPDATEs.
+Results come back in the order of the items - the serialized comment/reply
+or {'errors': {...}} for an invalid item.
+"""
+from collections import Counter
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Post, Comment, Reply
+from .serializers import CommentCreateUpdateSerializer, ReplyCreateUpdateSerializer
+from .engagement import get_engagement_counter
+from .cache import post_detail_cache
+
+
+def get_item_id(item, name):
+    try:
+        return int(item[name])
+    except (TypeError, KeyError, ValueError):
+        return None
+
+
+def validate_items(items, serializer_class, parent_name, parents, missing_message):
+    """
+    Returns the results list with errors of invalid items filled in
+    and (index, parent id, validated data) of the valid ones
+    """
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        errors = {} if serializer.is_valid() else dict(serializer.errors)
+        parent_id = get_item_id(item, parent_name)
+        if parent_id not in parents:
+            errors[parent_name] = [missing_message]
+        if errors:
+            results[index] = {'errors': errors}
+        else:
+            valid.append((index, parent_id, serializer.validated_data))
+    return results, valid
+
+
+def increment(model, field, amounts):
+    """
+    Applies a {pk: amount} mapping to `field`, one UPDATE per distinct amount
+    """
+    pks_by_amount = {}
+    for pk, amount in amounts.items():
+        pks_by_amount.setdefault(amount, []).append(pk)
+    for amount, pks in pks_by_amount.items():
+        model.objects.filter(pk__in=pks).update(**{field: F(field) + amount})
+
+
+def fill_results(results, valid, serializer_class, objects):
+    for (index, _, _), data in zip(valid, serializer_class(objects, many=True).data):
+        results[index] = data
+    return results
+
+
+def invalidate_after_commit(post_ids):
+    # invalidating before the commit would let a concurrent retrieve cache
+    # the old tree under the new generation
+    transaction.on_commit(lambda: post_detail_cache.invalidate_many(post_ids))
+
+
+@transaction.atomic
+def bulk_add_comments(user, items):
+    """
+    Adds comments to many posts, items are {'post': id, 'text': ...}
+    """
+    post_ids = {get_item_id(item, 'post') for item in items}
+    authors = dict(Post.objects.visible().filter(pk__in=post_ids - {None}).values_list('id', 'user_id'))
+    results, valid = validate_items(items, CommentCreateUpdateSerializer, 'post', authors,
+                                    "This post doesn't exist")
+    now = timezone.now()
+    comments = Comment.objects.bulk_create([
+        Comment(user=user, post_id=post_id, time=now, **data) for _, post_id, data in valid
+    ])
+    increment(Post, 'comment_count', Counter(comment.post_id for comment in comments))
+    get_engagement_counter().increment_many(
+        Counter(comment.post_id for comment in comments if authors[comment.post_id] != user.id))
+    invalidate_after_commit({comment.post_id for comment in comments})
+    return fill_results(results, valid, CommentCreateUpdateSerializer, comments)
+
+
+@transaction.atomic
+def bulk_add_replies(user, items):
+    """
+    Adds replies to many comments, items are {'comment': id, 'text': ...}
+    """
+    comment_ids = {get_item_id(item, 'comment') for item in items}
+    posts = {comment_id: (post_id, author_id) for comment_id, post_id, author_id in
+             Comment.objects.filter(pk__in=comment_ids - {None}, post__is_deleted=False)
+             .values_list('id', 'post_id', 'post__user_id')}
+    results, valid = validate_items(items, ReplyCreateUpdateSerializer, 'comment', posts,
+                                    "This comment doesn't exist")
+    now = timezone.now()
+    replies = Reply.objects.bulk_create([
+        Reply(user=user, comment_id=comment_id, time=now, **data) for _, comment_id, data in valid
+    ])
+    increment(Comment, 'reply_count', Counter(reply.comment_id for reply in replies))
+    get_engagement_counter().increment_many(
+        Counter(posts[reply.comment_id][0] for reply in replies if posts[reply.comment_id][1] != user.id))
+    invalidate_after_commit({posts[reply.comment_id][0] for reply in replies})
+    return fill_results(results, valid, ReplyCreateUpdateSerializer, replies)
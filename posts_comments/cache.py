@@ -0,0 +1,68 @@
+from uuid import uuid4
+from django.conf import settings
+from django.core.cache import caches
+
+
+class PostDetailCache:
+    """
+    Read-through cache of the serialized tree of a post with its comments
+    and replies, stored in one of the caches from the CACHES setting.
+    The tree holds raw timestamps, `time_since_posted` is calculated when
+    a response is built. Entries are invalidated by the signals of Post,
+    Comment, Reply and MyUser, so the cache has to be shared by all processes
+    - it's used only with POST_DETAIL_CACHE['ENABLED'].
+    Every invalidation gives the post a new generation and trees are stored
+    with the generation read before the db, so a tree read before an
+    invalidation and stored after it is never served.
+    """
+    key_prefix = 'post-detail'
+
+    @property
+    def config(self):
+        return settings.POST_DETAIL_CACHE
+
+    @property
+    def enabled(self):
+        return self.config.get('ENABLED', False)
+
+    @property
+    def cache(self):
+        return caches[self.config['ALIAS']]
+
+    def key(self, post_id):
+        return f'{self.key_prefix}:{post_id}'
+
+    def generation_key(self, post_id):
+        return f'{self.key_prefix}-generation:{post_id}'
+
+    def get(self, post_id):
+        """
+        Returns the cached tree (None if there isn't a current one) and
+        the generation of the post, which has to be passed to set
+        """
+        if not self.enabled:
+            return None, None
+        values = self.cache.get_many([self.key(post_id), self.generation_key(post_id)])
+        generation = values.get(self.generation_key(post_id))
+        entry = values.get(self.key(post_id))
+        if entry is None or entry[0] != generation:
+            return None, generation
+        return entry[1], generation
+
+    def set(self, post_id, payload, generation):
+        if self.enabled:
+            self.cache.set(self.key(post_id), (generation, payload), self.config['TIMEOUT'])
+
+    def invalidate(self, post_id):
+        self.invalidate_many([post_id])
+
+    def invalidate_many(self, post_ids):
+        if not self.enabled or not post_ids:
+            return
+        # generations outlive the trees which may have been stored with the previous one
+        self.cache.set_many({self.generation_key(post_id): uuid4().hex for post_id in post_ids},
+                            self.config['TIMEOUT'] * 2)
+        self.cache.delete_many([self.key(post_id) for post_id in post_ids])
+
+
+post_detail_cache = PostDetailCache()
@@ -0,0 +1,24 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount_related(model, related_model, fk_name, field, batch_size=1000):
+    """
+    Sets `field` of every `model` row to the number of `related_model` rows
+    pointing at it through `fk_name`, going through the table in batches of
+    primary keys. Returns the number of rows whose counter had drifted.
+    """
+    actual_count = related_model.objects.filter(**{fk_name: OuterRef('pk')}).order_by()\
+        .values(fk_name).annotate(count=Count('pk')).values('count')
+    fixed = 0
+    last_pk = 0
+    while True:
+        pks = list(model.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return fixed
+        drifted = list(model.objects.filter(pk__in=pks).annotate(actual=Coalesce(Subquery(actual_count), 0))
+                       .exclude(**{field: F('actual')}).values_list('pk', 'actual'))
+        for pk, actual in drifted:
+            model.objects.filter(pk=pk).update(**{field: actual})
+        fixed += len(drifted)
+        last_pk = pks[-1]
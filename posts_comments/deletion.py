@@ -0,0 +1,95 @@
+"""
+Set-based deletion of posts with their comments and replies. Django's
+collector would load every comment and reply of a thread (both models have
+signal receivers, so it can't fast-delete) and send post_delete for each
+of them. Here rows are deleted with plain DELETEs and receivers of
+`post_trees_deleted` are notified once per batch instead.
+Views only flag posts as deleted, PostReaper removes them in the background.
+"""
+import time
+from django.db import router, transaction
+from django.dispatch import Signal
+from .models import Post, Comment, Reply
+
+# sent with `post_ids` of the deleted posts, once the DELETEs are committed
+post_trees_deleted = Signal()
+
+
+def raw_delete(queryset):
+    # QuerySet.delete() would go through the collector
+    return queryset._raw_delete(router.db_for_write(queryset.model))
+
+
+@transaction.atomic
+def delete_post_trees(post_ids):
+    """
+    Deletes the given posts with their comments and replies, one DELETE
+    per table. Returns the number of deleted posts.
+    """
+    posts = Post.objects.filter(pk__in=post_ids)
+    post_ids_query = posts.values('id')
+    raw_delete(Reply.objects.filter(comment__post_id__in=post_ids_query))
+    raw_delete(Comment.objects.filter(post_id__in=post_ids_query))
+    deleted = raw_delete(posts)
+    if deleted:
+        post_ids = list(post_ids)
+        transaction.on_commit(lambda: post_trees_deleted.send(sender=Post, post_ids=post_ids))
+    return deleted
+
+
+class PostReaper:
+    """
+    Deletes posts flagged with is_deleted - first their replies, then their
+    comments, at most `batch_size` rows per transaction, and finally the post
+    together with anything added to the thread in the meantime.
+    `progress` is called with (post_id, deleted comments, deleted replies)
+    after every batch.
+    """
+    def __init__(self, batch_size=1000, sleep=0.0, progress=None):
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.progress = progress
+
+    def reap_all(self):
+        """
+        Deletes all flagged posts, returns the numbers of deleted posts,
+        comments and replies
+        """
+        posts = comments = replies = 0
+        for post_id in Post.objects.filter(is_deleted=True).order_by('id').values_list('id', flat=True):
+            post_comments, post_replies = self.reap(post_id)
+            posts += 1
+            comments += post_comments
+            replies += post_replies
+        return posts, comments, replies
+
+    def reap(self, post_id):
+        comments = replies = 0
+        while True:
+            deleted = self.delete_batch(Reply.objects.filter(comment__post_id=post_id))
+            replies += deleted
+            if deleted < self.batch_size:
+                break
+            self.report(post_id, comments, replies)
+        while True:
+            deleted = self.delete_batch(Comment.objects.filter(post_id=post_id))
+            comments += deleted
+            if deleted < self.batch_size:
+                break
+            self.report(post_id, comments, replies)
+        delete_post_trees([post_id])
+        self.report(post_id, comments, replies)
+        return comments, replies
+
+    def delete_batch(self, queryset):
+        ids = list(queryset.order_by('id').values_list('id', flat=True)[:self.batch_size])
+        if ids:
+            with transaction.atomic():
+                raw_delete(queryset.model.objects.filter(id__in=ids))
+            if self.sleep:
+                time.sleep(self.sleep)
+        return len(ids)
+
+    def report(self, post_id, comments, replies):
+        if self.progress is not None:
+            self.progress(post_id, comments, replies)
@@ -0,0 +1,113 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from .models import Post
+from .hot import get_hot_score_increment
+
+logger = logging.getLogger(__name__)
+
+
+class EngagementCounter:
+    """
+    Increases engagement rate of posts with atomic UPDATE statements
+    which touch only the engagement_rate and hot_score columns
+    """
+    def increment(self, post_id, amount=1):
+        self.increment_many({post_id: amount})
+
+    def increment_many(self, amounts):
+        """
+        Applies a {post_id: amount} mapping, one UPDATE per distinct amount
+        """
+        post_ids_by_amount = {}
+        for post_id, amount in amounts.items():
+            if amount:
+                post_ids_by_amount.setdefault(amount, []).append(post_id)
+        for amount, post_ids in post_ids_by_amount.items():
+            Post.objects.filter(pk__in=post_ids).update(engagement_rate=F('engagement_rate') + amount,
+                                                        hot_score=F('hot_score') + get_hot_score_increment(amount))
+
+    def flush(self):
+        pass
+
+
+class BufferedEngagementCounter(EngagementCounter):
+    """
+    Coalesces bursts of increments in memory and writes them periodically,
+    in one UPDATE per post. Pending increments are spread over lock-striped
+    shards so concurrent requests rarely wait for each other.
+    Increments that haven't been flushed yet are lost if the process is killed.
+    """
+    def __init__(self, shards=16, flush_interval=2.0):
+        self.shards = [({}, threading.Lock()) for _ in range(shards)]
+        self.flush_interval = flush_interval
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._flusher_pid = None
+
+    def increment_many(self, amounts):
+        self._ensure_flusher()
+        self._buffer(amounts)
+
+    def flush(self):
+        with self._flush_lock:
+            amounts = {}
+            for pending, lock in self.shards:
+                with lock:
+                    amounts.update(pending)
+                    pending.clear()
+            try:
+                super().increment_many(amounts)
+            except Exception:
+                # putting the increments back, the next flush will retry them
+                self._buffer(amounts)
+                raise
+
+    def _buffer(self, amounts):
+        for post_id, amount in amounts.items():
+            pending, lock = self.shards[post_id % len(self.shards)]
+            with lock:
+                pending[post_id] = pending.get(post_id, 0) + amount
+
+    def _ensure_flusher(self):
+        # the flusher is started lazily so that forked workers get their own
+        if self._flusher_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            threading.Thread(target=self._run_flusher, daemon=True).start()
+            atexit.register(self.flush)
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Flushing engagement increments failed')
+
+
+_counter = None
+
+
+def get_engagement_counter():
+    """
+    Returns the counter configured with the ENGAGEMENT_COUNTER setting
+    """
+    global _counter
+    if _counter is None:
+        config = getattr(settings, 'ENGAGEMENT_COUNTER', {})
+        if config.get('BUFFERED', False):
+            _counter = BufferedEngagementCounter(shards=config.get('SHARDS', 16),
+                                                 flush_interval=config.get('FLUSH_INTERVAL', 2.0))
+        else:
+            _counter = EngagementCounter()
+    return _counter
@@ -0,0 +1,89 @@
+"""
+Serialization of the hot read endpoints straight from `.values()` rows,
+without going through DRF's field machinery for every object. Each function
+mirrors one of the serializers from serializers.py and must produce exactly
+the same output (the same keys in the same order), so that the rendered JSON
+is byte-identical.
+Row functions get `time_since_posted` already calculated - serialize_rows and
+serialize_post_tree humanize all timestamps of a response in one batch.
+Passing `current=None` to them leaves raw timestamps in `time_since_posted`,
+for payloads which are cached and rendered later with render_time_since_posted.
+"""
+from .serializers import TimeSincePostedCalculator
+
+POST_LIST_FIELDS = ('id', 'text', 'user_id', 'user__username', 'time', 'engagement_rate', 'comment_count')
+POST_TREE_FIELDS = ('id', 'text', 'user_id', 'user__username', 'time')
+COMMENT_FIELDS = ('id', 'post_id', 'text', 'user_id', 'user__username', 'time')
+REPLY_FIELDS = ('id', 'comment_id', 'text', 'user_id', 'user__username', 'time')
+
+
+def times_since_posted(rows, current):
+    times = [row['time'] for row in rows]
+    if current is None:
+        return times
+    return TimeSincePostedCalculator.calculate_strings(times, current)
+
+
+def serialize_user(row):
+    """BasicInfoUserSerializer"""
+    return {'username': row['user__username'], 'id': row['user_id']}
+
+
+def serialize_post_row(row, time_since_posted):
+    """PostListSerializer"""
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'user': serialize_user(row),
+        'time_since_posted': time_since_posted,
+        'engagement_rate': row['engagement_rate'],
+        'comment_count': row['comment_count'],
+    }
+
+
+def serialize_reply_row(row, time_since_posted):
+    """ReplyListSerializer"""
+    return {
+        'id': row['id'],
+        'user': serialize_user(row),
+        'text': row['text'],
+        'time_since_posted': time_since_posted,
+    }
+
+
+def serialize_comment_row(row, time_since_posted):
+    """CommentListSerializer, without replies"""
+    return {
+        'id': row['id'],
+        'user': serialize_user(row),
+        'text': row['text'],
+        'time_since_posted': time_since_posted,
+        'replies': [],
+    }
+
+
+def serialize_rows(serialize_row, rows, current):
+    """
+    Serializes many rows with one of the row functions
+    """
+    rows = list(rows)
+    return [serialize_row(row, time) for row, time in zip(rows, times_since_posted(rows, current))]
+
+
+def serialize_post_tree(post_row, comment_rows, reply_rows, current):
+    """
+    PostRetrieveSerializer - a post with all comments (CommentListSerializer)
+    and their replies. Rows are expected in the order of the models.
+    """
+    comment_rows = list(comment_rows)
+    comments = serialize_rows(serialize_comment_row, comment_rows, current)
+    comments_by_id = {row['id']: comment for row, comment in zip(comment_rows, comments)}
+    reply_rows = list(reply_rows)
+    for row, reply in zip(reply_rows, serialize_rows(serialize_reply_row, reply_rows, current)):
+        comments_by_id[row['comment_id']]['replies'].append(reply)
+    return {
+        'user': serialize_user(post_row),
+        'text': post_row['text'],
+        'time_since_posted': times_since_posted([post_row], current)[0],
+        'comments': comments,
+    }
@@ -0,0 +1,50 @@
+"""
+Score of the "hot" feed - engagement decayed exponentially with the age of
+a post, (engagement_rate + 1) * 2 ** (-age / HALF_LIFE). All posts decay at
+the same pace, so the order is kept by the logarithm of the score taken
+against a fixed epoch instead of the current time:
+
+    ln(engagement_rate + 1) + (time - EPOCH) * ln(2) / HALF_LIFE
+
+It doesn't change as time passes, only with engagement, so it's stored in
+Post.hot_score and the feed is read from an index on it.
+"""
+import math
+from datetime import datetime, timezone
+from django.conf import settings
+from django.db.models import F, Case, When, Value, FloatField
+from django.db.models.functions import Ln
+from .models import Post
+
+EPOCH = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+
+def get_decay_rate():
+    return math.log(2) / settings.HOT_FEED['HALF_LIFE']
+
+
+def get_time_term(time):
+    return (time - EPOCH).total_seconds() * get_decay_rate()
+
+
+def calculate_hot_score(engagement_rate, time):
+    return math.log(engagement_rate + 1) + get_time_term(time)
+
+
+def get_hot_score_increment(amount):
+    """
+    Expression for the change of hot_score in an UPDATE which increases
+    engagement_rate by `amount` - it sees the old engagement_rate
+    """
+    return Ln(F('engagement_rate') + amount + 1) - Ln(F('engagement_rate') + 1)
+
+
+def rebuild_hot_scores(posts):
+    """
+    Recalculates hot_score of the given posts (with `id` and `time` loaded)
+    in one UPDATE, from their engagement_rate at the time of the UPDATE
+    """
+    time_terms = Case(*[When(pk=post.id, then=Value(get_time_term(post.time))) for post in posts],
+                      output_field=FloatField())
+    return Post.objects.filter(pk__in=[post.id for post in posts]) \
+        .update(hot_score=Ln(F('engagement_rate') + 1) + time_terms)
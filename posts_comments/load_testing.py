@@ -0,0 +1,199 @@
+"""
+Load testing of the posts and user APIs. LoadTest drives a mix of requests
+through one of the clients - InProcessClient calls the views through Django's
+test client (and can count queries and allocations), HttpClient talks to
+a running server - and summarizes latencies of every scenario.
+"""
+import json
+import math
+import random
+import time
+import tracemalloc
+from contextlib import nullcontext
+from urllib import request as urllib_request
+from urllib.error import HTTPError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from .seeding import power_law_weights
+
+SCENARIOS = ('list', 'retrieve', 'basic', 'add_comment', 'add_reply', 'token_obtain', 'token_refresh')
+LATENCY_KEYS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+
+def percentile(values, percent):
+    """
+    Nearest-rank percentile, None for no values
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percent / 100 * len(ordered)), 1) - 1]
+
+
+class InProcessClient:
+    """
+    Calls the views in this process, in the current db transaction
+    """
+    counts_queries = True
+
+    def __init__(self):
+        # 127.0.0.1 is in ALLOWED_HOSTS, https avoids the SSL redirect with DEBUG off
+        self.client = APIClient(HTTP_HOST='127.0.0.1')
+
+    def request(self, method, path, data=None, token=None):
+        extra = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        response = getattr(self.client, method)(path, data, format='json', secure=True, **extra)
+        return response.status_code, response.json() if response.content else None
+
+
+class HttpClient:
+    """
+    Sends real HTTP requests to a running server
+    """
+    counts_queries = False
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        body = json.dumps(data).encode('utf-8') if data is not None and method != 'get' else None
+        http_request = urllib_request.Request(self.base_url + path, data=body, headers=headers,
+                                              method=method.upper())
+        try:
+            with urllib_request.urlopen(http_request, timeout=self.timeout) as response:
+                status, content = response.status, response.read()
+        except HTTPError as error:
+            status, content = error.code, error.read()
+        return status, json.loads(content) if content else None
+
+
+class LoadTest:
+    """
+    Runs every scenario `requests` times, picking posts and comments with
+    power-law popularity, and returns {scenario: stats}. Allocations are
+    measured in a separate, shorter pass - tracing slows the requests down.
+    """
+    def __init__(self, client, email, password, post_ids, comment_ids, scenarios=SCENARIOS, rng_seed=0):
+        self.client = client
+        self.email = email
+        self.password = password
+        self.post_ids = list(post_ids)
+        self.comment_ids = list(comment_ids)
+        self.scenarios = scenarios
+        self.rng = random.Random(rng_seed)
+        self.post_weights = power_law_weights(len(self.post_ids), self.rng)
+        self.comment_weights = power_law_weights(len(self.comment_ids), self.rng)
+        self.access = self.refresh = None
+
+    def run(self, requests=100, warmup=5, allocation_requests=0):
+        self.login()
+        results = {}
+        for name in self.scenarios:
+            for _ in range(warmup):
+                self.send(name)
+            timings, queries, errors = [], [], 0
+            for _ in range(requests):
+                context = CaptureQueriesContext(connection) if self.client.counts_queries else None
+                with context if context is not None else nullcontext():
+                    start = time.perf_counter()
+                    status = self.send(name)
+                    timings.append((time.perf_counter() - start) * 1000)
+                if context is not None:
+                    queries.append(len(context.captured_queries))
+                errors += status >= 400
+            results[name] = {
+                'requests': requests,
+                'errors': errors,
+                'mean_ms': round(sum(timings) / len(timings), 3) if timings else None,
+                **{key: self.round(percentile(timings, int(key[1:3]))) for key in LATENCY_KEYS},
+                'queries': round(sum(queries) / len(queries), 2) if queries else None,
+                'allocated_kib': self.measure_allocations(name, allocation_requests),
+            }
+        return results
+
+    def measure_allocations(self, name, requests):
+        """
+        Mean peak of memory allocated while handling a request, in KiB
+        """
+        if not requests or not self.client.counts_queries:
+            return None
+        peaks = []
+        tracemalloc.start()
+        try:
+            for _ in range(requests):
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                self.send(name)
+                peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        finally:
+            tracemalloc.stop()
+        return round(sum(peaks) / len(peaks) / 1024, 1)
+
+    def login(self):
+        status, data = self.client.request('post', reverse('token_obtain_pair'),
+                                           {'email': self.email, 'password': self.password})
+        if status != 200:
+            raise ValueError(f'Obtaining a token for {self.email} failed with status {status}')
+        self.access, self.refresh = data['access'], data['refresh']
+
+    def send(self, name):
+        post_id = self.pick(self.post_ids, self.post_weights)
+        if name == 'list':
+            return self.get(reverse('api_posts-list') + '?page_size=20')
+        if name == 'retrieve':
+            return self.get(reverse('api_posts-detail', kwargs={'pk': post_id}))
+        if name == 'basic':
+            return self.get(reverse('api_posts-basic_info', kwargs={'pk': post_id}))
+        if name == 'add_comment':
+            return self.post(reverse('api_posts-add_comment', kwargs={'pk': post_id}), {'text': 'Load test comment'})
+        if name == 'add_reply':
+            comment_id = self.pick(self.comment_ids, self.comment_weights)
+            return self.post(reverse('api_comments-add_reply', kwargs={'pk': comment_id}), {'text': 'Load test reply'})
+        if name == 'token_obtain':
+            status, _ = self.client.request('post', reverse('token_obtain_pair'),
+                                            {'email': self.email, 'password': self.password})
+            return status
+        if name == 'token_refresh':
+            status, data = self.client.request('post', reverse('token_refresh'), {'refresh': self.refresh})
+            if status == 200:
+                # refresh tokens are rotated and the used ones blacklisted
+                self.access, self.refresh = data['access'], data.get('refresh', self.refresh)
+            return status
+        raise ValueError(f'Unknown scenario {name}')
+
+    def get(self, path):
+        return self.client.request('get', path, token=self.access)[0]
+
+    def post(self, path, data):
+        return self.client.request('post', path, data, token=self.access)[0]
+
+    def pick(self, ids, weights):
+        return self.rng.choices(ids, weights)[0] if ids else 0
+
+    @staticmethod
+    def round(value):
+        return None if value is None else round(value, 3)
+
+
+def find_regressions(results, baseline, tolerance=0.2):
+    """
+    Compares results with a saved baseline. Latencies and allocations may grow
+    by `tolerance` (a fraction), the number of queries may not grow at all.
+    """
+    regressions = []
+    for name, stats in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        for key in LATENCY_KEYS + ('allocated_kib',):
+            if stats.get(key) is not None and old.get(key) and stats[key] > old[key] * (1 + tolerance):
+                regressions.append(f'{name}: {key} {old[key]} -> {stats[key]}')
+        if stats.get('queries') is not None and old.get('queries') is not None and stats['queries'] > old['queries']:
+            regressions.append(f'{name}: queries {old["queries"]} -> {stats["queries"]}')
+    return regressions
@@ -0,0 +1,47 @@
+import random
+import timeit
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from posts_comments.models import Post, Reply
+from posts_comments.serializers import PostListSerializer, ReplyListSerializer
+from posts_comments.fast_serializers import serialize_rows, serialize_post_row, serialize_reply_row
+
+
+class Command(BaseCommand):
+    help = 'Compares DRF serializers with the fast serialization path on in-memory objects, no db needed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        now = timezone.now()
+        users = [get_user_model()(id=i, username=f'user_{i}') for i in range(1, 101)]
+        posts = [Post(id=i, user=rng.choice(users), text='lorem ipsum ' * rng.randint(3, 30),
+                      time=now - timedelta(seconds=rng.randint(0, 10 ** 7)), engagement_rate=rng.randint(0, 500),
+                      comment_count=rng.randint(0, 100))
+                 for i in range(1, options['posts'] + 1)]
+        post_rows = [{'id': post.id, 'text': post.text, 'user_id': post.user.id, 'user__username': post.user.username,
+                      'time': post.time, 'engagement_rate': post.engagement_rate,
+                      'comment_count': post.comment_count} for post in posts]
+        replies = [Reply(id=post.id, user=post.user, text=post.text, time=post.time) for post in posts]
+        reply_rows = [{'id': reply.id, 'text': reply.text, 'user_id': reply.user.id,
+                       'user__username': reply.user.username, 'time': reply.time} for reply in replies]
+        renderer = JSONRenderer()
+        cases = [
+            ('posts', lambda: renderer.render(PostListSerializer(posts, many=True).data),
+             lambda: renderer.render(serialize_rows(serialize_post_row, post_rows, now))),
+            ('replies', lambda: renderer.render(ReplyListSerializer(replies, many=True).data),
+             lambda: renderer.render(serialize_rows(serialize_reply_row, reply_rows, now))),
+        ]
+        for name, drf, fast in cases:
+            if drf() != fast():
+                raise CommandError(f'The outputs for {name} differ')
+            drf_time = min(timeit.repeat(drf, number=1, repeat=options['repeat']))
+            fast_time = min(timeit.repeat(fast, number=1, repeat=options['repeat']))
+            self.stdout.write(f'{len(posts)} {name}: DRF {drf_time * 1000:.1f} ms, fast path {fast_time * 1000:.1f} ms, '
+                              f'{drf_time / fast_time:.1f}x faster, identical output')
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from posts_comments.models import Post, Comment, Reply
+from posts_comments.pagination import PostFeedPagination, HotFeedPagination
+from posts_comments.seeding import DatasetSeeder
+from posts_comments.views import get_first_replies
+from posts_comments.fast_serializers import POST_LIST_FIELDS, POST_TREE_FIELDS, COMMENT_FIELDS, REPLY_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Prints EXPLAIN plans of the queries run by PostViewSet and CommentViewSet, ' \
+           'optionally against a seeded dataset which is rolled back afterwards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help='seed a dataset first (rolled back at the end)')
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument('--replies', type=int, default=200000)
+        parser.add_argument('--analyze', action='store_true', help='run the queries too (PostgreSQL only)')
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if connection.vendor == 'postgresql':
+            explain_options = {'analyze': options['analyze'], 'buffers': options['analyze']}
+        with transaction.atomic():
+            if options['seed']:
+                DatasetSeeder(users=options['users'], posts=options['posts'], comments=options['comments'],
+                              replies=options['replies']).seed()
+                if connection.vendor == 'postgresql':
+                    # fresh statistics, otherwise the planner knows nothing about the new rows
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE')
+            for name, queryset in self.get_queries():
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.stdout.write(queryset.explain(**explain_options))
+                self.stdout.write('')
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def get_queries():
+        post = Post.objects.order_by('-comment_count').first()
+        if post is None:
+            raise CommandError('There are no posts, use --seed')
+        middle_post = Post.objects.order_by('-time', '-id')[Post.objects.count() // 2]
+        comment = Comment.objects.filter(post=post).order_by('-reply_count').first()
+        comment_ids = list(Comment.objects.filter(post=post).values_list('id', flat=True)[:20])
+        feed = Post.objects.visible().order_by('-time', '-id').values(*POST_LIST_FIELDS)
+        hot_feed = Post.objects.visible().order_by(*HotFeedPagination.ordering).values(*POST_LIST_FIELDS, 'hot_score')
+        page = PostFeedPagination.page_size + 1
+        return [
+            ('PostViewSet.list - first page', feed[:page]),
+            ('PostViewSet.list - deep page',
+             feed.filter(PostFeedPagination().get_keyset_condition([middle_post.time, middle_post.id]))[:page]),
+            ('PostViewSet.list - hot feed', hot_feed[:HotFeedPagination.page_size + 1]),
+            ('PostViewSet.list - filtered by user', feed.filter(user__id=post.user_id)[:page]),
+            ('PostViewSet.list - all posts', Post.objects.values(*POST_LIST_FIELDS)),
+            ('PostViewSet.retrieve - post', Post.objects.filter(pk=post.id).values(*POST_TREE_FIELDS)),
+            ('PostViewSet.retrieve - comments', Comment.objects.filter(post_id=post.id).values(*COMMENT_FIELDS)),
+            ('PostViewSet.retrieve - replies', Reply.objects.filter(comment__post_id=post.id).values(*REPLY_FIELDS)),
+            ('PostViewSet.retrieve (preview) - first replies', get_first_replies(comment_ids, 3)),
+            ('CommentViewSet.list', Comment.objects.select_related('user').filter(post_id=post.id)
+             .order_by('time', 'id')[:page]),
+            ('CommentViewSet.replies', Reply.objects.filter(comment_id=comment.id).order_by('time', 'id')
+             .values(*REPLY_FIELDS)[:page] if comment else Reply.objects.none()),
+        ]
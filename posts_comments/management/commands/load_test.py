@@ -0,0 +1,96 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from posts_comments.cache import post_detail_cache
+from posts_comments.load_testing import SCENARIOS, LoadTest, InProcessClient, HttpClient, find_regressions
+from posts_comments.models import Post, Comment
+from posts_comments.seeding import DatasetSeeder
+
+
+class Command(BaseCommand):
+    help = 'Measures latency percentiles, queries and allocations per request of the posts and user APIs. ' \
+           'In-process runs are rolled back afterwards, runs against a server (--url) keep what they write.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='base url of a running server, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--seed', action='store_true', help='seed a dataset first (in-process only)')
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--replies', type=int, default=20000)
+        parser.add_argument('--email', default='seed_user_0@example.com')
+        parser.add_argument('--password', default=DatasetSeeder.password)
+        parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+        parser.add_argument('--requests', type=int, default=200, help='measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--allocations', type=int, default=20,
+                            help='requests per scenario traced for allocations (in-process only), 0 disables')
+        parser.add_argument('--rng-seed', type=int, default=0)
+        parser.add_argument('--save', help='write the results as a JSON baseline to this file')
+        parser.add_argument('--compare', help='fail if the results regress against this JSON baseline')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='allowed relative growth of latencies and allocations')
+
+    def handle(self, *args, **options):
+        if options['url']:
+            if options['seed']:
+                raise CommandError('--seed works only in-process, use the seed_dataset command for a server')
+            results = self.run(HttpClient(options['url']), *self.get_ids(), options)
+        else:
+            with transaction.atomic():
+                if options['seed']:
+                    DatasetSeeder(users=options['users'], posts=options['posts'], comments=options['comments'],
+                                  replies=options['replies'], rng_seed=options['rng_seed']).seed()
+                post_ids, comment_ids = self.get_ids()
+                try:
+                    results = self.run(InProcessClient(), post_ids, comment_ids, options)
+                finally:
+                    transaction.set_rollback(True)
+                    # cached trees may contain rolled back comments
+                    for post_id in post_ids:
+                        post_detail_cache.invalidate(post_id)
+
+        self.print_results(results)
+        report = {
+            'meta': {
+                'mode': 'http' if options['url'] else 'in-process',
+                'database': connection.vendor,
+                'requests': options['requests'],
+                'created': timezone.now().isoformat(),
+            },
+            'scenarios': results,
+        }
+        if options['save']:
+            with open(options['save'], 'w') as file:
+                json.dump(report, file, indent=2)
+        if options['compare']:
+            with open(options['compare']) as file:
+                baseline = json.load(file)
+            regressions = find_regressions(results, baseline['scenarios'], options['tolerance'])
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+    @staticmethod
+    def get_ids():
+        post_ids = list(Post.objects.values_list('id', flat=True))
+        comment_ids = list(Comment.objects.values_list('id', flat=True))
+        if not post_ids or not comment_ids:
+            raise CommandError('There are no posts or comments, use --seed or the seed_dataset command')
+        return post_ids, comment_ids
+
+    def run(self, client, post_ids, comment_ids, options):
+        load_test = LoadTest(client, options['email'], options['password'], post_ids, comment_ids,
+                             scenarios=options['scenarios'], rng_seed=options['rng_seed'])
+        try:
+            return load_test.run(requests=options['requests'], warmup=options['warmup'],
+                                 allocation_requests=options['allocations'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+    def print_results(self, results):
+        columns = ('requests', 'errors', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'queries', 'allocated_kib')
+        self.stdout.write(f'{"scenario":<14}' + ''.join(f'{column:>14}' for column in columns))
+        for name, stats in results.items():
+            self.stdout.write(f'{name:<14}' + ''.join(f'{str(stats[column]):>14}' for column in columns))
@@ -0,0 +1,39 @@
+import logging
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from posts_comments.deletion import PostReaper
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Deletes posts flagged as deleted with their comments and replies, in batches with short transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='rows deleted per transaction')
+        parser.add_argument('--sleep', type=float, default=0.0, help='seconds to wait between batches')
+        parser.add_argument('--loop', action='store_true', help='keep polling for deleted posts')
+        parser.add_argument('--interval', type=float, default=10.0, help='seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        reaper = PostReaper(batch_size=options['batch_size'], sleep=options['sleep'], progress=self.report)
+        if not options['loop']:
+            self.write_summary(*reaper.reap_all())
+            return
+        while True:
+            close_old_connections()
+            try:
+                posts, comments, replies = reaper.reap_all()
+            except Exception:
+                logger.exception('Reaping deleted posts failed')
+            else:
+                if posts:
+                    self.write_summary(posts, comments, replies)
+            time.sleep(options['interval'])
+
+    def write_summary(self, posts, comments, replies):
+        self.stdout.write(self.style.SUCCESS(f'Deleted {posts} posts, {comments} comments and {replies} replies'))
+
+    def report(self, post_id, comments, replies):
+        self.stdout.write(f'Post {post_id}: deleted {comments} comments and {replies} replies so far')
@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from posts_comments.models import Post
+from posts_comments.hot import rebuild_hot_scores
+
+
+class Command(BaseCommand):
+    help = 'Recalculates hot scores of all posts in batches - needed after changing HOT_FEED["HALF_LIFE"] ' \
+           'and after engagement was changed without the engagement counter (e.g. by bulk updates)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0.0, help='seconds to wait between batches')
+
+    def handle(self, *args, **options):
+        updated = 0
+        last_id = 0
+        while True:
+            posts = list(Post.objects.filter(id__gt=last_id).order_by('id').only('id', 'time')
+                         [:options['batch_size']])
+            if not posts:
+                break
+            updated += rebuild_hot_scores(posts)
+            last_id = posts[-1].id
+            self.stdout.write(f'Updated {updated} posts so far')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'Updated hot scores of {updated} posts'))
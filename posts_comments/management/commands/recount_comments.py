@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from posts_comments.models import Post, Comment, Reply
+from posts_comments.counters import recount_related
+
+
+class Command(BaseCommand):
+    help = 'Recomputes comment_count of posts and reply_count of comments, fixing any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fixed_posts = recount_related(Post, Comment, 'post', 'comment_count', batch_size)
+        fixed_comments = recount_related(Comment, Reply, 'comment', 'reply_count', batch_size)
+        self.stdout.write(f'Fixed comment_count of {fixed_posts} posts and reply_count of {fixed_comments} comments')
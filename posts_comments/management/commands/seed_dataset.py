@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from posts_comments.seeding import DatasetSeeder
+
+
+class Command(BaseCommand):
+    help = 'Seeds the db with users, posts, comments and replies in power-law shapes, e.g. for load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument('--replies', type=int, default=200000)
+        parser.add_argument('--prefix', default='seed', help='prefix of usernames and emails, must be unique')
+        parser.add_argument('--rng-seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        users, posts, comments = DatasetSeeder(users=options['users'], posts=options['posts'],
+                                               comments=options['comments'], replies=options['replies'],
+                                               prefix=options['prefix'], rng_seed=options['rng_seed']).seed()
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(users)} users, {len(posts)} posts, {len(comments)} comments and '
+            f'{options["replies"]} replies, users log in as {options["prefix"]}_user_<n>@example.com '
+            f'with password {DatasetSeeder.password}'
+        ))
@@ -0,0 +1,41 @@
+# Generated by Django 4.0 on 2026-10-18 12:24
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_related(model, related_model, fk_name, field):
+    # inlined on purpose - migrations can't depend on app code that may change later
+    count = related_model.objects.filter(**{fk_name: OuterRef('pk')}).order_by()\
+        .values(fk_name).annotate(count=Count('pk')).values('count')
+    model.objects.update(**{field: Coalesce(Subquery(count), 0)})
+
+
+def count_comments_and_replies(apps, schema_editor):
+    post = apps.get_model('posts_comments', 'Post')
+    comment = apps.get_model('posts_comments', 'Comment')
+    reply = apps.get_model('posts_comments', 'Reply')
+    count_related(post, comment, 'post', 'comment_count')
+    count_related(comment, reply, 'comment', 'reply_count')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts_comments', '0004_rename_engagement_post_engagement_rate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_comments_and_replies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.0 on 2026-10-18 12:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts_comments', '0005_comment_count_reply_count'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ['time', 'id']},
+        ),
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ['-time', '-id']},
+        ),
+        migrations.AlterModelOptions(
+            name='reply',
+            options={'ordering': ['time', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'time', 'id'], name='comment_post_time_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-time', '-id'], name='post_time_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['user', '-time', '-id'], name='post_user_time_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reply',
+            index=models.Index(fields=['comment', 'time', 'id'], name='reply_comment_time_id_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.0 on 2026-10-18 13:00
+
+import math
+from datetime import datetime, timezone
+from django.db import migrations, models
+
+# frozen copies of posts_comments.hot.EPOCH and the HOT_FEED half-life when
+# this migration was written - migrations mustn't follow later changes
+EPOCH = datetime(2022, 1, 1, tzinfo=timezone.utc)
+HALF_LIFE = 12 * 60 * 60
+
+
+def set_hot_scores(apps, schema_editor):
+    Post = apps.get_model('posts_comments', 'Post')
+    decay_rate = math.log(2) / HALF_LIFE
+    posts = []
+    for post in Post.objects.only('id', 'time', 'engagement_rate').iterator(chunk_size=1000):
+        post.hot_score = math.log(post.engagement_rate + 1) + (post.time - EPOCH).total_seconds() * decay_rate
+        posts.append(post)
+        if len(posts) >= 1000:
+            Post.objects.bulk_update(posts, ['hot_score'])
+            posts = []
+    Post.objects.bulk_update(posts, ['hot_score'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts_comments', '0007_post_is_deleted'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(set_hot_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-hot_score', '-id'], name='post_hot_score_id_idx'),
+        ),
+    ]
@@ -11,26 +11,52 @@ class CommonInfo(models.Model):
         abstract = True
 
 
+class PostQuerySet(models.QuerySet):
+    def visible(self):
+        """Posts which aren't waiting for the reaper"""
+        return self.filter(is_deleted=False)
+
+
 class Post(CommonInfo):
     engagement_rate = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    # deleted posts are hidden right away and removed by the reap_deleted_posts command
+    is_deleted = models.BooleanField(default=False)
+    # ranking of the hot feed, see posts_comments.hot
+    hot_score = models.FloatField(default=0)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
-        ordering = ['-time']
+        ordering = ['-time', '-id']
 #         ordering of models works in serializers too
+        indexes = [
+            models.Index(fields=['-time', '-id'], name='post_time_id_idx'),
+            models.Index(fields=['user', '-time', '-id'], name='post_user_time_id_idx'),
+            models.Index(fields=['id'], name='post_deleted_idx', condition=models.Q(is_deleted=True)),
+            models.Index(fields=['-hot_score', '-id'], name='post_hot_score_id_idx'),
+        ]
 
 
 class Comment(CommonInfo):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
+    reply_count = models.PositiveIntegerField(default=0)
 
     class Meta:
-        ordering = ['time']
+        ordering = ['time', 'id']
+        indexes = [
+            models.Index(fields=['post', 'time', 'id'], name='comment_post_time_id_idx'),
+        ]
 
 
 class Reply(CommonInfo):
     comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name="replies")
 
     class Meta:
-        ordering = ['time']
+        ordering = ['time', 'id']
+        indexes = [
+            models.Index(fields=['comment', 'time', 'id'], name='reply_comment_time_id_idx'),
+        ]
 
 
 
@@ -0,0 +1,137 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import datetime
+from binascii import Error as BinasciiError
+from django.core.exceptions import ValidationError, FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor (keyset) pagination over a unique ordering. The opaque cursor
+    holds the ordering values of the last row of a page and the next page
+    is fetched with a range condition on them instead of an offset, so deep
+    pages cost the same as the first one and rows added in the meantime
+    never cause duplicated or skipped results.
+    """
+    ordering = None
+    cursor_query_param = 'cursor'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    # opt-in paginators only paginate requests that ask for a page
+    opt_in = False
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.opt_in and not self.is_requested(request):
+            return None
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_condition(position))
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data)
+        ]))
+
+    def is_requested(self, request):
+        return self.cursor_query_param in request.query_params or \
+            self.page_size_query_param in request.query_params
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_fields(self):
+        return [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def get_keyset_condition(self, position):
+        """
+        Builds (a < x) OR (a = x AND b < y) ... for the ordering fields,
+        with "greater than" used for the ascending ones.
+        """
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.get_fields(), position):
+            lookup = 'lt' if descending else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def encode_cursor(self, row):
+        position = []
+        for name, _ in self.get_fields():
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            if isinstance(value, datetime):
+                # isoformat keeps microseconds, which the ordering relies on
+                value = value.isoformat()
+            position.append(value)
+        return urlsafe_b64encode(json.dumps(position).encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('ascii'))
+            fields = self.get_fields()
+            if not isinstance(position, list) or len(position) != len(fields):
+                raise ValueError
+            return [model._meta.get_field(name).to_python(value)
+                    for (name, _), value in zip(fields, position)]
+        except (TypeError, ValueError, UnicodeError, BinasciiError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class PostFeedPagination(KeysetPagination):
+    """
+    Opt-in pagination of the posts feed, newest first
+    """
+    ordering = ('-time', '-id')
+    opt_in = True
+
+
+class ThreadPagination(KeysetPagination):
+    """
+    Pagination of comments under a post and of replies under a comment,
+    oldest first
+    """
+    ordering = ('time', 'id')
+
+
+class HotFeedPagination(KeysetPagination):
+    """
+    Pagination of the hot feed, highest hot score first
+    """
+    ordering = ('-hot_score', '-id')
+
+
+class ProfileFeedPagination(PostFeedPagination):
+    """
+    Pagination of the posts of one user on their profile, always on
+    """
+    opt_in = False
@@ -0,0 +1,99 @@
+import random
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from .models import Post, Comment, Reply
+from .hot import calculate_hot_score
+
+
+def power_law_weights(count, rng, exponent=1.2):
+    """
+    Popularity weights following a power law - a few items get most of the
+    activity, the long tail gets almost nothing
+    """
+    weights = [1 / (rank ** exponent) for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    return weights
+
+
+class DatasetSeeder:
+    """
+    Creates users, posts, comments and replies with bulk inserts. Posts per
+    user, comments per post and replies per comment follow power laws, like
+    on a real social network. Counters which are normally maintained by
+    signals are calculated up front.
+    """
+    password = 'SeedPassword1'
+
+    def __init__(self, users=100, posts=1000, comments=5000, replies=10000, prefix='seed', rng_seed=0,
+                 batch_size=1000, days=365):
+        self.users = users
+        self.posts = posts
+        self.comments = comments
+        self.replies = replies
+        self.prefix = prefix
+        self.rng = random.Random(rng_seed)
+        self.batch_size = batch_size
+        self.days = days
+
+    @transaction.atomic
+    def seed(self):
+        now = timezone.now()
+        users = self.create_users()
+        user_weights = power_law_weights(len(users), self.rng)
+
+        posts = [Post(user=user, text=self.text('Post', i), time=now - timedelta(seconds=self.rng.uniform(0, self.days * 86400)))
+                 for i, user in enumerate(self.rng.choices(users, user_weights, k=self.posts))]
+        posts = Post.objects.bulk_create(posts, batch_size=self.batch_size)
+
+        # authors are drawn all at once, choices() goes through all the weights on every call
+        comments = []
+        commented_posts = self.rng.choices(posts, power_law_weights(len(posts), self.rng), k=self.comments)
+        comment_authors = self.rng.choices(users, user_weights, k=self.comments)
+        for i, (post, user) in enumerate(zip(commented_posts, comment_authors)):
+            comment = Comment(post=post, user=user, text=self.text('Comment', i),
+                              time=self.later_than(post.time, now))
+            self.count(post, comment)
+            comments.append(comment)
+        comments = Comment.objects.bulk_create(comments, batch_size=self.batch_size)
+
+        replies = []
+        if comments:
+            replied_comments = self.rng.choices(comments, power_law_weights(len(comments), self.rng), k=self.replies)
+            reply_authors = self.rng.choices(users, user_weights, k=self.replies)
+            for i, (comment, user) in enumerate(zip(replied_comments, reply_authors)):
+                reply = Reply(comment=comment, user=user, text=self.text('Reply', i),
+                              time=self.later_than(comment.time, now))
+                comment.reply_count += 1
+                self.count(comment.post, reply)
+                replies.append(reply)
+        Reply.objects.bulk_create(replies, batch_size=self.batch_size)
+
+        for post in posts:
+            post.hot_score = calculate_hot_score(post.engagement_rate, post.time)
+        Post.objects.bulk_update(posts, ['comment_count', 'engagement_rate', 'hot_score'], batch_size=self.batch_size)
+        Comment.objects.bulk_update(comments, ['reply_count'], batch_size=self.batch_size)
+        return users, posts, comments
+
+    def create_users(self):
+        # hashing once, hashing every password would take most of the time
+        password = make_password(self.password)
+        users = [get_user_model()(email=f'{self.prefix}_user_{i}@example.com', username=f'{self.prefix}_user_{i}',
+                                  name='Seed', surname='User', password=password, is_active=True)
+                 for i in range(self.users)]
+        return get_user_model().objects.bulk_create(users, batch_size=self.batch_size)
+
+    def later_than(self, time, now):
+        return time + (now - time) * self.rng.random() ** 3
+
+    def text(self, kind, number):
+        return f'{kind} {number} ' + 'lorem ipsum ' * self.rng.randint(3, 30)
+
+    @staticmethod
+    def count(post, comment_or_reply):
+        if isinstance(comment_or_reply, Comment):
+            post.comment_count += 1
+        if comment_or_reply.user_id != post.user_id:
+            post.engagement_rate += 1
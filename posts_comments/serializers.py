@@ -1,7 +1,65 @@
+from collections import OrderedDict
+from functools import lru_cache
 from rest_framework import serializers
 from .models import Post, Comment, Reply
 from user.serializers import BasicInfoUserSerializer
 from django.utils import timezone
+from django.urls import reverse
+from rest_framework.utils.urls import replace_query_param
+from .pagination import ThreadPagination
+
+
+class TimeSincePostedCalculator:
+    """
+    Class that calculates time passed between two datetime objects, approximates it
+    and returns a string in a human-readable form
+    """
+    def __init__(self, created, current):
+        self.created = created
+        self.current = current
+
+    def calculate_string(self):
+        return self.bucket_string(*self.bucket(self.current - self.created))
+
+    @classmethod
+    def calculate_strings(cls, created_list, current):
+        """
+        Batched version - strings for many timestamps, all compared with the same
+        current time, in one pass
+        """
+        bucket, bucket_string = cls.bucket, cls.bucket_string
+        return [bucket_string(*bucket(current - created)) for created in created_list]
+
+    @staticmethod
+    def bucket(time_delta):
+        """
+        Returns the approximated time delta as (number, unit) - e.g. (3, 'day'),
+        or (0, None) for less than a minute (or a time in the future)
+        """
+        days = time_delta.days
+        if days >= 365:
+            return days // 365, 'year'
+        if days >= 30:
+            return days // 30, 'month'
+        if days > 0:
+            return days, 'day'
+        if days < 0:
+            return 0, None
+        if time_delta.seconds >= 3600:
+            return time_delta.seconds // 3600, 'hour'
+        if time_delta.seconds >= 60:
+            return time_delta.seconds // 60, 'minute'
+        return 0, None
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def bucket_string(number, unit):
+        # only a few hundred different strings are possible, so they are memoized
+        if unit is None:
+            return 'Just now'
+        if number == 1:
+            return f'1 {unit} ago'
+        return f'{number} {unit}s ago'
 
 
 def calculate_time_since_posted(created, current):
@@ -9,48 +67,65 @@ def calculate_time_since_posted(created, current):
     Function that calculates time passed between two datetime objects, approximates it
     and returns a string in a human-readable form
     """
-    time_delta = current - created
-    if time_delta.days // 365:
-        if time_delta.days // 365 > 1:
-            return str(time_delta.days // 365) + ' years ago'
-        else:
-            return '1 year ago'
-    if time_delta.days // 30:
-        if time_delta.days // 30 > 1:
-            return str(time_delta.days // 30) + ' months ago'
-        else:
-            return '1 month ago'
-    if time_delta.days > 0:
-        if time_delta.days > 1:
-            return str(time_delta.days) + ' days ago'
-        else:
-            return '1 day ago'
-    if time_delta.seconds // 3600:
-        if time_delta.seconds // 3600 > 1:
-            return str(time_delta.seconds // 3600) + ' hours ago'
-        else:
-            return '1 hour ago'
-    if time_delta.seconds // 60:
-        if time_delta.seconds // 60 > 1:
-            return str(time_delta.seconds // 60) + ' minutes ago'
-        else:
-            return '1 minute ago'
-    return 'Just now'
-
-
-class PostListSerializer(serializers.ModelSerializer):
+    return TimeSincePostedCalculator(created, current).calculate_string()
+
+
+def render_time_since_posted(payload, current):
+    """
+    Function that replaces raw timestamps left in `time_since_posted`
+    (e.g. in cached payloads) with human-readable strings, all of them
+    calculated in one batch
+    """
+    pending = []
+
+    def copy(value):
+        if isinstance(value, list):
+            return [copy(item) for item in value]
+        if isinstance(value, dict):
+            result = OrderedDict()
+            for key, item in value.items():
+                if key == 'time_since_posted':
+                    result[key] = item
+                    pending.append(result)
+                else:
+                    result[key] = copy(item)
+            return result
+        return value
+
+    rendered = copy(payload)
+    strings = TimeSincePostedCalculator.calculate_strings([item['time_since_posted'] for item in pending], current)
+    for item, string in zip(pending, strings):
+        item['time_since_posted'] = string
+    return rendered
+
+
+class TimeSincePostedMixin:
+    """
+    Calculates `time_since_posted` against one current time shared by the whole
+    serialization - it's kept in the root serializer's context, where views
+    can also put a request-wide `now`
+    """
+    def get_time_since_posted(self, obj):
+        context = self.context
+        if 'now' not in context:
+            context['now'] = timezone.now()
+        return calculate_time_since_posted(obj.time, context['now'])
+
+
+class PostListSerializer(TimeSincePostedMixin, serializers.ModelSerializer):
     user = BasicInfoUserSerializer()
     time_since_posted = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
-        fields = ['id', 'text', 'user', 'time_since_posted', 'engagement_rate']
-
-    def get_time_since_posted(self, obj):
-        return calculate_time_since_posted(obj.time, timezone.now())
+        fields = ['id', 'text', 'user', 'time_since_posted', 'engagement_rate', 'comment_count']
 
 
 class PostCreateUpdateSerializer(serializers.ModelSerializer):
+    """
+    Creates posts and validates updates - PostViewSet.update saves them
+    itself with an UPDATE filtered by the author
+    """
     class Meta:
         model = Post
         fields = ['text']
@@ -64,13 +139,8 @@ class PostCreateUpdateSerializer(serializers.ModelSerializer):
         user = self.context['user']
         return Post.objects.create(user=user, time=timezone.now(), **validated_data)
 
-    def update(self, instance, validated_data):
-        instance.text = validated_data.get('text', instance.text)
-        instance.save()
-        return instance
-
 
-class ReplyListSerializer(serializers.ModelSerializer):
+class ReplyListSerializer(TimeSincePostedMixin, serializers.ModelSerializer):
     user = BasicInfoUserSerializer()
     time_since_posted = serializers.SerializerMethodField()
 
@@ -78,11 +148,8 @@ class ReplyListSerializer(serializers.ModelSerializer):
         model = Reply
         fields = ['id', 'user', 'text', 'time_since_posted']
 
-    def get_time_since_posted(self, obj):
-        return calculate_time_since_posted(obj.time, timezone.now())
 
-
-class CommentListSerializer(serializers.ModelSerializer):
+class CommentListSerializer(TimeSincePostedMixin, serializers.ModelSerializer):
     user = BasicInfoUserSerializer()
     replies = ReplyListSerializer(many=True)
     time_since_posted = serializers.SerializerMethodField()
@@ -91,8 +158,28 @@ class CommentListSerializer(serializers.ModelSerializer):
         model = Comment
         fields = ['id', 'user', 'text', 'time_since_posted', "replies"]
 
-    def get_time_since_posted(self, obj):
-        return calculate_time_since_posted(obj.time, timezone.now())
+
+class CommentPreviewSerializer(TimeSincePostedMixin, serializers.ModelSerializer):
+    """
+    A comment with the number of its replies and only the oldest of them.
+    `replies_next` links to the rest of the replies.
+    """
+    user = BasicInfoUserSerializer()
+    replies = ReplyListSerializer(many=True, source='first_replies')
+    replies_next = serializers.SerializerMethodField()
+    time_since_posted = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Comment
+        fields = ['id', 'user', 'text', 'time_since_posted', 'reply_count', 'replies', 'replies_next']
+
+    def get_replies_next(self, obj):
+        if obj.reply_count <= len(obj.first_replies):
+            return None
+        url = self.context['request'].build_absolute_uri(reverse('api_comments-replies', args=[obj.id]))
+        if obj.first_replies:
+            url = replace_query_param(url, 'cursor', ThreadPagination().encode_cursor(obj.first_replies[-1]))
+        return url
 
 
 class CommentCreateUpdateSerializer(serializers.ModelSerializer):
@@ -107,7 +194,7 @@ class CommentCreateUpdateSerializer(serializers.ModelSerializer):
         return Comment.objects.create(user=user, post=post, time=timezone.now(), **validated_data)
 
 
-class PostRetrieveSerializer(serializers.ModelSerializer):
+class PostRetrieveSerializer(TimeSincePostedMixin, serializers.ModelSerializer):
     comments = CommentListSerializer(many=True)
     user = BasicInfoUserSerializer()
     time_since_posted = serializers.SerializerMethodField()
@@ -116,8 +203,29 @@ class PostRetrieveSerializer(serializers.ModelSerializer):
         model = Post
         fields = ['user', 'text', 'time_since_posted', 'comments']
 
-    def get_time_since_posted(self, obj):
-        return calculate_time_since_posted(obj.time, timezone.now())
+
+class PostPreviewRetrieveSerializer(TimeSincePostedMixin, serializers.ModelSerializer):
+    """
+    A post with the number of its comments and only the oldest of them.
+    `comments_next` links to the rest of the comments.
+    """
+    comments = CommentPreviewSerializer(many=True, source='first_comments')
+    comments_next = serializers.SerializerMethodField()
+    user = BasicInfoUserSerializer()
+    time_since_posted = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Post
+        fields = ['user', 'text', 'time_since_posted', 'comment_count', 'comments', 'comments_next']
+
+    def get_comments_next(self, obj):
+        if obj.comment_count <= len(obj.first_comments):
+            return None
+        url = self.context['request'].build_absolute_uri(reverse('api_comments-list'))
+        url = replace_query_param(url, 'post', obj.id)
+        if obj.first_comments:
+            url = replace_query_param(url, 'cursor', ThreadPagination().encode_cursor(obj.first_comments[-1]))
+        return url
 
 
 class ReplyCreateUpdateSerializer(serializers.ModelSerializer):
@@ -132,13 +240,11 @@ class ReplyCreateUpdateSerializer(serializers.ModelSerializer):
         return Reply.objects.create(user=user, comment=comment, time=timezone.now(), **validated_data)
 
 
-class BasicInfoPostSerializer(serializers.ModelSerializer):
+class BasicInfoPostSerializer(TimeSincePostedMixin, serializers.ModelSerializer):
     time_since_posted = serializers.SerializerMethodField()
     user = BasicInfoUserSerializer()
 
     class Meta:
         model = Post
-        fields = ['id', 'user', 'text', 'time_since_posted']
+        fields = ['id', 'user', 'text', 'time_since_posted', 'comment_count']
 
-    def get_time_since_posted(self, obj):
-        return calculate_time_since_posted(obj.time, timezone.now())
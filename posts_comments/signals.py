@@ -1,5 +1,25 @@
-from django.db.models.signals import post_save
-from .models import Comment, Reply
+from django.db.models import F
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_save, post_delete
+from .models import Post, Comment, Reply
+from .engagement import get_engagement_counter
+from .hot import calculate_hot_score
+from .cache import post_detail_cache
+from .deletion import post_trees_deleted
+
+
+def set_hot_score(sender, instance, update_fields=None, **kwargs):
+    """
+    Function responsible for calculating hot score of a post when it's
+    created or its engagement_rate is saved (list hot_score in update_fields
+    too), engagement increments keep it up to date later - other saves
+    mustn't overwrite it with the engagement_rate of a stale instance
+    """
+    if instance._state.adding or (update_fields is not None and 'engagement_rate' in update_fields):
+        instance.hot_score = calculate_hot_score(instance.engagement_rate, instance.time)
+
+
+pre_save.connect(set_hot_score, sender=Post)
 
 
 def grow_engagement_comment(sender, instance, created, **kwargs):
@@ -7,10 +27,8 @@ def grow_engagement_comment(sender, instance, created, **kwargs):
     Function responsible for increasing engagement rate under a post
     if a new comment is created by user other than the author
     """
-    if created and instance.user != instance.post.user:
-        post = instance.post
-        post.engagement_rate += 1
-        post.save()
+    if created and instance.user_id != instance.post.user_id:
+        get_engagement_counter().increment(instance.post_id)
 
 
 post_save.connect(grow_engagement_comment, sender=Comment)
@@ -21,10 +39,118 @@ def grow_engagement_reply(sender, instance, created, **kwargs):
     Function responsible for increasing engagement rate under a post
     if a new reply is created by user other than the author
     """
-    if created and instance.user != instance.comment.post.user:
-        post = instance.comment.post
-        post.engagement_rate += 1
-        post.save()
+    if created and instance.user_id != instance.comment.post.user_id:
+        get_engagement_counter().increment(instance.comment.post_id)
 
 
 post_save.connect(grow_engagement_reply, sender=Reply)
+
+
+def count_created_comment(sender, instance, created, **kwargs):
+    """
+    Function responsible for keeping comment_count of a post up to date
+    when a comment is created
+    """
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(comment_count=F('comment_count') + 1)
+
+
+post_save.connect(count_created_comment, sender=Comment)
+
+
+def count_deleted_comment(sender, instance, **kwargs):
+    """
+    Function responsible for keeping comment_count of a post up to date
+    when a comment is deleted
+    """
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(comment_count=F('comment_count') - 1)
+
+
+post_delete.connect(count_deleted_comment, sender=Comment)
+
+
+def count_created_reply(sender, instance, created, **kwargs):
+    """
+    Function responsible for keeping reply_count of a comment up to date
+    when a reply is created
+    """
+    if created:
+        Comment.objects.filter(pk=instance.comment_id).update(reply_count=F('reply_count') + 1)
+
+
+post_save.connect(count_created_reply, sender=Reply)
+
+
+def count_deleted_reply(sender, instance, **kwargs):
+    """
+    Function responsible for keeping reply_count of a comment up to date
+    when a reply is deleted
+    """
+    Comment.objects.filter(pk=instance.comment_id, reply_count__gt=0).update(reply_count=F('reply_count') - 1)
+
+
+post_delete.connect(count_deleted_reply, sender=Reply)
+
+
+def invalidate_post_detail(sender, instance, **kwargs):
+    """
+    Function responsible for removing the cached tree of a post
+    when the post is changed or deleted
+    """
+    post_detail_cache.invalidate(instance.id)
+
+
+post_save.connect(invalidate_post_detail, sender=Post)
+post_delete.connect(invalidate_post_detail, sender=Post)
+
+
+def invalidate_post_detail_comment(sender, instance, **kwargs):
+    """
+    Function responsible for removing the cached tree of a post
+    when a comment under it is created, changed or deleted
+    """
+    post_detail_cache.invalidate(instance.post_id)
+
+
+post_save.connect(invalidate_post_detail_comment, sender=Comment)
+post_delete.connect(invalidate_post_detail_comment, sender=Comment)
+
+
+def invalidate_post_detail_reply(sender, instance, **kwargs):
+    """
+    Function responsible for removing the cached tree of a post
+    when a reply in it is created, changed or deleted
+    """
+    post_detail_cache.invalidate(instance.comment.post_id)
+
+
+post_save.connect(invalidate_post_detail_reply, sender=Reply)
+post_delete.connect(invalidate_post_detail_reply, sender=Reply)
+
+
+def invalidate_deleted_post_details(sender, post_ids, **kwargs):
+    """
+    Function responsible for removing the cached trees of posts
+    deleted together with their comments and replies
+    """
+    post_detail_cache.invalidate_many(post_ids)
+
+
+post_trees_deleted.connect(invalidate_deleted_post_details, sender=Post)
+
+
+def invalidate_post_details_of_user(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Function responsible for removing the cached trees which may contain
+    the username of a changed user - of their posts and of the posts
+    they commented or replied under
+    """
+    if created or not post_detail_cache.enabled or (update_fields is not None and 'username' not in update_fields):
+        return
+    post_ids = set(Post.objects.filter(user_id=instance.pk).values_list('id', flat=True))
+    post_ids.update(Comment.objects.filter(user_id=instance.pk).values_list('post_id', flat=True).distinct())
+    post_ids.update(Reply.objects.filter(user_id=instance.pk).values_list('comment__post_id', flat=True).distinct())
+    post_detail_cache.invalidate_many(post_ids)
+
+
+post_save.connect(invalidate_post_details_of_user, sender=get_user_model())
@@ -0,0 +1,38 @@
+import json
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class StreamingJSONListResponse(StreamingHttpResponse):
+    """
+    Response that writes a queryset as a JSON array while it is being read
+    from the db. Rows are fetched in chunks through a server-side cursor
+    and every chunk is converted with `serialize_many`, so memory usage
+    doesn't depend on the number of rows and the first bytes are sent
+    right away.
+    The output is identical to the one of DRF's JSONRenderer.
+    """
+    def __init__(self, queryset, serialize_many, chunk_size=500, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(self.iter_json(queryset, serialize_many, chunk_size), **kwargs)
+
+    @staticmethod
+    def encode(data):
+        # JSONRenderer escapes the line and paragraph separators too, they aren't valid in javascript strings
+        return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':'))\
+            .replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+
+    @classmethod
+    def iter_json(cls, queryset, serialize_many, chunk_size):
+        yield '['
+        separator = ''
+        chunk = []
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) >= chunk_size:
+                yield separator + ','.join(cls.encode(data) for data in serialize_many(chunk))
+                separator = ','
+                chunk = []
+        if chunk:
+            yield separator + ','.join(cls.encode(data) for data in serialize_many(chunk))
+        yield ']'
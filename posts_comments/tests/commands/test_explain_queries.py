@@ -0,0 +1,39 @@
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from posts_comments.models import Post, Comment, Reply
+from posts_comments.seeding import DatasetSeeder
+from posts_comments.counters import recount_related
+
+
+class SeederTest(TestCase):
+    def test_seeded_counters_are_consistent(self):
+        """
+        Counters normally kept by signals are correct after bulk seeding.
+        """
+        users, posts, comments = DatasetSeeder(users=5, posts=20, comments=60, replies=100).seed()
+        self.assertEqual((len(users), Post.objects.count(), Comment.objects.count(), Reply.objects.count()),
+                         (5, 20, 60, 100))
+        self.assertEqual(recount_related(Post, Comment, 'post', 'comment_count'), 0)
+        self.assertEqual(recount_related(Comment, Reply, 'comment', 'reply_count'), 0)
+
+
+class ExplainQueriesTest(TestCase):
+    def test_plans_against_seeded_data(self):
+        """
+        Plans are printed for every query and the seeded data is rolled back.
+        """
+        out = StringIO()
+        call_command('explain_queries', seed=True, users=5, posts=20, comments=60, replies=100, stdout=out)
+        self.assertIn('PostViewSet.list - deep page', out.getvalue())
+        self.assertIn('CommentViewSet.replies', out.getvalue())
+        self.assertIn('post_time_id_idx', out.getvalue())
+        self.assertIn('post_hot_score_id_idx', out.getvalue())
+        # first replies are read per comment from the thread index
+        self.assertIn('reply_comment_time_id_idx (comment_id=?)', out.getvalue())
+        self.assertEqual(Post.objects.count(), 0)
+
+    def test_no_posts(self):
+        with self.assertRaises(CommandError):
+            call_command('explain_queries', stdout=StringIO())
@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from posts_comments.load_testing import SCENARIOS, percentile, find_regressions
+from posts_comments.models import Post, Comment, Reply
+
+
+class LoadTestCommandTest(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.baseline = os.path.join(self.directory.name, 'baseline.json')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def load_test(self, **options):
+        call_command('load_test', seed=True, users=5, posts=20, comments=60, replies=100, requests=3, warmup=1,
+                     allocations=1, stdout=StringIO(), **options)
+
+    def test_baseline_is_saved(self):
+        """
+        Every scenario is measured without errors, the results are saved
+        and the seeded data is rolled back.
+        """
+        self.load_test(save=self.baseline)
+        with open(self.baseline) as file:
+            report = json.load(file)
+        self.assertEqual(report['meta']['mode'], 'in-process')
+        self.assertEqual(list(report['scenarios']), list(SCENARIOS))
+        for stats in report['scenarios'].values():
+            self.assertEqual(stats['errors'], 0)
+            self.assertGreater(stats['queries'], 0)
+            self.assertGreater(stats['allocated_kib'], 0)
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+        self.assertEqual((Post.objects.count(), Comment.objects.count(), Reply.objects.count()), (0, 0, 0))
+
+    def test_regression(self):
+        """
+        More queries per request than in the baseline is a regression.
+        """
+        with open(self.baseline, 'w') as file:
+            json.dump({'scenarios': {'basic': {'queries': 1}}}, file)
+        with self.assertRaises(CommandError):
+            self.load_test(compare=self.baseline, scenarios=['basic'])
+
+    def test_no_posts(self):
+        with self.assertRaises(CommandError):
+            call_command('load_test', stdout=StringIO())
+
+
+class LoadTestingHelpersTest(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual((percentile(values, 50), percentile(values, 95), percentile(values, 99)), (50, 95, 99))
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_find_regressions(self):
+        baseline = {'list': {'p50_ms': 10, 'p95_ms': 20, 'p99_ms': 30, 'queries': 2, 'allocated_kib': 100}}
+        results = {'list': {'p50_ms': 11, 'p95_ms': 25, 'p99_ms': 30, 'queries': 2, 'allocated_kib': None},
+                   'basic': {'p50_ms': 100, 'queries': 10}}
+        self.assertEqual(find_regressions(results, baseline, tolerance=0.2), ['list: p95_ms 20 -> 25'])
@@ -0,0 +1,87 @@
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from user.models import MyUser
+from posts_comments.models import Post, Comment, Reply
+from posts_comments.deletion import PostReaper, post_trees_deleted
+
+
+class ReapDeletedPostsTest(TestCase):
+    def setUp(self) -> None:
+        self.user = MyUser.objects.create_user(name="First", surname="User", username="User1",
+                                               password="Password", email="testemail@test.test")
+        now = timezone.now()
+        self.deleted = Post.objects.create(user=self.user, text="Deleted post", time=now - timedelta(days=1),
+                                           is_deleted=True)
+        self.kept = Post.objects.create(user=self.user, text="Kept post", time=now)
+        for post in (self.deleted, self.kept):
+            for i in range(5):
+                comment = Comment.objects.create(post=post, user=self.user, text=f"Comment {i}", time=now)
+                for j in range(2):
+                    Reply.objects.create(comment=comment, user=self.user, text=f"Reply {j}", time=now)
+
+    def test_deletes_flagged_posts_in_batches(self):
+        out = StringIO()
+        call_command('reap_deleted_posts', '--batch-size', '3', stdout=out)
+        self.assertFalse(Post.objects.filter(pk=self.deleted.pk).exists())
+        self.assertEqual(Comment.objects.count(), 5)
+        self.assertEqual(Reply.objects.count(), 10)
+        self.assertFalse(Comment.objects.filter(post=self.deleted).exists())
+        output = out.getvalue()
+        self.assertIn(f'Post {self.deleted.id}: deleted 0 comments and 3 replies so far', output)
+        self.assertIn(f'Post {self.deleted.id}: deleted 5 comments and 10 replies so far', output)
+        self.assertIn('Deleted 1 posts, 5 comments and 10 replies', output)
+
+    def test_batches_are_bounded(self):
+        batches = []
+        delete_batch = PostReaper.delete_batch
+
+        def record_batch(reaper, queryset):
+            deleted = delete_batch(reaper, queryset)
+            batches.append(deleted)
+            return deleted
+
+        with mock.patch.object(PostReaper, 'delete_batch', record_batch):
+            PostReaper(batch_size=4).reap_all()
+        # replies 4 + 4 + 2, comments 4 + 1
+        self.assertEqual(batches, [4, 4, 2, 4, 1])
+
+    def test_rows_added_during_reaping(self):
+        reaper = PostReaper(batch_size=100)
+        delete_batch = reaper.delete_batch
+
+        def delete_batch_and_comment(queryset):
+            deleted = delete_batch(queryset)
+            if queryset.model is Comment:
+                comment = Comment.objects.create(post=self.deleted, user=self.user, text="Late", time=timezone.now())
+                Reply.objects.create(comment=comment, user=self.user, text="Late", time=timezone.now())
+            return deleted
+
+        reaper.delete_batch = delete_batch_and_comment
+        self.assertEqual(reaper.reap_all(), (1, 5, 10))
+        self.assertFalse(Post.objects.filter(pk=self.deleted.pk).exists())
+        self.assertEqual(Comment.objects.count(), 5)
+        self.assertEqual(Reply.objects.count(), 10)
+
+    def test_signal_sent_once(self):
+        receiver = mock.Mock()
+        post_trees_deleted.connect(receiver, sender=Post)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                PostReaper(batch_size=2).reap_all()
+                # only sent once the deletion is committed
+                receiver.assert_not_called()
+        finally:
+            post_trees_deleted.disconnect(receiver, sender=Post)
+        receiver.assert_called_once()
+        self.assertEqual(receiver.call_args.kwargs['post_ids'], [self.deleted.id])
+
+    def test_nothing_to_delete(self):
+        Post.objects.update(is_deleted=False)
+        out = StringIO()
+        call_command('reap_deleted_posts', stdout=out)
+        self.assertIn('Deleted 0 posts, 0 comments and 0 replies', out.getvalue())
+        self.assertEqual(Post.objects.count(), 2)
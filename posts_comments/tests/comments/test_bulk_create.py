@@ -0,0 +1,127 @@
+from rest_framework.test import APITestCase
+from django.test import override_settings
+from user.models import MyUser
+from posts_comments.models import Post, Comment
+from posts_comments.cache import post_detail_cache
+from django.shortcuts import reverse
+from django.utils import timezone
+from rest_framework import status
+
+
+class BulkCreateCommentsTest(APITestCase):
+    def setUp(self) -> None:
+        user1_data = {
+            "name": "First",
+            "surname": "User",
+            "username": "User1",
+            "password": "Password",
+            "email": "testemail@test.test"
+        }
+        user2_data = {
+            "name": "Second",
+            "surname": "User",
+            "username": "User2",
+            "password": "Password",
+            "email": "testemail2@test.test"
+        }
+        token_url = reverse('token_obtain_pair')
+
+        self.user1 = MyUser.objects.create_user(**user1_data)
+        self.user1.is_active = True
+        self.user1.save()
+
+        self.user2 = MyUser.objects.create_user(**user2_data)
+        self.user2.is_active = True
+        self.user2.save()
+
+        self.post1 = Post.objects.create(user=self.user1, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrrr 1",
+                                         time=timezone.now())
+        self.post2 = Post.objects.create(user=self.user2, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrrr 2",
+                                         time=timezone.now())
+        self.url = reverse('api_posts-bulk_add_comments')
+
+        token = self.client.post(token_url, {
+            "email": self.user2.email,
+            "password": "Password"
+        }).data.get("access")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_unauthorized_user(self):
+        self.client.credentials()
+        response = self.client.post(self.url, [{'post': self.post1.id, 'text': 'Comment'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_create_many(self):
+        data = [{'post': self.post1.id, 'text': f'Comment {i}'} for i in range(10)] + \
+               [{'post': self.post2.id, 'text': f'Own comment {i}'} for i in range(3)]
+        # posts, savepoint, insert, comment_count (10 and 3 - two UPDATEs), engagement, release
+        with self.assertNumQueries(7):
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([result['text'] for result in response.data['results']], [item['text'] for item in data])
+        self.assertEqual(Comment.objects.filter(pk=response.data['results'][0]['id']).get().post, self.post1)
+        self.post1.refresh_from_db()
+        self.post2.refresh_from_db()
+        self.assertEqual((self.post1.comment_count, self.post1.engagement_rate), (10, 10))
+        # comments of the author don't count as engagement
+        self.assertEqual((self.post2.comment_count, self.post2.engagement_rate), (3, 0))
+        self.assertTrue(all(comment.user == self.user2 for comment in Comment.objects.all()))
+
+    def test_per_item_errors(self):
+        data = [
+            {'post': self.post1.id, 'text': 'Comment'},
+            {'post': self.post1.id, 'text': 'k' * 5001},
+            {'post': self.post1.id + 100, 'text': 'Comment'},
+            {'text': 'Comment'},
+            'Comment',
+        ]
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data['results']
+        self.assertEqual(results[0]['text'], 'Comment')
+        self.assertIn('text', results[1]['errors'])
+        self.assertEqual(results[2]['errors'], {'post': ["This post doesn't exist"]})
+        self.assertEqual(results[3]['errors'], {'post': ["This post doesn't exist"]})
+        self.assertIn('non_field_errors', results[4]['errors'])
+        self.assertEqual(Comment.objects.count(), 1)
+        self.post1.refresh_from_db()
+        self.assertEqual(self.post1.comment_count, 1)
+
+    def test_all_invalid(self):
+        response = self.client.post(self.url, [{'post': self.post1.id, 'text': ''}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Comment.objects.count(), 0)
+
+    def test_deleted_post(self):
+        Post.objects.filter(pk=self.post1.pk).update(is_deleted=True)
+        response = self.client.post(self.url, [{'post': self.post1.id, 'text': 'Comment'}], format='json')
+        self.assertEqual(response.data['results'][0]['errors'], {'post': ["This post doesn't exist"]})
+
+    def test_invalid_body(self):
+        for data in ({'post': self.post1.id, 'text': 'Comment'}, []):
+            response = self.client.post(self.url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, [{'post': self.post1.id, 'text': 'Comment'}] * 1001, format='json')
+        self.assertEqual(response.data, {'message': "At most 1000 items can be added at once"})
+
+    @override_settings(POST_DETAIL_CACHE={'ENABLED': True, 'ALIAS': 'default', 'TIMEOUT': 60})
+    def test_invalidates_cached_post(self):
+        url = reverse('api_posts-detail', args=[self.post1.id])
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, [{'post': self.post1.id, 'text': 'Comment'}], format='json')
+        self.assertEqual(len(self.client.get(url).data['comments']), 1)
+
+    @override_settings(POST_DETAIL_CACHE={'ENABLED': True, 'ALIAS': 'default', 'TIMEOUT': 60})
+    def test_invalidates_cached_post_after_commit(self):
+        """
+        Until the comments are committed the cached tree stays, a retrieve
+        would read the old rows anyway.
+        """
+        self.client.get(reverse('api_posts-detail', args=[self.post1.id]))
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(self.url, [{'post': self.post1.id, 'text': 'Comment'}], format='json')
+            self.assertIsNotNone(post_detail_cache.get(self.post1.id)[0])
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(post_detail_cache.get(self.post1.id)[0])
@@ -0,0 +1,95 @@
+from rest_framework.test import APITestCase
+from user.models import MyUser
+from posts_comments.models import Post, Comment, Reply
+from django.shortcuts import reverse
+from django.utils import timezone
+from datetime import timedelta
+from rest_framework import status
+
+
+class ListCommentsTest(APITestCase):
+    def setUp(self) -> None:
+        user1_data = {
+            "name": "First",
+            "surname": "User",
+            "username": "User1",
+            "password": "Password",
+            "email": "testemail@test.test"
+        }
+        token_url = reverse('token_obtain_pair')
+        self.url = reverse('api_comments-list')
+
+        self.user1 = MyUser.objects.create_user(**user1_data)
+        self.user1.is_active = True
+        self.user1.save()
+
+        now = timezone.now()
+        self.post = Post.objects.create(user=self.user1, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1", time=now)
+        self.empty_post = Post.objects.create(user=self.user1, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 2",
+                                              time=now)
+        for i in range(7):
+            # comments with the same time are ordered by id
+            comment = Comment.objects.create(post=self.post, user=self.user1, time=now + timedelta(minutes=i // 2),
+                                             text=f"Comment {i}")
+            for j in range(4):
+                Reply.objects.create(comment=comment, user=self.user1, time=now + timedelta(minutes=j),
+                                     text=f"Reply {j}")
+
+        self.token_user1 = self.client.post(token_url, {
+            "email": self.user1.email,
+            "password": "Password"
+        }).data.get("access")
+
+    def test_unauthorized_user(self):
+        """
+        Making sure that users without a token cannot access the endpoint.
+        """
+        self.client.credentials()
+        response = self.client.get(f"{self.url}?post={self.post.id}")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_pages_of_comments(self):
+        """
+        Following the next links returns all comments oldest first,
+        each of them with its first replies.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        url = f"{self.url}?post={self.post.id}&page_size=3&replies_limit=1"
+        texts = []
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(len(response.data['results']) <= 3)
+            for comment in response.data['results']:
+                self.assertEqual(comment['reply_count'], 4)
+                self.assertEqual([reply['text'] for reply in comment['replies']], ["Reply 0"])
+                self.assertIsNotNone(comment['replies_next'])
+            texts.extend(comment['text'] for comment in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(texts, [f"Comment {i}" for i in range(7)])
+
+    def test_post_without_comments(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        response = self.client.get(f"{self.url}?post={self.empty_post.id}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'next': None, 'results': []})
+
+    def test_post_does_not_exist_404_response(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        response = self.client.get(f"{self.url}?post={self.empty_post.id + 1}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, {'message': "This post doesn't exist"})
+
+    def test_no_post_given_400_response(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(f"{self.url}?post=first")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_deleted_post_404_response(self):
+        Post.objects.filter(pk=self.post.pk).update(is_deleted=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        response = self.client.get(f"{self.url}?post={self.post.id}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, {'message': "This post doesn't exist"})
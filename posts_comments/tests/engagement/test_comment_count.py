@@ -0,0 +1,50 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from user.models import MyUser
+from posts_comments.models import Post, Comment, Reply
+
+
+class CommentCountTest(TestCase):
+    def setUp(self) -> None:
+        self.user = MyUser.objects.create_user(name="First", surname="User", username="User1",
+                                               password="Password", email="testemail@test.test")
+        self.post = Post.objects.create(user=self.user, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1",
+                                        time=timezone.now())
+        self.comments = [Comment.objects.create(post=self.post, user=self.user, text=f"Comment {i}",
+                                                time=timezone.now()) for i in range(3)]
+        for i in range(4):
+            Reply.objects.create(comment=self.comments[0], user=self.user, text=f"Reply {i}", time=timezone.now())
+
+    def test_counts_grow_with_new_comments_and_replies(self):
+        self.post.refresh_from_db()
+        self.comments[0].refresh_from_db()
+        self.comments[1].refresh_from_db()
+        self.assertEqual(self.post.comment_count, 3)
+        self.assertEqual(self.comments[0].reply_count, 4)
+        self.assertEqual(self.comments[1].reply_count, 0)
+
+    def test_counts_shrink_after_deletion(self):
+        Reply.objects.filter(comment=self.comments[0]).first().delete()
+        self.comments[2].delete()
+        self.post.refresh_from_db()
+        self.comments[0].refresh_from_db()
+        self.assertEqual(self.post.comment_count, 2)
+        self.assertEqual(self.comments[0].reply_count, 3)
+
+    def test_recount_fixes_drift(self):
+        """
+        The management command sets the counters back to the real numbers.
+        """
+        Post.objects.filter(pk=self.post.pk).update(comment_count=10)
+        Comment.objects.filter(pk=self.comments[1].pk).update(reply_count=7)
+        out = StringIO()
+        call_command('recount_comments', batch_size=1, stdout=out)
+        self.assertIn('Fixed comment_count of 1 posts and reply_count of 1 comments', out.getvalue())
+        self.post.refresh_from_db()
+        self.comments[0].refresh_from_db()
+        self.comments[1].refresh_from_db()
+        self.assertEqual(self.post.comment_count, 3)
+        self.assertEqual(self.comments[0].reply_count, 4)
+        self.assertEqual(self.comments[1].reply_count, 0)
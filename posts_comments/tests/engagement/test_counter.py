@@ -0,0 +1,121 @@
+import threading
+import time
+from django.db import connection, transaction, OperationalError
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from user.models import MyUser
+from posts_comments.models import Post, Comment, Reply
+from posts_comments.engagement import EngagementCounter, BufferedEngagementCounter
+
+
+class EngagementCounterTest(TestCase):
+    def setUp(self) -> None:
+        self.user1 = MyUser.objects.create_user(name="First", surname="User", username="User1",
+                                                password="Password", email="testemail@test.test")
+        self.user2 = MyUser.objects.create_user(name="Second", surname="User", username="User2",
+                                                password="Password", email="testemail2@test.test")
+        self.post = Post.objects.create(user=self.user1, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1",
+                                        time=timezone.now())
+        self.other_post = Post.objects.create(user=self.user2, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 2",
+                                              time=timezone.now())
+
+    def test_increment_updates_only_engagement_rate(self):
+        """
+        The increment is a single UPDATE which doesn't rewrite other columns.
+        """
+        Post.objects.filter(pk=self.post.pk).update(text="Changed numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1")
+        with self.assertNumQueries(1):
+            EngagementCounter().increment(self.post.pk)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.engagement_rate, 1)
+        self.assertEqual(self.post.text, "Changed numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1")
+
+    def test_signals_skip_author(self):
+        """
+        Comments and replies of the author don't count as engagement.
+        """
+        comment = Comment.objects.create(post=self.post, user=self.user1, text="Comment", time=timezone.now())
+        Reply.objects.create(comment=comment, user=self.user1, text="Reply", time=timezone.now())
+        Reply.objects.create(comment=comment, user=self.user2, text="Reply", time=timezone.now())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.engagement_rate, 1)
+
+    def test_buffered_counter_coalesces_increments(self):
+        """
+        Increments fired concurrently are kept in memory and written
+        in one UPDATE per post when flushed.
+        """
+        counter = BufferedEngagementCounter(shards=4, flush_interval=3600)
+
+        def fire():
+            for _ in range(50):
+                counter.increment(self.post.pk)
+                counter.increment(self.other_post.pk, 2)
+
+        threads = [threading.Thread(target=fire) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.engagement_rate, 0)
+        with self.assertNumQueries(2):
+            counter.flush()
+        self.post.refresh_from_db()
+        self.other_post.refresh_from_db()
+        self.assertEqual(self.post.engagement_rate, 400)
+        self.assertEqual(self.other_post.engagement_rate, 800)
+        with self.assertNumQueries(0):
+            counter.flush()
+
+
+class ConcurrentCommentsTest(TransactionTestCase):
+    def setUp(self) -> None:
+        self.author = MyUser.objects.create_user(name="First", surname="User", username="User1",
+                                                 password="Password", email="testemail@test.test")
+        self.commenters = [MyUser.objects.create_user(name="Second", surname="User", username=f"User{i}",
+                                                      password="Password", email=f"testemail{i}@test.test")
+                           for i in range(2, 7)]
+        self.post = Post.objects.create(user=self.author, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1",
+                                        time=timezone.now())
+
+    @staticmethod
+    def create_comment(**kwargs):
+        # sqlite locks whole tables, so a writer may have to try again
+        for _ in range(100):
+            try:
+                with transaction.atomic():
+                    return Comment.objects.create(**kwargs)
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                time.sleep(0.01)
+        raise OperationalError('database stayed locked')
+
+    def test_concurrent_comments(self):
+        """
+        No increments are lost when many comments are created at once
+        by threads holding their own copies of the post.
+        """
+        barrier = threading.Barrier(len(self.commenters))
+        errors = []
+
+        def comment(user):
+            try:
+                post = Post.objects.get(pk=self.post.pk)
+                barrier.wait()
+                for i in range(10):
+                    self.create_comment(post=post, user=user, text=f"Comment {i}", time=timezone.now())
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=comment, args=[user]) for user in self.commenters]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.engagement_rate, 50)
@@ -1,4 +1,4 @@
-from ...serializers import TimeSincePostedCalculator
+from ...serializers import TimeSincePostedCalculator, render_time_since_posted
 from django.test import TestCase
 from django.utils.timezone import now
 from datetime import timedelta
@@ -51,3 +51,43 @@ class TimeSincePostedCalculatorTest(TestCase):
     def test_just_now(self):
         self.assertEqual(TimeSincePostedCalculator(now() - timedelta(days=0, seconds=55),
                                                    now()).calculate_string(), 'Just now')
+
+    def test_in_the_future(self):
+        self.assertEqual(TimeSincePostedCalculator(now() + timedelta(seconds=30),
+                                                   now()).calculate_string(), 'Just now')
+
+
+class TimeSincePostedBatchTest(TestCase):
+    """
+    Testing the batched API of TimeSincePostedCalculator and render_time_since_posted
+    """
+    def setUp(self) -> None:
+        self.current = now()
+        self.created_list = [self.current - timedelta(seconds=seconds)
+                             for seconds in (0, 62, 4000, 7400, 90000, 10 ** 6, 4 * 10 ** 6, 3 * 10 ** 7, 10 ** 8)]
+
+    def test_same_as_single(self):
+        self.assertEqual(TimeSincePostedCalculator.calculate_strings(self.created_list, self.current),
+                         [TimeSincePostedCalculator(created, self.current).calculate_string()
+                          for created in self.created_list])
+
+    def test_empty(self):
+        self.assertEqual(TimeSincePostedCalculator.calculate_strings([], self.current), [])
+
+    def test_strings_are_memoized(self):
+        TimeSincePostedCalculator.bucket_string.cache_clear()
+        TimeSincePostedCalculator.calculate_strings([self.current - timedelta(days=2)] * 10, self.current)
+        info = TimeSincePostedCalculator.bucket_string.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 9)
+
+    def test_render_payload(self):
+        payload = {'time_since_posted': self.created_list[2], 'text': 'Post',
+                   'comments': [{'time_since_posted': self.created_list[1],
+                                 'replies': [{'time_since_posted': self.created_list[0]}]}]}
+        rendered = render_time_since_posted(payload, self.current)
+        self.assertEqual(rendered, {'time_since_posted': '1 hour ago', 'text': 'Post',
+                                    'comments': [{'time_since_posted': '1 minute ago',
+                                                  'replies': [{'time_since_posted': 'Just now'}]}]})
+        # the cached payload itself is left untouched
+        self.assertEqual(payload['time_since_posted'], self.created_list[2])
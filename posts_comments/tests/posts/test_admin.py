@@ -0,0 +1,41 @@
+from unittest import mock
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from user.models import MyUser
+from posts_comments.models import Post
+from posts_comments.admin import PostAdmin
+
+
+class PostAdminTest(TestCase):
+    def setUp(self) -> None:
+        self.admin = MyUser.objects.create_user(email='admin@test.test', username='Admin', name='Admin',
+                                                surname='User', password='Password')
+        self.admin.is_active = True
+        self.admin.is_admin = True
+        self.admin.save()
+        self.client.force_login(self.admin)
+        self.post = Post.objects.create(user=self.admin, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1",
+                                        time=timezone.now())
+        self.url = reverse('admin:posts_comments_post_change', args=[self.post.id])
+
+    def test_edit_keeps_counters(self):
+        """
+        Counters increased after the admin loaded the post aren't overwritten.
+        """
+        self.assertNotIn('name="engagement_rate"', self.client.get(self.url).content.decode())
+        save_form = PostAdmin.save_form
+
+        def save_form_during_comments(admin, request, form, change):
+            Post.objects.filter(pk=self.post.pk).update(comment_count=2, engagement_rate=2, hot_score=5)
+            return save_form(admin, request, form, change)
+
+        time = timezone.localtime(self.post.time)
+        with mock.patch.object(PostAdmin, 'save_form', save_form_during_comments):
+            response = self.client.post(self.url, {'user': self.admin.id, 'text': "Edited post",
+                                                   'time_0': time.strftime('%Y-%m-%d'),
+                                                   'time_1': time.strftime('%H:%M:%S')})
+        self.assertEqual(response.status_code, 302)
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.text, self.post.comment_count, self.post.engagement_rate, self.post.hot_score),
+                         ("Edited post", 2, 2, 5))
@@ -1,10 +1,13 @@
 from rest_framework.test import APITestCase
+from django.test import override_settings
 from posts_comments.models import Post, Comment, Reply
 from user.models import MyUser
 from django.utils import timezone
 from datetime import timedelta
 from django.shortcuts import reverse
 from rest_framework import status
+from io import StringIO
+from django.core.management import call_command
 
 # 100%
 
@@ -82,13 +85,55 @@ class DeletePostTest(APITestCase):
 
     def test_user_authorized_to_delete_a_post(self):
         """
-        Making sure that the author can delete their own post and all
-        related comments and replies are deleted too.
+        Making sure that the author can delete their own post - it's hidden
+        right away and removed with all related comments and replies
+        by the reaper.
         """
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
-        url = reverse('api_posts-detail', args=[Post.objects.latest('id').id])
-        response = self.client.delete(url)
+        post = Post.objects.latest('id')
+        url = reverse('api_posts-detail', args=[post.id])
+        with self.assertNumQueries(1):
+            response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('api_posts-list')).data, [])
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+        call_command('reap_deleted_posts', stdout=StringIO())
         self.assertEqual(Post.objects.count(), 0)
         self.assertEqual(Comment.objects.count(), 0)
         self.assertEqual(Reply.objects.count(), 0)
+
+    def test_deleted_post_hidden(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        post = Post.objects.latest('id')
+        comment = Comment.objects.latest('id')
+        self.client.delete(reverse('api_posts-detail', args=[post.id]))
+        responses = [
+            self.client.get(reverse('api_posts-detail', args=[post.id]) + '?comments_limit=5'),
+            self.client.get(reverse('api_posts-basic_info', args=[post.id])),
+            self.client.put(reverse('api_posts-detail', args=[post.id]),
+                            {'text': "Updated Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1"}, format='json'),
+            self.client.post(reverse('api_posts-add_comment', args=[post.id]), {'text': 'Comment'}),
+            self.client.post(reverse('api_comments-add_reply', args=[comment.id]), {'text': 'Reply'}),
+        ]
+        for response in responses:
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('api_posts-profile_feed', kwargs={'user_id': post.user_id}))
+        self.assertEqual(response.data['stats']['post_count'], 0)
+        self.assertEqual(response.data['results'], [])
+
+    def test_other_user_deletes_nothing(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user2}')
+        url = reverse('api_posts-detail', args=[Post.objects.latest('id').id])
+        self.client.delete(url)
+        self.assertFalse(Post.objects.get().is_deleted)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(Reply.objects.count(), 1)
+
+    @override_settings(POST_DETAIL_CACHE={'ENABLED': True, 'ALIAS': 'default', 'TIMEOUT': 60})
+    def test_delete_invalidates_cached_post(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        url = reverse('api_posts-detail', args=[Post.objects.latest('id').id])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.client.delete(url)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
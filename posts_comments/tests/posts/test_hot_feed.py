@@ -0,0 +1,115 @@
+from io import StringIO
+from rest_framework.test import APITestCase
+from rest_framework import status
+from user.models import MyUser
+from posts_comments.models import Post, Comment, Reply
+from posts_comments.hot import calculate_hot_score
+from django.core.management import call_command
+from django.shortcuts import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+
+class HotFeedTest(APITestCase):
+    def setUp(self) -> None:
+        self.url = reverse('api_posts-list') + '?feed=hot'
+        user1_data = {
+            "name": "First",
+            "surname": "User",
+            "username": "User1",
+            "password": "Password",
+            "email": "testemail@test.test"
+        }
+        user2_data = {
+            "name": "Second",
+            "surname": "User",
+            "username": "User2",
+            "password": "Password",
+            "email": "testemail2@test.test"
+        }
+        self.user1 = MyUser.objects.create_user(**user1_data)
+        self.user1.is_active = True
+        self.user1.save()
+        self.user2 = MyUser.objects.create_user(**user2_data)
+        self.user2.is_active = True
+        self.user2.save()
+
+        now = timezone.now()
+        # with the default half-life of 12 hours
+        self.new = Post.objects.create(user=self.user1, text="New post", time=now)
+        self.popular = Post.objects.create(user=self.user1, text="Popular post", time=now - timedelta(days=1),
+                                           engagement_rate=10)
+        self.old = Post.objects.create(user=self.user1, text="Old post", time=now - timedelta(days=3),
+                                       engagement_rate=10)
+
+        token = self.client.post(reverse('token_obtain_pair'), {
+            "email": self.user2.email,
+            "password": "Password"
+        }).data.get("access")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def texts(self, response):
+        return [post['text'] for post in response.data['results']]
+
+    def test_ranked_by_decayed_engagement(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.texts(response), ["Popular post", "New post", "Old post"])
+        self.assertIsNone(response.data['next'])
+        self.assertNotIn('hot_score', response.data['results'][0])
+
+    def test_score_follows_engagement(self):
+        comment = Comment.objects.create(post=self.new, user=self.user2, text="Comment", time=timezone.now())
+        for i in range(3):
+            Reply.objects.create(comment=comment, user=self.user2, text=f"Reply {i}", time=timezone.now())
+        self.new.refresh_from_db()
+        self.assertEqual(self.new.engagement_rate, 4)
+        self.assertAlmostEqual(self.new.hot_score, calculate_hot_score(4, self.new.time))
+        self.assertEqual(self.texts(self.client.get(self.url)), ["New post", "Popular post", "Old post"])
+
+    def test_author_comments_dont_count(self):
+        Comment.objects.create(post=self.new, user=self.user1, text="Comment", time=timezone.now())
+        self.new.refresh_from_db()
+        self.assertAlmostEqual(self.new.hot_score, calculate_hot_score(0, self.new.time))
+
+    def test_edit_keeps_score(self):
+        Post.objects.filter(pk=self.new.pk).update(hot_score=1)
+        post = Post.objects.get(pk=self.new.pk)
+        post.text = "Edited post"
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.hot_score, 1)
+
+    def test_saved_engagement_rate(self):
+        self.new.engagement_rate = 7
+        self.new.save(update_fields=['engagement_rate', 'hot_score'])
+        self.new.refresh_from_db()
+        self.assertAlmostEqual(self.new.hot_score, calculate_hot_score(7, self.new.time))
+
+    def test_bulk_comments(self):
+        self.client.post(reverse('api_posts-bulk_add_comments'),
+                         [{'post': self.old.id, 'text': f'Comment {i}'} for i in range(5)], format='json')
+        self.old.refresh_from_db()
+        self.assertAlmostEqual(self.old.hot_score, calculate_hot_score(15, self.old.time))
+
+    def test_pages(self):
+        response = self.client.get(self.url + '&page_size=2')
+        self.assertEqual(self.texts(response), ["Popular post", "New post"])
+        response = self.client.get(response.data['next'])
+        self.assertEqual(self.texts(response), ["Old post"])
+
+    def test_filtered_and_deleted_posts(self):
+        Post.objects.create(user=self.user2, text="Other post", time=timezone.now())
+        Post.objects.filter(pk=self.popular.pk).update(is_deleted=True)
+        response = self.client.get(self.url + f'&user__id={self.user1.id}')
+        self.assertEqual(self.texts(response), ["New post", "Old post"])
+
+    def test_rebuild_hot_scores(self):
+        Post.objects.update(hot_score=0, engagement_rate=20)
+        out = StringIO()
+        call_command('rebuild_hot_scores', '--batch-size', '2', stdout=out)
+        self.assertIn('Updated hot scores of 3 posts', out.getvalue())
+        for post in Post.objects.all():
+            self.assertAlmostEqual(post.hot_score, calculate_hot_score(20, post.time))
+        self.assertEqual(self.texts(self.client.get(self.url)), ["New post", "Popular post", "Old post"])
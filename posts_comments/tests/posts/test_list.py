@@ -1,7 +1,10 @@
+import json
+from unittest import mock
 from rest_framework.test import APITestCase
 from rest_framework import status
 from user.models import MyUser
 from posts_comments.models import Post
+from posts_comments.views import PostViewSet
 from django.shortcuts import reverse
 from django.utils import timezone
 from datetime import timedelta
@@ -72,7 +75,8 @@ class ListPostsTest(APITestCase):
                     "id": MyUser.objects.latest("id").id
                 },
                 "time_since_posted": "2 days ago",
-                "engagement_rate": 0
+                "engagement_rate": 0,
+                "comment_count": 0
             },
             {
                 "id": Post.objects.latest("id").id - 1,
@@ -82,7 +86,8 @@ class ListPostsTest(APITestCase):
                     "id": MyUser.objects.latest("id").id - 1
                 },
                 "time_since_posted": "3 days ago",
-                "engagement_rate": 6
+                "engagement_rate": 6,
+                "comment_count": 0
             }
         ]
         self.assertEqual(response.data, expected_data)
@@ -103,7 +108,144 @@ class ListPostsTest(APITestCase):
                     "id": MyUser.objects.latest("id").id
                 },
                 "time_since_posted": "2 days ago",
-                "engagement_rate": 0
+                "engagement_rate": 0,
+                "comment_count": 0
             }
         ]
         self.assertEqual(response.data, expected_data)
+
+    def test_streamed_posts(self):
+        """
+        The streaming mode returns exactly the same JSON as the regular
+        response, also when posts are filtered.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        for query in ("", f"?user__id={MyUser.objects.latest('id').id}"):
+            response = self.client.get(self.url + query)
+            streamed_query = f"{query}&stream=true" if query else "?stream=true"
+            streamed_response = self.client.get(self.url + streamed_query)
+            self.assertEqual(streamed_response.status_code, status.HTTP_200_OK)
+            self.assertTrue(streamed_response.streaming)
+            self.assertEqual(streamed_response['Content-Type'], 'application/json')
+            self.assertEqual(b''.join(streamed_response.streaming_content), response.content)
+
+    def test_streamed_line_separators(self):
+        """
+        U+2028 and U+2029 are escaped the same way as by JSONRenderer.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        Post.objects.filter(pk=Post.objects.latest('id').id).update(text="Line\u2028separator\u2029ńó")
+        response = self.client.get(self.url)
+        streamed_response = self.client.get(f"{self.url}?stream=true")
+        self.assertIn(b'Line\\u2028separator\\u2029', response.content)
+        self.assertEqual(b''.join(streamed_response.streaming_content), response.content)
+
+    def test_streamed_posts_in_many_chunks(self):
+        """
+        Posts split over several chunks still form one valid JSON array.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        with mock.patch.object(PostViewSet, 'stream_chunk_size', 1):
+            response = self.client.get(f"{self.url}?stream=true")
+            chunks = list(response.streaming_content)
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual([post['id'] for post in json.loads(b''.join(chunks))],
+                         [Post.objects.latest("id").id, Post.objects.latest("id").id - 1])
+
+
+class ListPostsCursorPaginationTest(APITestCase):
+    def setUp(self) -> None:
+        self.url = reverse('api_posts-list')
+        user1_data = {
+            "name": "First",
+            "surname": "User",
+            "username": "User1",
+            "password": "Password",
+            "email": "testemail@test.test"
+        }
+        user2_data = {
+            "name": "Second",
+            "surname": "User",
+            "username": "User2",
+            "password": "Password",
+            "email": "testemail2@test.test"
+        }
+
+        token_url = reverse('token_obtain_pair')
+
+        self.user1 = MyUser.objects.create_user(**user1_data)
+        self.user1.is_active = True
+        self.user1.save()
+
+        self.user2 = MyUser.objects.create_user(**user2_data)
+        self.user2.is_active = True
+        self.user2.save()
+
+        self.now = timezone.now()
+        for i in range(5):
+            Post.objects.create(user=self.user1, text=f"Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr {i}",
+                                time=self.now - timedelta(days=i))
+            Post.objects.create(user=self.user2, text=f"Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr {i}",
+                                time=self.now - timedelta(days=i))
+
+        token = self.client.post(token_url, {
+            "email": self.user1.email,
+            "password": "Password"
+        }).data.get("access")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def collect_ids(self, url):
+        ids = []
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(post['id'] for post in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_pages_follow_time_and_id_ordering(self):
+        """
+        Walking through all pages returns every post exactly once,
+        newest first and with posts of the same time ordered by id.
+        """
+        response = self.client.get(f"{self.url}?page_size=3")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next'])
+        expected_ids = list(Post.objects.order_by('-time', '-id').values_list('id', flat=True))
+        self.assertEqual(self.collect_ids(f"{self.url}?page_size=3"), expected_ids)
+
+    def test_new_posts_do_not_shift_pages(self):
+        """
+        Posts created while a client is scrolling are neither duplicated
+        nor cause other posts to be skipped.
+        """
+        response = self.client.get(f"{self.url}?page_size=4")
+        first_page = [post['id'] for post in response.data['results']]
+        for i in range(3):
+            Post.objects.create(user=self.user2, text="Newer numberrrrrrrrrrrrrrrrrrrrrrrrrrrr",
+                                time=self.now + timedelta(minutes=i + 1))
+        rest = self.collect_ids(response.data['next'])
+        expected_ids = list(Post.objects.filter(time__lte=self.now).order_by('-time', '-id')
+                            .values_list('id', flat=True))
+        self.assertEqual(first_page + rest, expected_ids)
+
+    def test_filtered_pages(self):
+        """
+        Cursor pagination works together with filtering by user id.
+        """
+        ids = self.collect_ids(f"{self.url}?user__id={self.user2.id}&page_size=2")
+        expected_ids = list(Post.objects.filter(user=self.user2).order_by('-time', '-id')
+                            .values_list('id', flat=True))
+        self.assertEqual(ids, expected_ids)
+
+    def test_last_page_has_no_next_link(self):
+        response = self.client.get(f"{self.url}?page_size=10")
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertIsNone(response.data['next'])
+
+    def test_invalid_cursor_404_response(self):
+        response = self.client.get(f"{self.url}?cursor=invalid")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(f"{self.url}?cursor=WyJub3QgYSBkYXRlIiwgMV0=")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
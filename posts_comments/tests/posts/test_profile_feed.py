@@ -0,0 +1,95 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from user.models import MyUser
+from posts_comments.models import Post
+from django.shortcuts import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+
+class ProfileFeedTest(APITestCase):
+    def setUp(self) -> None:
+        user1_data = {
+            "name": "First",
+            "surname": "User",
+            "username": "User1",
+            "password": "Password",
+            "email": "testemail@test.test"
+        }
+        user2_data = {
+            "name": "Second",
+            "surname": "User",
+            "username": "User2",
+            "password": "Password",
+            "email": "testemail2@test.test"
+        }
+        user3_data = {
+            "name": "Third",
+            "surname": "User",
+            "username": "User3",
+            "password": "Password",
+            "email": "testemail3@test.test"
+        }
+
+        self.user1 = MyUser.objects.create_user(**user1_data)
+        self.user1.is_active = True
+        self.user1.save()
+        self.user2 = MyUser.objects.create_user(**user2_data)
+        self.user2.is_active = True
+        self.user2.save()
+        self.user3 = MyUser.objects.create_user(**user3_data)
+
+        now = timezone.now()
+        for i in range(5):
+            Post.objects.create(user=self.user1, text=f"Post {i}", time=now - timedelta(days=i), engagement_rate=i)
+        Post.objects.create(user=self.user2, text="Other post", time=now, engagement_rate=10)
+        self.url = reverse('api_posts-profile_feed', kwargs={'user_id': self.user1.id})
+
+        token = self.client.post(reverse('token_obtain_pair'), {
+            "email": self.user1.email,
+            "password": "Password"
+        }).data.get("access")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_unauthorized_user(self):
+        self.client.credentials()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_stats_and_posts(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user'], {'username': 'User1', 'id': self.user1.id})
+        self.assertEqual(response.data['stats'], {'post_count': 5, 'total_engagement': 10})
+        self.assertEqual([post['text'] for post in response.data['results']],
+                         [f"Post {i}" for i in range(5)])
+        self.assertIsNone(response.data['next'])
+
+    def test_same_posts_as_filtered_list(self):
+        listed = self.client.get(reverse('api_posts-list') + f'?user__id={self.user1.id}&page_size=20')
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'], listed.data['results'])
+
+    def test_pages(self):
+        response = self.client.get(self.url + '?page_size=2')
+        self.assertEqual([post['text'] for post in response.data['results']], ["Post 0", "Post 1"])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([post['text'] for post in response.data['results']], ["Post 2", "Post 3"])
+        self.assertEqual(response.data['stats']['post_count'], 5)
+
+    def test_user_without_posts(self):
+        self.user3.is_active = True
+        self.user3.save()
+        response = self.client.get(reverse('api_posts-profile_feed', kwargs={'user_id': self.user3.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stats'], {'post_count': 0, 'total_engagement': 0})
+        self.assertEqual(response.data['results'], [])
+
+    def test_inactive_and_nonexistent_user(self):
+        response = self.client.get(reverse('api_posts-profile_feed', kwargs={'user_id': self.user3.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['message'], 'This user is not active.')
+        response = self.client.get(reverse('api_posts-profile_feed', kwargs={'user_id': self.user3.id + 1}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['message'], 'This user does not exist.')
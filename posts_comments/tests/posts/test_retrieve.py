@@ -148,3 +148,34 @@ class RetrievePostTest(APITestCase):
             ]
         }
         self.assertEqual(response.data, expected_response)
+
+    def test_number_of_queries(self):
+        """
+        The response is built with the same number of queries no matter how
+        many comments and replies there are: one for the post, one for comments
+        and one for replies. The authenticated user comes from the token.
+        """
+        post = Post.objects.latest('id')
+        users = MyUser.objects.all()
+        for i in range(20):
+            comment = Comment.objects.create(post=post, user=users[i % 2], time=timezone.now(),
+                                             text=f"Comment {i}")
+            for j in range(5):
+                Reply.objects.create(comment=comment, user=users[j % 2], time=timezone.now(),
+                                     text=f"Reply {j}")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('api_posts-detail', args=[post.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['comments']), 22)
+        self.assertEqual(sum(len(comment['replies']) for comment in response.data['comments']), 102)
+
+    def test_number_of_queries_post_does_not_exist(self):
+        """
+        Nothing is prefetched for a post that doesn't exist.
+        """
+        url = reverse('api_posts-detail', args=[Post.objects.latest('id').id + 1])
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
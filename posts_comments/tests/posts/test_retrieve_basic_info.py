@@ -54,7 +54,8 @@ class CreatePostTest(APITestCase):
                 "id": MyUser.objects.latest("id").id
             },
             "text": "Valid post valid post valid post.",
-            "time_since_posted": "1 hour ago"
+            "time_since_posted": "1 hour ago",
+            "comment_count": 0
         }
         self.assertEqual(response.data, expected_data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
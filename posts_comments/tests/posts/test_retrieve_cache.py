@@ -0,0 +1,136 @@
+from unittest import mock
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from user.models import MyUser
+from posts_comments.models import Post, Comment, Reply
+from posts_comments.cache import post_detail_cache
+from django.utils import timezone
+from datetime import timedelta
+
+
+@override_settings(POST_DETAIL_CACHE={'ENABLED': True, 'ALIAS': 'default', 'TIMEOUT': 60})
+class RetrievePostCacheTest(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        user1_data = {
+            "name": "First",
+            "surname": "User",
+            "username": "User1",
+            "password": "Password",
+            "email": "testemail@test.test"
+        }
+        token_url = reverse('token_obtain_pair')
+
+        self.user1 = MyUser.objects.create_user(**user1_data)
+        self.user1.is_active = True
+        self.user1.save()
+
+        self.post = Post.objects.create(user=self.user1, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1",
+                                        time=timezone.now() - timedelta(days=3))
+        self.comment = Comment.objects.create(post=self.post, user=self.user1, text="Comment 1",
+                                              time=timezone.now() - timedelta(days=2))
+        self.url = reverse('api_posts-detail', args=[self.post.id])
+
+        self.token_user1 = self.client.post(token_url, {
+            "email": self.user1.email,
+            "password": "Password"
+        }).data.get("access")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+
+    def test_second_request_served_from_cache(self):
+        """
+        The db isn't touched at all once the tree is cached.
+        """
+        response = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(self.url)
+        self.assertEqual(cached_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(cached_response.data, response.data)
+
+    def test_time_since_posted_is_fresh(self):
+        """
+        The cache keeps raw timestamps, the human-readable time is calculated
+        for every response.
+        """
+        self.client.get(self.url)
+        self.assertEqual(post_detail_cache.get(self.post.id)[0]['time_since_posted'], self.post.time)
+        later = timezone.now() + timedelta(days=2)
+        with mock.patch('posts_comments.views.timezone.now', return_value=later):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['time_since_posted'], "5 days ago")
+        self.assertEqual(response.data['comments'][0]['time_since_posted'], "4 days ago")
+
+    def test_invalidated_by_new_comment_and_reply(self):
+        self.client.get(self.url)
+        self.client.post(reverse('api_posts-add_comment', args=[self.post.id]), {'text': "Comment 2"}, format='json')
+        response = self.client.get(self.url)
+        self.assertEqual([comment['text'] for comment in response.data['comments']], ["Comment 1", "Comment 2"])
+        self.client.post(reverse('api_comments-add_reply', args=[self.comment.id]), {'text': "Reply 1"},
+                         format='json')
+        response = self.client.get(self.url)
+        self.assertEqual([reply['text'] for reply in response.data['comments'][0]['replies']], ["Reply 1"])
+
+    def test_invalidated_by_post_update(self):
+        self.client.get(self.url)
+        self.client.put(self.url, {'text': "Updated post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1"}, format='json')
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['text'], "Updated post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1")
+
+    def test_invalidated_by_deletions(self):
+        reply = Reply.objects.create(comment=self.comment, user=self.user1, text="Reply 1", time=timezone.now())
+        self.client.get(self.url)
+        reply.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['comments'][0]['replies'], [])
+        self.comment.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['comments'], [])
+        self.client.delete(self.url)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_pk_404_response(self):
+        response = self.client.get(reverse('api_posts-detail', args=['first']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalidation_during_db_read(self):
+        """
+        A tree read from the db before an invalidation isn't served
+        after it, even though it's stored later.
+        """
+        _, generation = post_detail_cache.get(self.post.id)
+        post_detail_cache.invalidate(self.post.id)
+        post_detail_cache.set(self.post.id, {'text': "Stale"}, generation)
+        self.assertEqual(post_detail_cache.get(self.post.id)[0], None)
+        self.assertEqual(self.client.get(self.url).data['text'], self.post.text)
+
+    def test_invalidated_by_username_change(self):
+        user2 = MyUser.objects.create_user(name="Second", surname="User", username="User2",
+                                           password="Password", email="testemail2@test.test")
+        Reply.objects.create(comment=self.comment, user=user2, text="Reply 1", time=timezone.now())
+        self.client.get(self.url)
+        user2.username = "Renamed"
+        user2.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['comments'][0]['replies'][0]['user']['username'], "Renamed")
+        self.user1.username = "Renamed1"
+        self.user1.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['user']['username'], "Renamed1")
+
+    def test_password_change_keeps_cache(self):
+        self.client.get(self.url)
+        self.user1.set_password("Password2")
+        self.user1.save(update_fields=['password'])
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    @override_settings(POST_DETAIL_CACHE={'ENABLED': False, 'ALIAS': 'default', 'TIMEOUT': 60})
+    def test_disabled(self):
+        self.client.get(self.url)
+        self.assertEqual(post_detail_cache.get(self.post.id), (None, None))
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
@@ -0,0 +1,110 @@
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from rest_framework import status
+from user.models import MyUser
+from posts_comments.models import Post, Comment, Reply
+from django.utils import timezone
+from datetime import timedelta
+
+
+class RetrievePostPreviewTest(APITestCase):
+    def setUp(self) -> None:
+        user1_data = {
+            "name": "First",
+            "surname": "User",
+            "username": "User1",
+            "password": "Password",
+            "email": "testemail@test.test"
+        }
+        user2_data = {
+            "name": "Second",
+            "surname": "User",
+            "username": "User2",
+            "password": "Password",
+            "email": "testemail2@test.test"
+        }
+        token_url = reverse('token_obtain_pair')
+
+        self.user1 = MyUser.objects.create_user(**user1_data)
+        self.user1.is_active = True
+        self.user1.save()
+
+        self.user2 = MyUser.objects.create_user(**user2_data)
+        self.user2.is_active = True
+        self.user2.save()
+
+        now = timezone.now()
+        self.post = Post.objects.create(user=self.user1, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1",
+                                        time=now - timedelta(days=3))
+        self.comments = []
+        for i in range(5):
+            comment = Comment.objects.create(post=self.post, user=self.user2, time=now - timedelta(days=2, hours=-i),
+                                             text=f"Comment {i}")
+            self.comments.append(comment)
+            for j in range(i):
+                Reply.objects.create(comment=comment, user=self.user1, time=now - timedelta(days=1, hours=-j),
+                                     text=f"Reply {j}")
+        self.url = reverse('api_posts-detail', args=[self.post.id])
+
+        token = self.client.post(token_url, {
+            "email": self.user1.email,
+            "password": "Password"
+        }).data.get("access")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_limited_comments_and_replies(self):
+        """
+        Only the oldest comments with their oldest replies are returned,
+        together with the total counts.
+        """
+        response = self.client.get(f"{self.url}?comments_limit=4&replies_limit=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['text'], "Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1")
+        self.assertEqual(response.data['comment_count'], 5)
+        self.assertEqual([comment['text'] for comment in response.data['comments']],
+                         ["Comment 0", "Comment 1", "Comment 2", "Comment 3"])
+        self.assertEqual([comment['reply_count'] for comment in response.data['comments']], [0, 1, 2, 3])
+        self.assertEqual([[reply['text'] for reply in comment['replies']] for comment in response.data['comments']],
+                         [[], ["Reply 0"], ["Reply 0", "Reply 1"], ["Reply 0", "Reply 1"]])
+        self.assertEqual([comment['replies_next'] is None for comment in response.data['comments']],
+                         [True, True, True, False])
+
+    def test_next_links_continue_the_thread(self):
+        """
+        The links in the response lead to the remaining comments and replies.
+        """
+        response = self.client.get(f"{self.url}?comments_limit=3&replies_limit=1")
+        comments = self.client.get(response.data['comments_next']).data
+        self.assertEqual([comment['text'] for comment in comments['results']], ["Comment 3", "Comment 4"])
+        self.assertIsNone(comments['next'])
+        replies = self.client.get(response.data['comments'][2]['replies_next']).data
+        self.assertEqual([reply['text'] for reply in replies['results']], ["Reply 1"])
+
+    def test_whole_thread_within_limits(self):
+        response = self.client.get(f"{self.url}?comments_limit=10&replies_limit=10")
+        self.assertEqual(len(response.data['comments']), 5)
+        self.assertIsNone(response.data['comments_next'])
+        self.assertTrue(all(comment['replies_next'] is None for comment in response.data['comments']))
+
+    def test_number_of_queries(self):
+        """
+        The number of queries doesn't depend on the size of the thread.
+        """
+        with self.assertNumQueries(3):
+            self.client.get(f"{self.url}?comments_limit=10&replies_limit=10")
+        for comment in self.comments:
+            for j in range(20):
+                Reply.objects.create(comment=comment, user=self.user2, time=timezone.now(), text="Reply")
+        with self.assertNumQueries(3):
+            response = self.client.get(f"{self.url}?comments_limit=10&replies_limit=10")
+        self.assertEqual(sum(len(comment['replies']) for comment in response.data['comments']), 50)
+
+    def test_post_does_not_exist_404_response(self):
+        response = self.client.get(f"{reverse('api_posts-detail', args=[self.post.id + 1])}?comments_limit=3")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, {'message': "This post doesn't exist"})
+
+    def test_invalid_pk_404_response(self):
+        response = self.client.get(f"{reverse('api_posts-detail', args=['first'])}?comments_limit=3")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, {'message': "This post doesn't exist"})
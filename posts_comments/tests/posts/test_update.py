@@ -1,4 +1,5 @@
 from rest_framework.test import APITestCase
+from django.test import override_settings
 from user.models import MyUser
 from posts_comments.models import Post
 from django.shortcuts import reverse
@@ -117,3 +118,32 @@ class UpdatePostTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.post.refresh_from_db()
         self.assertEqual(self.post.text, "Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1")
+
+    def test_update_queries(self):
+        """
+        The author check is a part of the UPDATE, the post is looked up
+        only when nothing was updated.
+        """
+        url = reverse('api_posts-detail', args=[self.post.id])
+        data = {
+            'text': "Updated Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1"
+        }
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        with self.assertNumQueries(1):
+            response = self.client.put(url, data, format='json')
+        self.assertEqual(response.data, data)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user2}')
+        with self.assertNumQueries(2):
+            response = self.client.put(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(POST_DETAIL_CACHE={'ENABLED': True, 'ALIAS': 'default', 'TIMEOUT': 60})
+    def test_update_invalidates_cached_post(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        url = reverse('api_posts-detail', args=[self.post.id])
+        self.client.get(url)
+        data = {
+            'text': "Updated Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1"
+        }
+        self.client.put(url, data, format='json')
+        self.assertEqual(self.client.get(url).data['text'], data['text'])
@@ -0,0 +1,83 @@
+from rest_framework.test import APITestCase
+from user.models import MyUser
+from posts_comments.models import Post, Comment, Reply
+from django.shortcuts import reverse
+from django.utils import timezone
+from rest_framework import status
+
+
+class BulkCreateRepliesTest(APITestCase):
+    def setUp(self) -> None:
+        user1_data = {
+            "name": "First",
+            "surname": "User",
+            "username": "User1",
+            "password": "Password",
+            "email": "testemail@test.test"
+        }
+        user2_data = {
+            "name": "Second",
+            "surname": "User",
+            "username": "User2",
+            "password": "Password",
+            "email": "testemail2@test.test"
+        }
+        token_url = reverse('token_obtain_pair')
+
+        self.user1 = MyUser.objects.create_user(**user1_data)
+        self.user1.is_active = True
+        self.user1.save()
+
+        self.user2 = MyUser.objects.create_user(**user2_data)
+        self.user2.is_active = True
+        self.user2.save()
+
+        self.post1 = Post.objects.create(user=self.user1, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrrr 1",
+                                         time=timezone.now())
+        self.post2 = Post.objects.create(user=self.user2, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrrr 2",
+                                         time=timezone.now())
+        self.comment1 = Comment.objects.create(post=self.post1, user=self.user1, text="Comment 1", time=timezone.now())
+        self.comment2 = Comment.objects.create(post=self.post1, user=self.user1, text="Comment 2", time=timezone.now())
+        self.comment3 = Comment.objects.create(post=self.post2, user=self.user1, text="Comment 3", time=timezone.now())
+        Post.objects.update(engagement_rate=0)
+        self.url = reverse('api_comments-bulk_add_replies')
+
+        token = self.client.post(token_url, {
+            "email": self.user2.email,
+            "password": "Password"
+        }).data.get("access")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_create_many(self):
+        data = [{'comment': self.comment1.id, 'text': f'Reply {i}'} for i in range(3)] + \
+               [{'comment': self.comment2.id, 'text': 'Reply'}, {'comment': self.comment3.id, 'text': 'Own reply'}]
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([result['text'] for result in response.data['results']], [item['text'] for item in data])
+        self.assertEqual(list(Comment.objects.order_by('id').values_list('reply_count', flat=True)), [3, 1, 1])
+        self.post1.refresh_from_db()
+        self.post2.refresh_from_db()
+        self.assertEqual(self.post1.engagement_rate, 4)
+        # replies of the author of the post don't count as engagement
+        self.assertEqual(self.post2.engagement_rate, 0)
+        self.assertEqual(Reply.objects.filter(user=self.user2).count(), 5)
+
+    def test_per_item_errors(self):
+        data = [
+            {'comment': self.comment1.id, 'text': 'Reply'},
+            {'comment': self.comment1.id, 'text': ''},
+            {'comment': 'first', 'text': 'Reply'},
+        ]
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data['results']
+        self.assertEqual(results[0]['text'], 'Reply')
+        self.assertIn('text', results[1]['errors'])
+        self.assertEqual(results[2]['errors'], {'comment': ["This comment doesn't exist"]})
+        self.assertEqual(Reply.objects.count(), 1)
+
+    def test_comment_under_deleted_post(self):
+        Post.objects.filter(pk=self.post1.pk).update(is_deleted=True)
+        response = self.client.post(self.url, [{'comment': self.comment1.id, 'text': 'Reply'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['results'][0]['errors'], {'comment': ["This comment doesn't exist"]})
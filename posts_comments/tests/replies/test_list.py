@@ -0,0 +1,81 @@
+from rest_framework.test import APITestCase
+from user.models import MyUser
+from posts_comments.models import Post, Comment, Reply
+from django.shortcuts import reverse
+from django.utils import timezone
+from datetime import timedelta
+from rest_framework import status
+
+
+class ListRepliesTest(APITestCase):
+    def setUp(self) -> None:
+        user1_data = {
+            "name": "First",
+            "surname": "User",
+            "username": "User1",
+            "password": "Password",
+            "email": "testemail@test.test"
+        }
+        token_url = reverse('token_obtain_pair')
+
+        self.user1 = MyUser.objects.create_user(**user1_data)
+        self.user1.is_active = True
+        self.user1.save()
+
+        now = timezone.now()
+        post = Post.objects.create(user=self.user1, text="Post numberrrrrrrrrrrrrrrrrrrrrrrrrrrr 1", time=now)
+        self.comment = Comment.objects.create(post=post, user=self.user1, time=now, text="Comment 1")
+        self.empty_comment = Comment.objects.create(post=post, user=self.user1, time=now, text="Comment 2")
+        for i in range(5):
+            Reply.objects.create(comment=self.comment, user=self.user1, time=now + timedelta(minutes=i),
+                                 text=f"Reply {i}")
+
+        self.token_user1 = self.client.post(token_url, {
+            "email": self.user1.email,
+            "password": "Password"
+        }).data.get("access")
+
+    def test_unauthorized_user(self):
+        """
+        Making sure that users without a token cannot access the endpoint.
+        """
+        self.client.credentials()
+        response = self.client.get(reverse('api_comments-replies', args=[self.comment.id]))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_pages_of_replies(self):
+        """
+        Following the next links returns all replies oldest first.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        response = self.client.get(f"{reverse('api_comments-replies', args=[self.comment.id])}?page_size=3")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([reply['text'] for reply in response.data['results']], ["Reply 0", "Reply 1", "Reply 2"])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([reply['text'] for reply in response.data['results']], ["Reply 3", "Reply 4"])
+        self.assertIsNone(response.data['next'])
+
+    def test_comment_without_replies(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        response = self.client.get(reverse('api_comments-replies', args=[self.empty_comment.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'next': None, 'results': []})
+
+    def test_comment_does_not_exist_404_response(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        response = self.client.get(reverse('api_comments-replies', args=[self.empty_comment.id + 1]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, {'message': "This comment doesn't exist"})
+
+    def test_comment_under_deleted_post_404_response(self):
+        Post.objects.filter(pk=self.comment.post_id).update(is_deleted=True)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        response = self.client.get(reverse('api_comments-replies', args=[self.comment.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, {'message': "This comment doesn't exist"})
+
+    def test_invalid_pk_404_response(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token_user1}')
+        response = self.client.get(reverse('api_comments-replies', args=['first']))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data, {'message': "This comment doesn't exist"})
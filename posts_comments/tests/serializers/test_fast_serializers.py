@@ -0,0 +1,62 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from user.models import MyUser
+from posts_comments.models import Post, Comment, Reply
+from posts_comments.serializers import PostListSerializer, PostRetrieveSerializer, ReplyListSerializer
+from posts_comments.fast_serializers import POST_LIST_FIELDS, POST_TREE_FIELDS, COMMENT_FIELDS, REPLY_FIELDS, \
+    serialize_rows, serialize_post_row, serialize_reply_row, serialize_post_tree
+
+
+class FastSerializersTest(TestCase):
+    """
+    The fast path must render exactly the same JSON as DRF serializers
+    """
+    def setUp(self) -> None:
+        self.now = timezone.now()
+        user1 = MyUser.objects.create_user(name="First", surname="User", username="User1",
+                                           password="Password", email="testemail@test.test")
+        user2 = MyUser.objects.create_user(name="Second", surname="User", username="Użytkownik",
+                                           password="Password", email="testemail2@test.test")
+        for i in range(3):
+            post = Post.objects.create(user=user1, text=f"Post \"numberrrrrrrrrrrrrrrrrrrrrrrrrrr\" ✓ {i}",
+                                       time=self.now - timedelta(days=i * 40))
+            for j in range(i):
+                comment = Comment.objects.create(post=post, user=user2, text=f"Comment {j}\n",
+                                                 time=self.now - timedelta(hours=j))
+                Reply.objects.create(comment=comment, user=user1, text="Reply", time=self.now - timedelta(minutes=j))
+        self.renderer = JSONRenderer()
+
+    def test_post_list(self):
+        drf = self.renderer.render(PostListSerializer(Post.objects.select_related('user'), many=True).data)
+        fast = self.renderer.render(serialize_rows(serialize_post_row, Post.objects.values(*POST_LIST_FIELDS),
+                                                   timezone.now()))
+        self.assertEqual(fast, drf)
+
+    def test_replies(self):
+        drf = self.renderer.render(ReplyListSerializer(Reply.objects.select_related('user'), many=True).data)
+        fast = self.renderer.render(serialize_rows(serialize_reply_row, Reply.objects.values(*REPLY_FIELDS),
+                                                   timezone.now()))
+        self.assertEqual(fast, drf)
+
+    def test_post_tree(self):
+        for post in Post.objects.all():
+            drf = self.renderer.render(PostRetrieveSerializer(post).data)
+            fast = self.renderer.render(serialize_post_tree(Post.objects.filter(pk=post.pk).values(*POST_TREE_FIELDS)[0],
+                                                            Comment.objects.filter(post=post).values(*COMMENT_FIELDS),
+                                                            Reply.objects.filter(comment__post=post).values(*REPLY_FIELDS),
+                                                            timezone.now()))
+            self.assertEqual(fast, drf)
+
+    def test_raw_timestamps(self):
+        row = Post.objects.values(*POST_LIST_FIELDS).first()
+        self.assertEqual(serialize_rows(serialize_post_row, [row], None)[0]['time_since_posted'], row['time'])
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_serializers', posts=50, repeat=1, stdout=out)
+        self.assertIn('50 posts', out.getvalue())
+        self.assertIn('identical output', out.getvalue())
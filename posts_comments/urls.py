@@ -9,6 +9,7 @@ comments_router.register(prefix='', viewset=CommentViewSet, basename='api_commen
 # prefix is for the url, basename for the url name
 
 urlpatterns = [
-    path('', include(posts_router.urls)),
-    path('comments/', include(comments_router.urls))
+    # comments go first, otherwise 'comments/' would be matched as a post detail
+    path('comments/', include(comments_router.urls)),
+    path('', include(posts_router.urls))
 ]
@@ -1,42 +1,161 @@
 from rest_framework import viewsets, status
-from .serializers import PostListSerializer, PostCreateUpdateSerializer, PostRetrieveSerializer, \
-    CommentCreateUpdateSerializer, ReplyCreateUpdateSerializer, BasicInfoPostSerializer
+from .serializers import PostListSerializer, PostCreateUpdateSerializer, \
+    CommentCreateUpdateSerializer, ReplyCreateUpdateSerializer, BasicInfoPostSerializer, \
+    PostPreviewRetrieveSerializer, CommentPreviewSerializer, render_time_since_posted
 from .models import Post, Comment, Reply
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Prefetch
+from django.db.models import Count, Sum, Q
+from django.db.models.functions import Coalesce
+from django.db.models.expressions import RawSQL
+from django.contrib.auth import get_user_model
+from user.serializers import BasicInfoUserSerializer
+from .pagination import PostFeedPagination, HotFeedPagination, ProfileFeedPagination, ThreadPagination
+from .streaming import StreamingJSONListResponse
+from .cache import post_detail_cache
+from .bulk import bulk_add_comments, bulk_add_replies
+from .fast_serializers import POST_LIST_FIELDS, POST_TREE_FIELDS, COMMENT_FIELDS, REPLY_FIELDS, \
+    serialize_rows, serialize_post_row, serialize_reply_row, serialize_post_tree
+from django.utils import timezone
+
+
+def get_limit(request, name, default, maximum):
+    """
+    Reads a non-negative integer from the query params, capped at `maximum`
+    """
+    try:
+        value = int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+    return min(max(value, 0), maximum)
+
+
+def get_first_replies(comment_ids, limit):
+    """
+    Queryset of the `limit` oldest replies of each of the given comments.
+    Their ids come from a UNION ALL of one limited query per comment, so at
+    most `limit` rows of each thread are read, however big it gets.
+    """
+    parts = [Reply.objects.filter(comment_id=comment_id).order_by('time', 'id').values('pk')[:limit]
+             .query.sql_with_params() for comment_id in comment_ids]
+    # not every db allows LIMIT in parts of a UNION, derived tables work everywhere
+    sql = ' UNION ALL '.join(f'SELECT * FROM ({part_sql}) first_replies_{index}'
+                             for index, (part_sql, _) in enumerate(parts))
+    params = [param for _, part_params in parts for param in part_params]
+    return Reply.objects.select_related('user').filter(pk__in=RawSQL(sql, params)).order_by('time', 'id')
+
+
+def attach_first_replies(comments, limit):
+    """
+    Sets `first_replies` of every comment to its `limit` oldest replies,
+    which are fetched with a single query
+    """
+    comments_by_id = {comment.id: comment for comment in comments}
+    for comment in comments:
+        comment.first_replies = []
+    if not comments or not limit:
+        return
+    for reply in get_first_replies(list(comments_by_id), limit):
+        comments_by_id[reply.comment_id].first_replies.append(reply)
+
+
+def get_bulk_response(request, add_many, max_items):
+    """
+    Adds the items from the request with `add_many`: 201 if all of them were
+    added, 207 if only some of them, 400 if none
+    """
+    items = request.data
+    if not isinstance(items, list) or not items:
+        return Response({'message': "A non-empty list must be provided"}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > max_items:
+        return Response({'message': f"At most {max_items} items can be added at once"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    results = add_many(request.user, items)
+    failed = sum('errors' in result for result in results)
+    if not failed:
+        response_status = status.HTTP_201_CREATED
+    elif failed < len(results):
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_400_BAD_REQUEST
+    return Response({'results': results}, status=response_status)
 
 
 class PostViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
-    queryset = Post.objects.all()
+    queryset = Post.objects.visible()
     serializer_class = PostListSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['user__id']
+    pagination_class = PostFeedPagination
+    stream_chunk_size = 500
+    max_comments_limit = 100
+    max_replies_limit = 50
+    default_replies_limit = 3
+    max_bulk_items = 1000
 
     def list(self, request, *args, **kwargs):
         """
-        Listing all posts or listing filtered posts
+        Listing all posts or listing filtered posts. Passing `page_size`
+        or `cursor` switches to cursor pagination, `stream=true` streams
+        the whole list in chunks (meant for bulk exports). `feed=hot` ranks
+        posts by engagement decayed with their age, always page by page.
         """
-        queryset = self.filter_queryset(Post.objects.select_related('user'))
-        serializer = PostListSerializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset = self.filter_queryset(Post.objects.visible()).values(*POST_LIST_FIELDS)
+        current = timezone.now()
+        if request.query_params.get('feed') == 'hot':
+            paginator = HotFeedPagination()
+            page = paginator.paginate_queryset(queryset.values(*POST_LIST_FIELDS, 'hot_score'), request, view=self)
+            return paginator.get_paginated_response(serialize_rows(serialize_post_row, page, current))
+        if request.query_params.get('stream') == 'true':
+            return StreamingJSONListResponse(queryset, lambda rows: serialize_rows(serialize_post_row, rows, current),
+                                             chunk_size=self.stream_chunk_size)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialize_rows(serialize_post_row, page, current))
+        return Response(serialize_rows(serialize_post_row, queryset, current))
 
     def retrieve(self, request, pk=None, *args, **kwargs):
         """
-        Retrieving all information about a post, optimising performance of the db
+        Retrieving all information about a post, optimising performance of the db:
+        one query for the post and its author, one for the comments and one for
+        the replies (with their authors). With POST_DETAIL_CACHE enabled the result
+        is cached until the post, its comments, replies or their authors change.
+        Passing `comments_limit` (and optionally `replies_limit`) returns only
+        the oldest comments with their oldest replies, so that the cost of
+        the request doesn't depend on the size of the thread.
         """
         try:
-            post = Post.objects.get(pk=pk)
+            pk = int(pk)
+        except ValueError:
+            return Response({'message': "This post doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
+        if 'comments_limit' in request.query_params:
+            return self.retrieve_preview(request, pk)
+        payload, generation = post_detail_cache.get(pk)
+        if payload is None:
+            post_row = Post.objects.visible().filter(pk=pk).values(*POST_TREE_FIELDS).first()
+            if post_row is None:
+                return Response({'message': "This post doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
+            comment_rows = Comment.objects.filter(post_id=pk).values(*COMMENT_FIELDS)
+            reply_rows = Reply.objects.filter(comment__post_id=pk).values(*REPLY_FIELDS)
+            # the cached tree keeps raw timestamps, time since posted must be fresh
+            payload = serialize_post_tree(post_row, comment_rows, reply_rows, None)
+            post_detail_cache.set(pk, payload, generation)
+        return Response(render_time_since_posted(payload, timezone.now()))
+
+    def retrieve_preview(self, request, pk):
+        comments_limit = get_limit(request, 'comments_limit', 0, self.max_comments_limit)
+        replies_limit = get_limit(request, 'replies_limit', self.default_replies_limit, self.max_replies_limit)
+        try:
+            post = Post.objects.visible().select_related('user').get(pk=pk)
         except Post.DoesNotExist:
             return Response({'message': "This post doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
-        post = Post.objects.select_related('user').\
-            prefetch_related(Prefetch('comments', queryset=Comment.objects.select_related('user').
-                                      prefetch_related(Prefetch('replies', queryset=Reply.objects.select_related('user')))))\
-            .get(pk=pk)
-        serializer = PostRetrieveSerializer(post)
+        post.first_comments = list(Comment.objects.filter(post_id=post.id).select_related('user')
+                                   .order_by('time', 'id')[:comments_limit])
+        attach_first_replies(post.first_comments, replies_limit)
+        serializer = PostPreviewRetrieveSerializer(post, context={'request': request})
         return Response(serializer.data)
 
     @action(detail=True, methods=['POST'], url_path="comments/add", url_name="add_comment")
@@ -45,7 +164,7 @@ class PostViewSet(viewsets.ModelViewSet):
         Adding a comment below a specific post
         """
         try:
-            post = Post.objects.get(pk=pk)
+            post = Post.objects.visible().get(pk=pk)
         except Post.DoesNotExist:
             return Response({'message': "This post doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
         user = request.user
@@ -55,6 +174,15 @@ class PostViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['POST'], url_path="comments/bulk", url_name="bulk_add_comments")
+    def bulk_add_comments(self, request):
+        """
+        Adding many comments, under one or many posts, in one request.
+        Takes a list of {"post": id, "text": ...} and responds with
+        the created comments or errors, in the same order
+        """
+        return get_bulk_response(request, bulk_add_comments, self.max_bulk_items)
+
     def create(self, request, *args, **kwargs):
         """
         Creating a new post
@@ -68,34 +196,79 @@ class PostViewSet(viewsets.ModelViewSet):
 
     def update(self, request, pk=None, *args, **kwargs):
         """
-        Updating a specific post
+        Updating a specific post - the author check is a part of the UPDATE,
+        the post is looked up only if nothing was updated
         """
-        try:
-            post = Post.objects.get(pk=pk)
-        except Post.DoesNotExist:
-            return Response({'message': "This post doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
-        user = request.user
-        if user.id != post.user.id:
-            return Response(status=status.HTTP_401_UNAUTHORIZED)
-        serializer = PostCreateUpdateSerializer(post, data=request.data)
-        if serializer.is_valid():
-            serializer.save()
+        serializer = PostCreateUpdateSerializer(data=request.data)
+        if serializer.is_valid() and self.get_post_id(pk) is not None and \
+                Post.objects.visible().filter(pk=pk, user_id=request.user.id).update(**serializer.validated_data):
+            # update() doesn't send post_save
+            post_detail_cache.invalidate(int(pk))
             return Response(serializer.data)
+        error_response = self.get_ownership_error_response(request, pk)
+        if error_response is not None:
+            return error_response
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def destroy(self, request, pk=None, *args, **kwargs):
         """
-        Deleting a specific post
+        Deleting a specific post - it's only flagged and hidden, the post with
+        its comments and replies is removed by the reap_deleted_posts command
         """
+        post_id = self.get_post_id(pk)
+        if post_id is not None and Post.objects.visible().filter(pk=post_id, user_id=request.user.id) \
+                .update(is_deleted=True):
+            post_detail_cache.invalidate(post_id)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return self.get_ownership_error_response(request, pk)
+
+    @staticmethod
+    def get_post_id(pk):
         try:
-            post = Post.objects.get(pk=pk)
-        except Post.DoesNotExist:
+            return int(pk)
+        except ValueError:
+            return None
+
+    def get_ownership_error_response(self, request, pk):
+        """
+        Tells a post that doesn't exist (404) from a post of another user (401),
+        None for a post of the user
+        """
+        post_id = self.get_post_id(pk)
+        author_id = None if post_id is None else \
+            Post.objects.visible().filter(pk=post_id).values_list('user_id', flat=True).first()
+        if author_id is None:
             return Response({'message': "This post doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
-        user = request.user
-        if user.id != post.user.id:
+        if author_id != request.user.id:
             return Response(status=status.HTTP_401_UNAUTHORIZED)
-        post.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        return None
+
+    @action(detail=False, methods=['GET'], url_path=r"profile/(?P<user_id>[0-9]+)", url_name="profile_feed")
+    def profile_feed(self, request, user_id=None):
+        """
+        Everything a profile page needs in one request: basic information about
+        the user, their stats and a page of their posts (newest first).
+        The user and the stats are fetched with one annotated query.
+        """
+        user_model = get_user_model()
+        try:
+            user = user_model.objects.annotate(
+                post_count=Count('post', filter=Q(post__is_deleted=False)),
+                total_engagement=Coalesce(Sum('post__engagement_rate', filter=Q(post__is_deleted=False)), 0),
+            ).get(pk=user_id)
+        except user_model.DoesNotExist:
+            return Response({'message': 'This user does not exist.'}, status=status.HTTP_404_NOT_FOUND)
+        if not user.is_active:
+            return Response({'message': 'This user is not active.'}, status=status.HTTP_404_NOT_FOUND)
+        paginator = ProfileFeedPagination()
+        posts = paginator.paginate_queryset(Post.objects.visible().filter(user_id=user.id).values(*POST_LIST_FIELDS),
+                                            request, view=self)
+        return Response({
+            'user': BasicInfoUserSerializer(user).data,
+            'stats': {'post_count': user.post_count, 'total_engagement': user.total_engagement},
+            'next': paginator.get_next_link(),
+            'results': serialize_rows(serialize_post_row, posts, timezone.now()),
+        })
 
     @action(detail=True, methods=['GET'], url_path="basic", url_name="basic_info")
     def retrieve_basic_info(self, request, pk=None):
@@ -104,7 +277,7 @@ class PostViewSet(viewsets.ModelViewSet):
         the information about comments and replies
         """
         try:
-            post = Post.objects.get(pk=pk)
+            post = Post.objects.visible().get(pk=pk)
         except Post.DoesNotExist:
             return Response({'message': "This post doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
         serializer = BasicInfoPostSerializer(post)
@@ -113,6 +286,44 @@ class PostViewSet(viewsets.ModelViewSet):
 
 class CommentViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
+    max_replies_limit = 50
+    default_replies_limit = 3
+    max_bulk_items = 1000
+
+    def list(self, request):
+        """
+        Listing comments under the post given in the `post` query param,
+        page by page, each comment with its oldest replies
+        """
+        try:
+            post_id = int(request.query_params['post'])
+        except (KeyError, ValueError):
+            return Response({'message': "Post id must be provided"}, status=status.HTTP_400_BAD_REQUEST)
+        replies_limit = get_limit(request, 'replies_limit', self.default_replies_limit, self.max_replies_limit)
+        paginator = ThreadPagination()
+        queryset = Comment.objects.filter(post_id=post_id, post__is_deleted=False).select_related('user')
+        comments = paginator.paginate_queryset(queryset, request, view=self)
+        if not comments and not Post.objects.visible().filter(pk=post_id).exists():
+            return Response({'message': "This post doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
+        attach_first_replies(comments, replies_limit)
+        serializer = CommentPreviewSerializer(comments, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['GET'], url_path="replies", url_name="replies")
+    def replies(self, request, pk=None):
+        """
+        Listing replies under a specific comment, page by page
+        """
+        try:
+            pk = int(pk)
+        except ValueError:
+            return Response({'message': "This comment doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
+        paginator = ThreadPagination()
+        queryset = Reply.objects.filter(comment_id=pk, comment__post__is_deleted=False).values(*REPLY_FIELDS)
+        replies = paginator.paginate_queryset(queryset, request, view=self)
+        if not replies and not Comment.objects.filter(pk=pk, post__is_deleted=False).exists():
+            return Response({'message': "This comment doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
+        return paginator.get_paginated_response(serialize_rows(serialize_reply_row, replies, timezone.now()))
 
     @action(detail=True, methods=['POST'], url_path="replies/add", url_name="add_reply")
     def add_reply(self, request, pk=None):
@@ -120,7 +331,7 @@ class CommentViewSet(viewsets.ViewSet):
         Adding a reply under a specific comment
         """
         try:
-            comment = Comment.objects.get(pk=pk)
+            comment = Comment.objects.select_related('post').get(pk=pk, post__is_deleted=False)
         except Comment.DoesNotExist:
             return Response({'message': "This comment doesn't exist"}, status=status.HTTP_404_NOT_FOUND)
         user = request.user
@@ -129,3 +340,12 @@ class CommentViewSet(viewsets.ViewSet):
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['POST'], url_path="replies/bulk", url_name="bulk_add_replies")
+    def bulk_add_replies(self, request):
+        """
+        Adding many replies, under one or many comments, in one request.
+        Takes a list of {"comment": id, "text": ...} and responds with
+        the created replies or errors, in the same order
+        """
+        return get_bulk_response(request, bulk_add_replies, self.max_bulk_items)
@@ -4,6 +4,7 @@ from django import forms
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import ReadOnlyPasswordHashField
 from django.core.exceptions import ValidationError
+from . import validators
 
 
 class UserCreationForm(forms.ModelForm):
@@ -14,6 +15,18 @@ class UserCreationForm(forms.ModelForm):
         model = MyUser
         fields = ('email', 'name', 'surname', 'bio', 'username')
 
+    def clean_name(self):
+        return validators.validate_name(self.cleaned_data['name'])
+
+    def clean_surname(self):
+        return validators.validate_surname(self.cleaned_data['surname'])
+
+    def clean_username(self):
+        return validators.validate_username(self.cleaned_data['username'])
+
+    def clean_password1(self):
+        return validators.validate_password(self.cleaned_data['password1'])
+
     def clean_password2(self):
         password1 = self.cleaned_data.get("password1")
         password2 = self.cleaned_data.get("password2")
@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+CLAIM_FIELDS = ('id', 'username', 'is_active')
+
+
+class ActiveUserCache:
+    """
+    In-process LRU cache of (id, username, is_active) user records with
+    a TTL. Entries are dropped on save/delete of a user in this process,
+    other processes see changes after at most `timeout` seconds.
+    """
+    def __init__(self, max_size=10000, timeout=60):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._records.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._records.move_to_end(user_id)
+                return entry[1]
+        record = get_user_model().objects.filter(pk=user_id).values_list(*CLAIM_FIELDS).first()
+        if record is not None:
+            with self._lock:
+                self._records[user_id] = (now + self.timeout, record)
+                self._records.move_to_end(user_id)
+                while len(self._records) > self.max_size:
+                    self._records.popitem(last=False)
+        return record
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._records.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+
+_config = getattr(settings, 'AUTH_USER_CACHE', {})
+active_user_cache = ActiveUserCache(max_size=_config.get('MAX_SIZE', 10000), timeout=_config.get('TIMEOUT', 60))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication which doesn't load the user from the db. request.user
+    is a MyUser instance with only id, username and is_active loaded from
+    the token claims (see UserRefreshToken) - other fields are fetched from
+    the db on first access. Tokens without the claims fall back to
+    active_user_cache. The claims are refreshed from the db together with
+    the access token (UserTokenRefreshSerializer), so they are at most
+    ACCESS_TOKEN_LIFETIME old.
+    """
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        if 'username' in validated_token and 'is_active' in validated_token:
+            record = (user_id, validated_token['username'], validated_token['is_active'])
+        else:
+            record = active_user_cache.get(user_id)
+            if record is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not record[2]:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        # a deferred instance, like the ones returned by .only()
+        return self.user_model.from_db(router.db_for_read(self.user_model), CLAIM_FIELDS, record)
@@ -0,0 +1,123 @@
+import threading
+import time
+from hashlib import blake2b
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+class BloomFilter:
+    """
+    Set membership with false positives but no false negatives
+    """
+    def __init__(self, size=2 ** 23, hashes=7):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bytearray((size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def positions(self, value):
+        digest = blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        positions = self.positions(value)
+        with self._lock:
+            for position in positions:
+                self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(value))
+
+
+class TokenBlacklistFilter:
+    """
+    Tells which refresh tokens are certainly not blacklisted, so checking them
+    doesn't need a query. The bloom filter is built from the db and rebuilt
+    every `rebuild_interval` seconds, which also drops expired tokens.
+    It only sees tokens blacklisted by this process since the last rebuild -
+    with more processes, `cache_alias` has to point to a cache shared by all
+    of them (and not evicting entries early), where every blacklisted token
+    is also recorded until it expires.
+    """
+    key_prefix = 'token-blacklist'
+
+    def __init__(self, size=2 ** 23, hashes=7, rebuild_interval=3600, cache_alias=None):
+        self.size = size
+        self.hashes = hashes
+        self.rebuild_interval = rebuild_interval
+        self.cache_alias = cache_alias
+        self._bloom = None
+        self._built_at = None
+        self._added_during_rebuild = None
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+
+    def might_contain(self, jti):
+        if self.cache_alias is not None and caches[self.cache_alias].get(self.key(jti)):
+            return True
+        return jti in self.get_bloom()
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            bloom = self._bloom
+            if self._added_during_rebuild is not None:
+                self._added_during_rebuild.append(jti)
+        if bloom is not None:
+            bloom.add(jti)
+        if self.cache_alias is not None:
+            timeout = max(int((expires_at - aware_utcnow()).total_seconds()), 1)
+            caches[self.cache_alias].set(self.key(jti), True, timeout=timeout)
+
+    def get_bloom(self):
+        if self._bloom is None or time.monotonic() - self._built_at > self.rebuild_interval:
+            self.rebuild()
+        return self._bloom
+
+    def rebuild(self):
+        with self._rebuild_lock:
+            with self._lock:
+                # tokens blacklisted while the db is read may be missing in the result
+                self._added_during_rebuild = []
+            bloom = BloomFilter(self.size, self.hashes)
+            jtis = BlacklistedToken.objects.filter(token__expires_at__gt=aware_utcnow()) \
+                .values_list('token__jti', flat=True)
+            for jti in jtis.iterator(chunk_size=10000):
+                bloom.add(jti)
+            with self._lock:
+                for jti in self._added_during_rebuild:
+                    bloom.add(jti)
+                self._added_during_rebuild = None
+                self._bloom = bloom
+                self._built_at = time.monotonic()
+
+    def key(self, jti):
+        return f'{self.key_prefix}:{jti}'
+
+
+_filter = None
+
+
+def get_token_blacklist_filter():
+    """
+    Returns the filter configured with the TOKEN_BLACKLIST_FILTER setting,
+    or None if it's disabled. A filter of one process doesn't know tokens
+    blacklisted by the others, so CACHE_ALIAS must be a shared cache.
+    """
+    global _filter
+    config = getattr(settings, 'TOKEN_BLACKLIST_FILTER', {})
+    if not config.get('ENABLED', False):
+        return None
+    if _filter is None:
+        cache_alias = config.get('CACHE_ALIAS')
+        if cache_alias is None or isinstance(caches[cache_alias], LocMemCache):
+            raise ImproperlyConfigured('TOKEN_BLACKLIST_FILTER needs CACHE_ALIAS pointing to a cache '
+                                       'shared by all processes')
+        _filter = TokenBlacklistFilter(size=config.get('SIZE', 2 ** 23), hashes=config.get('HASHES', 7),
+                                       rebuild_interval=config.get('REBUILD_INTERVAL', 3600),
+                                       cache_alias=config.get('CACHE_ALIAS'))
+    return _filter
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import time
+from uuid import uuid4
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+
+
+class UserProfileCache:
+    """
+    Cache of serialized profiles of active users, stored in one of the caches
+    from the CACHES setting together with their ETag and Last-Modified time
+    (the time the profile was cached). Entries are invalidated by the
+    signals of MyUser, so the cache has to be shared by all processes - it's
+    used only with USER_PROFILE_CACHE['ENABLED']. Like in PostDetailCache,
+    a profile read before an invalidation and stored after it isn't served.
+    """
+    key_prefix = 'user-profile'
+
+    @property
+    def config(self):
+        return settings.USER_PROFILE_CACHE
+
+    @property
+    def enabled(self):
+        return self.config.get('ENABLED', False)
+
+    @property
+    def cache(self):
+        return caches[self.config['ALIAS']]
+
+    def key(self, user_id):
+        return f'{self.key_prefix}:{user_id}'
+
+    def generation_key(self, user_id):
+        return f'{self.key_prefix}-generation:{user_id}'
+
+    def get(self, user_id):
+        """
+        Returns the cached entry (None if there isn't a current one) and
+        the generation of the profile, which has to be passed to set
+        """
+        if not self.enabled:
+            return None, None
+        values = self.cache.get_many([self.key(user_id), self.generation_key(user_id)])
+        generation = values.get(self.generation_key(user_id))
+        entry = values.get(self.key(user_id))
+        if entry is None or entry['generation'] != generation:
+            return None, generation
+        return entry, generation
+
+    def set(self, user_id, data, generation):
+        """
+        Returns the entry, which is stored only if the cache is enabled
+        """
+        content = json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        entry = {
+            'data': dict(data),
+            'etag': quote_etag(hashlib.md5(content).hexdigest()),
+            'last_modified': int(time.time()),
+            'generation': generation,
+        }
+        if self.enabled:
+            self.cache.set(self.key(user_id), entry, self.config['TIMEOUT'])
+        return entry
+
+    def invalidate(self, user_id):
+        if not self.enabled:
+            return
+        # the generation outlives profiles which may have been stored with the previous one
+        self.cache.set(self.generation_key(user_id), uuid4().hex, self.config['TIMEOUT'] * 2)
+        self.cache.delete(self.key(user_id))
+
+    @staticmethod
+    def headers(entry):
+        return {'ETag': entry['etag'], 'Last-Modified': http_date(entry['last_modified'])}
+
+    @staticmethod
+    def is_not_modified(request, entry):
+        """
+        Whether a conditional GET can be answered with 304, If-None-Match
+        takes precedence over If-Modified-Since like in RFC 7232
+        """
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return '*' in etags or entry['etag'] in etags
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return if_modified_since is not None and entry['last_modified'] <= if_modified_since
+
+
+user_profile_cache = UserProfileCache()
@@ -7,7 +7,7 @@ class Email(ABC):
         self.target = target
 
     @abstractmethod
-    def send(self):
+    def send(self, connection=None):
         pass
 
 
@@ -15,5 +15,6 @@ class EmailDispatcher:
     def __init__(self, email: Email):
         self.email = email
 
-    def send(self):
-        self.email.send()
+    def send(self, connection=None):
+        # an open connection can be shared by many emails
+        self.email.send(connection=connection)
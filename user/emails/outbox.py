@@ -0,0 +1,100 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from ..models import QueuedEmail
+from .emails import EmailDispatcher
+from .verification.emails import InitialVerificationEmail
+
+
+class EmailOutbox:
+    """
+    DB-backed queue of emails. Requests only enqueue emails, a worker
+    (the send_queued_emails command) sends the due ones in batches over
+    one SMTP connection and retries failures with exponential backoff.
+    """
+    email_classes = {
+        QueuedEmail.INITIAL_VERIFICATION: InitialVerificationEmail,
+    }
+
+    def __init__(self, batch_size=None, max_attempts=None, retry_backoff=None, lease=None):
+        config = getattr(settings, 'EMAIL_OUTBOX', {})
+        self.batch_size = batch_size or config.get('BATCH_SIZE', 50)
+        self.max_attempts = max_attempts or config.get('MAX_ATTEMPTS', 5)
+        # seconds before the first retry, doubled after every failed attempt
+        self.retry_backoff = retry_backoff or config.get('RETRY_BACKOFF', 60)
+        # seconds for which claimed emails are hidden from other workers
+        self.lease = lease or config.get('LEASE', 300)
+
+    @staticmethod
+    def enqueue(kind, user):
+        return QueuedEmail.objects.create(kind=kind, user=user)
+
+    def claim(self):
+        """
+        Picks due emails and hides them from other workers for the lease
+        time - if this worker dies, they are sent by another one later
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            queryset = QueuedEmail.objects.filter(status=QueuedEmail.PENDING, next_attempt_at__lte=now) \
+                .order_by('next_attempt_at', 'id')
+            if connection.features.has_select_for_update_skip_locked:
+                queryset = queryset.select_for_update(skip_locked=True)
+            ids = list(queryset.values_list('id', flat=True)[:self.batch_size])
+            QueuedEmail.objects.filter(id__in=ids).update(next_attempt_at=now + timedelta(seconds=self.lease))
+        return list(QueuedEmail.objects.select_related('user').filter(id__in=ids).order_by('id'))
+
+    def send_batch(self):
+        """
+        Sends one batch of due emails, returns the numbers of sent and failed ones
+        """
+        emails = self.claim()
+        if not emails:
+            return 0, 0
+        mail_connection = get_connection()
+        try:
+            mail_connection.open()
+        except Exception as error:
+            for email in emails:
+                self.fail(email, error)
+            return 0, len(emails)
+        sent_ids = []
+        failed = 0
+        try:
+            for email in emails:
+                try:
+                    EmailDispatcher(self.email_classes[email.kind](email.user)).send(connection=mail_connection)
+                except Exception as error:
+                    self.fail(email, error)
+                    failed += 1
+                else:
+                    sent_ids.append(email.id)
+        finally:
+            mail_connection.close()
+        QueuedEmail.objects.filter(id__in=sent_ids).update(status=QueuedEmail.SENT, sent_at=timezone.now(),
+                                                           attempts=F('attempts') + 1, last_error='')
+        return len(sent_ids), failed
+
+    def send_all(self):
+        """
+        Sends batches until there are no due emails left
+        """
+        sent = failed = 0
+        while True:
+            batch_sent, batch_failed = self.send_batch()
+            if not batch_sent and not batch_failed:
+                return sent, failed
+            sent += batch_sent
+            failed += batch_failed
+
+    def fail(self, email, error):
+        attempts = email.attempts + 1
+        QueuedEmail.objects.filter(id=email.id).update(
+            attempts=attempts,
+            last_error=repr(error),
+            status=QueuedEmail.FAILED if attempts >= self.max_attempts else QueuedEmail.PENDING,
+            next_attempt_at=timezone.now() + timedelta(seconds=self.retry_backoff * 2 ** (attempts - 1)),
+        )
@@ -10,7 +10,7 @@ class InitialVerificationEmail(Email):
     This class derives from the SingleEmail abstract class
     Its responsibility is sending initial verification emails
     """
-    def send(self):
+    def send(self, connection=None):
         domain = settings.FRONT_END
         message = render_to_string('verification_email_template.html', {
                                 'user': self.target,
@@ -20,4 +20,4 @@ class InitialVerificationEmail(Email):
         })
         to_email = self.target.email
         send_mail('Verify your account and start your journey!', message, settings.EMAIL_HOST_USER, [to_email],
-                  fail_silently=False)
+                  fail_silently=False, connection=connection)
@@ -1,8 +1,14 @@
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from rest_framework_simplejwt.tokens import RefreshToken
+from ...tokens import UserRefreshToken
+from ...authentication import active_user_cache
+from ...cache import user_profile_cache
+
+# everything checking a verification token and issuing tokens needs
+VERIFICATION_FIELDS = ('id', 'email', 'username', 'is_active')
 
 
 class InitEmailVerificationTokenGenerator(PasswordResetTokenGenerator):
@@ -30,11 +36,12 @@ class EmailVerificationUtils:
         return urlsafe_base64_encode(force_bytes(user.id))
 
     @staticmethod
-    def decode_user(uid):
+    def decode_user(uid, fields=None):
         _user = get_user_model()
         try:
             uid = force_str(urlsafe_base64_decode(uid))
-            user = _user.objects.get(pk=uid)
+            queryset = _user.objects.all() if fields is None else _user.objects.only(*fields)
+            user = queryset.get(pk=uid)
         except(TypeError, ValueError, OverflowError, _user.DoesNotExist):
             user = None
         return user
@@ -42,10 +49,24 @@ class EmailVerificationUtils:
     @staticmethod
     def obtain_tokens(user):
         if user is not None and user.is_active:
-            refresh = RefreshToken.for_user(user=user)
+            refresh = UserRefreshToken.for_user(user=user)
             access = refresh.access_token
             return {'refresh': str(refresh), 'access': str(access)}
         return {}
 
-
-
+    @staticmethod
+    @transaction.atomic
+    def activate_user(user):
+        """
+        Activates the user with one conditional UPDATE and issues their tokens
+        in the same transaction. Only one of concurrent activations updates
+        the row, the others get {} like for an already active user.
+        """
+        activated = get_user_model().objects.filter(pk=user.pk, is_active=False).update(is_active=True)
+        if not activated:
+            return {}
+        user.is_active = True
+        # update() doesn't send post_save
+        active_user_cache.invalidate(user.pk)
+        user_profile_cache.invalidate(user.pk)
+        return EmailVerificationUtils.obtain_tokens(user)
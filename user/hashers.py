@@ -0,0 +1,37 @@
+"""
+Password hashers whose cost is configured per profile in the
+PASSWORD_HASHER_PARAMS setting. PASSWORD_HASHER_PROFILE picks the one used
+for new passwords - hashes made by the other profiles, or with other
+parameters, are upgraded when their users log in (Django rehashes a
+password whenever the preferred hasher's must_update says so).
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, ScryptPasswordHasher, Argon2PasswordHasher
+
+
+def profile_param(profile, name, default):
+    def get(self):
+        return getattr(settings, 'PASSWORD_HASHER_PARAMS', {}).get(profile, {}).get(name, default)
+    return property(get)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = profile_param('pbkdf2', 'iterations', PBKDF2PasswordHasher.iterations)
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    work_factor = profile_param('scrypt', 'work_factor', ScryptPasswordHasher.work_factor)
+    block_size = profile_param('scrypt', 'block_size', ScryptPasswordHasher.block_size)
+    parallelism = profile_param('scrypt', 'parallelism', ScryptPasswordHasher.parallelism)
+
+    @property
+    def maxmem(self):
+        # scrypt needs 128 * n * r * p bytes, OpenSSL refuses more than 32MB by default
+        return 2 * 128 * self.work_factor * self.block_size * self.parallelism
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Needs the argon2-cffi package"""
+    time_cost = profile_param('argon2', 'time_cost', Argon2PasswordHasher.time_cost)
+    memory_cost = profile_param('argon2', 'memory_cost', Argon2PasswordHasher.memory_cost)
+    parallelism = profile_param('argon2', 'parallelism', Argon2PasswordHasher.parallelism)
@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, check_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingPoolSaturated(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins and registrations at the moment, try again in a moment.'
+    default_code = 'hashing_pool_saturated'
+    # sent as Retry-After by DRF's exception handler
+    wait = 1
+
+
+# settings the pool's processes take over from the process which started them
+HASHING_SETTINGS = ('PASSWORD_HASHERS', 'PASSWORD_HASHER_PARAMS')
+
+
+def setup_worker(hashing_settings):
+    django.setup()
+    for name, value in hashing_settings.items():
+        setattr(settings, name, value)
+
+
+class HashingPool:
+    """
+    Runs password hashing and verification in a pool of worker processes.
+    Every web server process has its own pool, so at most `workers` cores of
+    each web process (WORKERS x the number of gunicorn workers in total) hash
+    at a time, however many request threads it runs. At most `max_pending`
+    hashes per web process may be running or queued - above that requests
+    fail right away with HashingPoolSaturated (503) instead of piling up.
+    The request thread waits for the result, so the pool is meant for
+    threaded web workers (see gunicorn.conf.py), which keep serving other
+    requests meanwhile.
+    Workers are spawned rather than forked, forking a threaded process isn't
+    safe, and hash with the hashing settings of the time they were started.
+    """
+    def __init__(self, workers=2, max_pending=8, timeout=10.0):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def make_password(self, password):
+        return self.run(make_password, password)
+
+    def check_password(self, password, encoded):
+        return self.run(check_password, password, encoded)
+
+    def run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolSaturated()
+        try:
+            future = self.get_executor().submit(function, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # the slot is freed when the hash is done, also if the request gave up waiting
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HashingPoolSaturated()
+
+    def get_executor(self):
+        # forked gunicorn workers need their own pool
+        if self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor_pid != os.getpid():
+                    hashing_settings = {name: getattr(settings, name) for name in HASHING_SETTINGS
+                                        if hasattr(settings, name)}
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                         mp_context=multiprocessing.get_context('spawn'),
+                                                         initializer=setup_worker, initargs=(hashing_settings,))
+                    self._executor_pid = os.getpid()
+        return self._executor
+
+
+_pool = None
+
+
+def get_hashing_pool():
+    """
+    Returns the pool configured with the PASSWORD_HASHING_POOL setting,
+    or None if hashing runs in the request thread
+    """
+    global _pool
+    config = getattr(settings, 'PASSWORD_HASHING_POOL', {})
+    if not config.get('ENABLED', False):
+        return None
+    if _pool is None:
+        _pool = HashingPool(workers=config.get('WORKERS', 2), max_pending=config.get('MAX_PENDING', 8),
+                            timeout=config.get('TIMEOUT', 10.0))
+    return _pool
@@ -0,0 +1,154 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from .models import QueuedEmail
+from .serializers import BulkUserSerializer
+
+
+def read_rows(file, file_format):
+    """
+    Yields (line number, row dict) from a CSV file with a header or from JSON lines
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            # short rows have None for the missing columns, long ones under the None key
+            yield reader.line_num, {key: value for key, value in row.items() if key is not None and value is not None}
+        return
+    for number, line in enumerate(file, start=1):
+        if line.strip():
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row
+
+
+class UserImporter:
+    """
+    Creates users in batches - rows are validated with the rules of
+    UserSerializer, uniqueness is checked with one query per batch, passwords
+    are hashed in parallel and every batch is written with bulk_create in
+    its own transaction together with the queued verification emails. If a
+    batch clashes with users created meanwhile, its rows are saved one by one.
+    """
+    unique_fields = ('email', 'username')
+
+    def __init__(self, batch_size=1000, workers=None):
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count()
+        self.model = get_user_model()
+        self.created = 0
+        # (line number, errors) of rejected rows
+        self.rejected = []
+        self._seen = {field: set() for field in self.unique_fields}
+
+    def import_rows(self, rows, progress=None):
+        executor = ProcessPoolExecutor(self.workers, initializer=django.setup) if self.workers > 1 else None
+        try:
+            batch = []
+            for number, row in rows:
+                data = self.validate(number, row)
+                if data is not None:
+                    batch.append((number, data))
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch, executor)
+                    batch = []
+                    if progress is not None:
+                        progress(self)
+            if batch:
+                self.import_batch(batch, executor)
+                if progress is not None:
+                    progress(self)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def validate(self, number, row):
+        if not isinstance(row, dict):
+            self.rejected.append((number, {'non_field_errors': ['Invalid row']}))
+            return None
+        serializer = BulkUserSerializer(data=row)
+        if not serializer.is_valid():
+            self.rejected.append((number, {field: [str(error) for error in errors]
+                                           for field, errors in serializer.errors.items()}))
+            return None
+        data = dict(serializer.validated_data)
+        data['email'] = self.model.objects.normalize_email(data['email'])
+        return data
+
+    def import_batch(self, batch, executor):
+        batch = self.check_unique(batch)
+        if not batch:
+            return
+        passwords = [data['password'] for _, data in batch]
+        if executor is not None:
+            hashes = list(executor.map(make_password, passwords, chunksize=max(len(passwords) // self.workers, 1)))
+        else:
+            hashes = [make_password(password) for password in passwords]
+        users = [self.model(email=data['email'], name=data['name'], surname=data['surname'],
+                            username=data['username'], bio=data.get('bio', ''), password=password_hash)
+                 for (_, data), password_hash in zip(batch, hashes)]
+        try:
+            with transaction.atomic():
+                users = self.model.objects.bulk_create(users)
+                if any(user.pk is None for user in users):
+                    ids = dict(self.model.objects.filter(email__in=[user.email for user in users])
+                               .values_list('email', 'id'))
+                    for user in users:
+                        user.pk = ids[user.email]
+                QueuedEmail.objects.bulk_create([QueuedEmail(kind=QueuedEmail.INITIAL_VERIFICATION, user=user)
+                                                 for user in users])
+        except IntegrityError:
+            # a user with the same email or username was created after check_unique
+            self.import_one_by_one(batch, users)
+            return
+        self.created += len(users)
+
+    def import_one_by_one(self, batch, users):
+        """
+        Saves every user of a batch in its own transaction, rejecting the clashing ones
+        """
+        for (number, data), user in zip(batch, users):
+            user.pk = None
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+                    QueuedEmail.objects.create(kind=QueuedEmail.INITIAL_VERIFICATION, user=user)
+            except IntegrityError:
+                errors = {field: [self.unique_message(field)] for field in self.unique_fields
+                          if self.model.objects.filter(**{field: data[field]}).exists()}
+                self.rejected.append((number, errors or {'non_field_errors': ['Could not be saved']}))
+                continue
+            self.created += 1
+
+    def check_unique(self, batch):
+        """
+        Rejects rows clashing with existing users or with earlier rows
+        """
+        taken = {}
+        for field in self.unique_fields:
+            values = [data[field] for _, data in batch]
+            taken[field] = set(self.model.objects.filter(**{f'{field}__in': values}).values_list(field, flat=True))
+        unique = []
+        for number, data in batch:
+            errors = {field: [self.unique_message(field)] for field in self.unique_fields
+                      if data[field] in taken[field] or data[field] in self._seen[field]}
+            if errors:
+                self.rejected.append((number, errors))
+                continue
+            for field in self.unique_fields:
+                self._seen[field].add(data[field])
+            unique.append((number, data))
+        return unique
+
+    def unique_message(self, field):
+        # the message of UniqueValidator in UserSerializer
+        model_field = self.model._meta.get_field(field)
+        return model_field.error_messages['unique'] % {'model_name': self.model._meta.verbose_name,
+                                                       'field_label': model_field.verbose_name}
@@ -0,0 +1,47 @@
+import os
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = 'Measures password hashes per second per core for every hasher profile, ' \
+           'to size auth workers and pick the cost in PASSWORD_HASHER_PARAMS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', choices=list(settings.PASSWORD_HASHER_PROFILES),
+                            default=list(settings.PASSWORD_HASHER_PROFILES))
+        parser.add_argument('--duration', type=float, default=2.0, help='seconds of hashing per profile')
+        parser.add_argument('--cores', type=int, default=os.cpu_count(), help='cores of an auth worker machine')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"profile":<10}{"ms/hash":>10}{"hashes/s/core":>16}'
+                          f'{"hashes/s on " + str(options["cores"]) + " cores":>24}  parameters')
+        for profile in options['profiles']:
+            hasher = import_string(settings.PASSWORD_HASHER_PROFILES[profile])()
+            try:
+                seconds = self.measure(hasher, options['duration'])
+            except (ValueError, ImportError) as error:
+                self.stdout.write(f'{profile:<10}  unavailable: {error}')
+                continue
+            encoded = hasher.encode('BenchmarkPassword1', hasher.salt())
+            parameters = ', '.join(f'{key}={value}' for key, value in hasher.safe_summary(encoded).items()
+                                   if key not in ('algorithm', 'salt', 'hash'))
+            marker = ' (current)' if profile == settings.PASSWORD_HASHER_PROFILE else ''
+            self.stdout.write(f'{profile:<10}{seconds * 1000:>10.1f}{1 / seconds:>16.1f}'
+                              f'{options["cores"] / seconds:>24.1f}  {parameters}{marker}')
+
+    @staticmethod
+    def measure(hasher, duration):
+        """
+        Average seconds per hash, hashing for at least `duration` seconds
+        """
+        count = 0
+        start = time.perf_counter()
+        while True:
+            hasher.encode('BenchmarkPassword1', hasher.salt())
+            count += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= duration:
+                return elapsed / count
@@ -0,0 +1,61 @@
+import re
+import timeit
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from user import validators
+
+
+def legacy_validate(data):
+    """
+    The checks UserSerializer ran before user.validators - patterns compiled
+    on every call and the password walked with a multiply accumulator
+    """
+    if re.compile(r'^[A-Za-z]+ {1}[A-Za-z]+$|^[A-Za-z]+$').fullmatch(data['name'].strip()) is None:
+        return False
+    if re.compile(r'^[A-Za-z]+[ -]{1}[A-Za-z]+$|^[A-Za-z]+$').fullmatch(data['surname'].strip()) is None:
+        return False
+    if re.compile(r'^[a-zA-Z0-9_.-]{3,30}$').fullmatch(data['username']) is None:
+        return False
+    if len(data['password']) < 8:
+        return False
+    result = 1
+    for char in data['password']:
+        if char.isupper():
+            result = result * 0
+    return result == 0
+
+
+def validate(data):
+    try:
+        validators.validate_name(data['name'])
+        validators.validate_surname(data['surname'])
+        validators.validate_username(data['username'])
+        validators.validate_password(data['password'])
+    except ValidationError:
+        return False
+    return True
+
+
+class Command(BaseCommand):
+    help = 'Compares the per-registration cost of the user data validators before and after precompiling them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=100000, help='registrations validated per measurement')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        payloads = {
+            'typical': {'name': 'Anna Maria', 'surname': 'Smith-Jones', 'username': 'anna_smith',
+                        'password': 'Secretpassword1'},
+            'long password': {'name': 'Anna', 'surname': 'Smith', 'username': 'anna_smith',
+                              'password': 'S' + 'secret' * 20},
+        }
+        self.stdout.write(f'{"payload":<16}{"before µs":>12}{"after µs":>12}{"speedup":>10}')
+        for name, data in payloads.items():
+            if legacy_validate(data) != validate(data):
+                raise CommandError(f'The results for {name} differ')
+            before = min(timeit.repeat(lambda: legacy_validate(data), number=options['number'],
+                                       repeat=options['repeat'])) / options['number']
+            after = min(timeit.repeat(lambda: validate(data), number=options['number'],
+                                      repeat=options['repeat'])) / options['number']
+            self.stdout.write(f'{name:<16}{before * 10 ** 6:>12.2f}{after * 10 ** 6:>12.2f}{before / after:>9.1f}x')
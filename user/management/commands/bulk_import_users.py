@@ -0,0 +1,39 @@
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from user.importing import UserImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Creates inactive users from a CSV (with a header) or JSON lines file with email, name, surname, ' \
+           'username, password and optionally bio, and queues their verification emails'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='guessed from the extension by default')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='processes hashing passwords')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or ('csv' if options['path'].endswith('.csv') else 'jsonl')
+        importer = UserImporter(batch_size=options['batch_size'], workers=options['workers'])
+        start = time.perf_counter()
+
+        def progress(importer):
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'{importer.created} users created, {len(importer.rejected)} rows rejected, '
+                              f'{(importer.created + len(importer.rejected)) / elapsed:.1f} rows/s')
+
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as file:
+                importer.import_rows(read_rows(file, file_format), progress=progress)
+        except OSError as error:
+            raise CommandError(str(error))
+        for number, errors in importer.rejected:
+            self.stderr.write(f'Line {number}: {errors}')
+        elapsed = time.perf_counter() - start
+        rows = importer.created + len(importer.rejected)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {importer.created} users, rejected {len(importer.rejected)} rows in {elapsed:.1f}s '
+            f'({rows / elapsed if elapsed else 0:.1f} rows/s)'
+        ))
@@ -0,0 +1,33 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired outstanding and blacklisted refresh tokens in batches, ' \
+           'so that the tables stay small without long-running deletes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0.0, help='seconds to wait between batches')
+
+    def handle(self, *args, **options):
+        now = aware_utcnow()
+        expired = OutstandingToken.objects.filter(expires_at__lte=now).order_by('id')
+        deleted_outstanding = deleted_blacklisted = 0
+        while True:
+            ids = list(expired.values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            with transaction.atomic():
+                blacklisted, _ = BlacklistedToken.objects.filter(token_id__in=ids).delete()
+                outstanding, _ = OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted_blacklisted += blacklisted
+            deleted_outstanding += outstanding
+            self.stdout.write(f'Deleted {deleted_outstanding} tokens so far')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted_outstanding} expired tokens, '
+                                             f'{deleted_blacklisted} of them blacklisted'))
@@ -0,0 +1,34 @@
+import logging
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from user.emails.outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Sends due emails from the outbox in batches over one SMTP connection, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='defaults to EMAIL_OUTBOX["BATCH_SIZE"]')
+        parser.add_argument('--max-attempts', type=int, help='defaults to EMAIL_OUTBOX["MAX_ATTEMPTS"]')
+        parser.add_argument('--loop', action='store_true', help='keep polling for new emails')
+        parser.add_argument('--interval', type=float, default=5.0, help='seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        outbox = EmailOutbox(batch_size=options['batch_size'], max_attempts=options['max_attempts'])
+        if not options['loop']:
+            sent, failed = outbox.send_all()
+            self.stdout.write(f'Sent {sent} emails, {failed} failed')
+            return
+        while True:
+            close_old_connections()
+            try:
+                sent, failed = outbox.send_all()
+            except Exception:
+                logger.exception('Sending queued emails failed')
+            else:
+                if sent or failed:
+                    self.stdout.write(f'Sent {sent} emails, {failed} failed')
+            time.sleep(options['interval'])
@@ -1,7 +1,10 @@
 from django.db import models
+from django.utils import timezone
+from django.contrib.auth.hashers import get_hasher, identify_hasher
 from django.contrib.auth.models import (
     BaseUserManager, AbstractBaseUser
 )
+from .hashing_pool import get_hashing_pool
 
 
 class MyUserManager(BaseUserManager):
@@ -61,6 +64,35 @@ class MyUser(AbstractBaseUser):
     def __str__(self):
         return self.email
 
+    def set_password(self, raw_password):
+        pool = get_hashing_pool()
+        if pool is None or raw_password is None:
+            return super().set_password(raw_password)
+        self.password = pool.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        With PASSWORD_HASHING_POOL enabled, the password is verified in the pool.
+        Outdated hashes are upgraded like in AbstractBaseUser.check_password.
+        """
+        pool = get_hashing_pool()
+        if pool is None:
+            return super().check_password(raw_password)
+        if raw_password is None:
+            return False
+        try:
+            hasher = identify_hasher(self.password)
+        except ValueError:
+            return False
+        is_correct = pool.check_password(raw_password, self.password)
+        preferred = get_hasher('default')
+        if is_correct and (hasher.algorithm != preferred.algorithm or preferred.must_update(self.password)):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+        return is_correct
+
     def has_perm(self, perm, obj=None):
         return True
 
@@ -70,3 +102,34 @@ class MyUser(AbstractBaseUser):
     @property
     def is_staff(self):
         return self.is_admin
+
+
+class QueuedEmail(models.Model):
+    """
+    An email waiting in the outbox. Emails are sent in the background
+    by the send_queued_emails command, so requests never wait for SMTP.
+    """
+    INITIAL_VERIFICATION = 'initial_verification'
+    KIND_CHOICES = [(INITIAL_VERIFICATION, 'Initial verification')]
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (SENT, 'Sent'), (FAILED, 'Failed')]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    user = models.ForeignKey(MyUser, on_delete=models.CASCADE, related_name='queued_emails')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='queued_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} to {self.user_id} ({self.status})'
@@ -1,8 +1,16 @@
 from django.contrib.auth import get_user_model
-from .emails.verification.emails import InitialVerificationEmail
-import re
+from django.db import transaction
 from rest_framework import serializers
-from .emails.emails import EmailDispatcher
+from rest_framework.validators import UniqueValidator
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from django.utils.translation import gettext_lazy as _
+from .emails.outbox import EmailOutbox
+from .models import QueuedEmail
+from . import validators
+from .tokens import UserRefreshToken
+from .authentication import CLAIM_FIELDS
 
 
 class BasicInfoUserSerializer(serializers.ModelSerializer):
@@ -15,41 +23,23 @@ class BasicInfoUserSerializer(serializers.ModelSerializer):
 class UserSerializer(BasicInfoUserSerializer):
     """
     Extended information about the user. Class responsible for user creation, validation
-    of data and sending verification emails.
+    of data and queueing verification emails.
     """
     class Meta(BasicInfoUserSerializer.Meta):
         fields = BasicInfoUserSerializer.Meta.fields + ('email', 'name', 'surname', 'bio', 'password')
         extra_kwargs = {'password': {'write_only': True}, "id": {'read_only': True}}
 
     def validate_name(self, value):
-        pattern = re.compile(r'^[A-Za-z]+ {1}[A-Za-z]+$|^[A-Za-z]+$')
-        if pattern.fullmatch(value.strip()) is None:
-            raise serializers.ValidationError("Invalid format of the name")
-        return value
+        return validators.validate_name(value)
 
     def validate_surname(self, value):
-        pattern = re.compile(r'^[A-Za-z]+[ -]{1}[A-Za-z]+$|^[A-Za-z]+$')
-        if pattern.fullmatch(value.strip()) is None:
-            raise serializers.ValidationError("Invalid format of the surname")
-        return value
+        return validators.validate_surname(value)
 
     def validate_username(self, value):
-        pattern = re.compile(r'^[a-zA-Z0-9_.-]{3,30}$')
-        if pattern.fullmatch(value) is None:
-            raise serializers.ValidationError("Invalid format of the username")
-        return value
+        return validators.validate_username(value)
 
     def validate_password(self, value):
-        if len(value) < 8:
-            raise serializers.ValidationError("Password must be at least 8 characters long")
-
-        result = 1
-        for char in value:
-            if char.isupper():
-                result = result * 0
-        if result == 1:
-            raise serializers.ValidationError("Password must contain at least one uppercase letter")
-        return value
+        return validators.validate_password(value)
 
     def create(self, validated_data):
         # you cant just use super bc normal save doesnt save passwords in a proper way
@@ -58,7 +48,9 @@ class UserSerializer(BasicInfoUserSerializer):
         # or just use **validated_data
         pass
 
+    @transaction.atomic
     def save(self):
+        # the email is only queued, the send_queued_emails worker sends it
         model = get_user_model()
         user = model.objects.create_user(email=self.validated_data['email'],
                                          name=self.validated_data['name'],
@@ -66,10 +58,51 @@ class UserSerializer(BasicInfoUserSerializer):
                                          username=self.validated_data['username'],
                                          password=self.validated_data['password'],
                                          bio=self.validated_data.get('bio', ''))
-        email = InitialVerificationEmail(user)
-        try:
-            dispatcher = EmailDispatcher(email)
-            dispatcher.send()
-        except:
-            user.delete()
+        EmailOutbox.enqueue(QueuedEmail.INITIAL_VERIFICATION, user)
+
+
+class BulkUserSerializer(UserSerializer):
+    """
+    Validation rules of UserSerializer without the uniqueness checks, which
+    would cost two queries per user - bulk imports check whole batches at once
+    """
+    def get_fields(self):
+        fields = super().get_fields()
+        for field in fields.values():
+            field.validators = [validator for validator in field.validators
+                                if not isinstance(validator, UniqueValidator)]
+        return fields
 
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login - tokens with the claims used by ClaimsJWTAuthentication"""
+    @classmethod
+    def get_token(cls, user):
+        return UserRefreshToken.for_user(user)
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer working on UserRefreshToken, so that the
+    blacklist filter is used. The user is read from the db on every refresh,
+    so the claims of access tokens are at most ACCESS_TOKEN_LIFETIME old and
+    deleted/deactivated users lose access when their access token expires.
+    """
+    def validate(self, attrs):
+        refresh = UserRefreshToken(attrs['refresh'])
+        record = get_user_model().objects.filter(pk=refresh[api_settings.USER_ID_CLAIM]) \
+            .values_list(*CLAIM_FIELDS).first()
+        if record is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not record[2]:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        refresh['username'], refresh['is_active'] = record[1], record[2]
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
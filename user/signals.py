@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, post_delete
+from .models import MyUser
+from .authentication import active_user_cache
+from .cache import user_profile_cache
+
+
+def invalidate_active_user(sender, instance, **kwargs):
+    """
+    Function responsible for dropping a changed or deleted user
+    from the cache used by authentication
+    """
+    active_user_cache.invalidate(instance.pk)
+
+
+post_save.connect(invalidate_active_user, sender=MyUser)
+post_delete.connect(invalidate_active_user, sender=MyUser)
+
+
+def invalidate_user_profile(sender, instance, **kwargs):
+    """
+    Function responsible for dropping a changed or deleted user's
+    cached profile
+    """
+    user_profile_cache.invalidate(instance.pk)
+
+
+post_save.connect(invalidate_user_profile, sender=MyUser)
+post_delete.connect(invalidate_user_profile, sender=MyUser)
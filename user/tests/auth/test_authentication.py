@@ -0,0 +1,124 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
+from ...authentication import ClaimsJWTAuthentication, ActiveUserCache, active_user_cache
+from ...models import MyUser
+from ...tokens import UserRefreshToken
+
+
+class ClaimsJWTAuthenticationTest(APITestCase):
+    """
+    Testing authentication which builds request.user from the token claims
+    """
+    def setUp(self):
+        active_user_cache.clear()
+        self.user = MyUser.objects.create_user(email='test@test.com',
+                                               username='test_user',
+                                               name='Testname',
+                                               surname='Testsurname',
+                                               password='test_password')
+        self.user.is_active = True
+        self.user.save()
+        self.authentication = ClaimsJWTAuthentication()
+        self.factory = APIRequestFactory()
+
+    def authenticate(self, token):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.authentication.authenticate(request)[0]
+
+    def test_login_token_has_claims(self):
+        response = self.client.post(reverse('token_obtain_pair'), {'email': 'test@test.com',
+                                                                   'password': 'test_password'},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        refresh = RefreshToken(response.data['refresh'])
+        self.assertEqual((refresh['username'], refresh['is_active']), ('test_user', True))
+        response = self.client.post(reverse('token_refresh'), {'refresh': response.data['refresh']}, format='json')
+        access = AccessToken(response.data['access'])
+        self.assertEqual((access['username'], access['is_active']), ('test_user', True))
+
+    def test_user_from_claims(self):
+        token = UserRefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(0):
+            user = self.authenticate(token)
+        self.assertEqual((user.id, user.pk, user.username, user.is_active), (self.user.id, self.user.id,
+                                                                                'test_user', True))
+        self.assertTrue(user.is_authenticated)
+        # other fields are loaded when needed
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'test@test.com')
+
+    def test_inactive_claim(self):
+        token = UserRefreshToken.for_user(self.user).access_token
+        token['is_active'] = False
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_token_without_claims_uses_cache(self):
+        token = RefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate(token).username, 'test_user')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(token).username, 'test_user')
+        # saving a user drops the cached record
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_cache_limits(self):
+        second = MyUser.objects.create_user(email='second@test.com', username='second_user', name='Testname',
+                                            surname='Testsurname', password='test_password')
+        cache = ActiveUserCache(max_size=1, timeout=60)
+        cache.get(self.user.id)
+        cache.get(second.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(cache.get(self.user.id)[1], 'test_user')
+        cache = ActiveUserCache(max_size=10, timeout=0)
+        cache.get(self.user.id)
+        with self.assertNumQueries(1):
+            cache.get(self.user.id)
+
+
+class RefreshClaimsTest(APITestCase):
+    """
+    Testing that refreshing reads the user again instead of copying the claims
+    """
+    def setUp(self):
+        self.user = MyUser.objects.create_user(email='test@test.com',
+                                               username='test_user',
+                                               name='Testname',
+                                               surname='Testsurname',
+                                               password='test_password')
+        self.user.is_active = True
+        self.user.save()
+        self.refresh = str(UserRefreshToken.for_user(self.user))
+
+    def refresh_token(self):
+        return self.client.post(reverse('token_refresh'), {'refresh': self.refresh}, format='json')
+
+    def test_claims_restamped(self):
+        self.user.username = 'renamed_user'
+        self.user.save()
+        response = self.refresh_token()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['username'], 'renamed_user')
+        self.assertEqual(RefreshToken(response.data['refresh'])['username'], 'renamed_user')
+
+    def test_deactivated_user(self):
+        self.user.is_active = False
+        self.user.save()
+        response = self.refresh_token()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['code'], 'user_inactive')
+
+    def test_deleted_user(self):
+        MyUser.objects.filter(pk=self.user.pk).delete()
+        response = self.refresh_token()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data['code'], 'user_not_found')
@@ -0,0 +1,133 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from rest_framework_simplejwt.utils import aware_utcnow
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from ... import blacklist
+from ...blacklist import BloomFilter, TokenBlacklistFilter, get_token_blacklist_filter
+from ...models import MyUser
+from ...tokens import UserRefreshToken
+
+
+class TokenBlacklistFilterTest(APITestCase):
+    """
+    Testing the bloom filter in front of the refresh token blacklist
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = MyUser.objects.create_user(email='test@test.com',
+                                               username='test_user',
+                                               name='Testname',
+                                               surname='Testsurname',
+                                               password='test_password')
+        self.user.is_active = True
+        self.user.save()
+        self.filter = TokenBlacklistFilter(size=2 ** 16, hashes=5)
+        patcher = mock.patch('user.tokens.get_token_blacklist_filter', return_value=self.filter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(size=2 ** 16, hashes=5)
+        values = [f'jti-{i}' for i in range(1000)]
+        for value in values[:500]:
+            bloom.add(value)
+        self.assertTrue(all(value in bloom for value in values[:500]))
+        false_positives = sum(value in bloom for value in values[500:])
+        self.assertLess(false_positives, 10)
+
+    def test_refresh_skips_blacklist_query(self):
+        refresh = UserRefreshToken.for_user(self.user)
+        self.filter.rebuild()
+        with self.assertNumQueries(0):
+            refresh.check_blacklist()
+
+    def test_blacklisted_tokens_are_rejected(self):
+        """
+        Tokens blacklisted before the filter was built and after it are both rejected.
+        """
+        old = UserRefreshToken.for_user(self.user)
+        old.blacklist()
+        self.filter.rebuild()
+        new = UserRefreshToken.for_user(self.user)
+        response = self.client.post(reverse('token_blacklist'), {'refresh': str(new)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for token in (old, new):
+            response = self.client.post(reverse('token_refresh'), {'refresh': str(token)}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotation(self):
+        refresh = str(UserRefreshToken.for_user(self.user))
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(reverse('token_refresh'), {'refresh': response.data['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # the used token was blacklisted
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_shared_cache(self):
+        """
+        Tokens blacklisted by another process are found in the shared cache.
+        """
+        self.filter.cache_alias = 'default'
+        self.filter.rebuild()
+        other_process = TokenBlacklistFilter(size=2 ** 16, hashes=5, cache_alias='default')
+        refresh = UserRefreshToken.for_user(self.user)
+        with mock.patch('user.tokens.get_token_blacklist_filter', return_value=other_process):
+            refresh.blacklist()
+        self.assertTrue(self.filter.might_contain(refresh['jti']))
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class CompactTokenBlacklistTest(APITestCase):
+    def setUp(self):
+        self.user = MyUser.objects.create_user(email='test@test.com',
+                                               username='test_user',
+                                               name='Testname',
+                                               surname='Testsurname',
+                                               password='test_password')
+        for i in range(5):
+            UserRefreshToken.for_user(self.user).blacklist()
+            UserRefreshToken.for_user(self.user)
+        OutstandingToken.objects.filter(id__in=OutstandingToken.objects.order_by('id').values('id')[:7]) \
+            .update(expires_at=aware_utcnow() - timedelta(seconds=1))
+
+    def test_expired_tokens_are_deleted(self):
+        out = StringIO()
+        call_command('compact_token_blacklist', batch_size=2, stdout=out)
+        self.assertEqual(OutstandingToken.objects.count(), 3)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+        self.assertFalse(OutstandingToken.objects.filter(expires_at__lte=aware_utcnow()).exists())
+        self.assertIn('Deleted 7 expired tokens, 4 of them blacklisted', out.getvalue())
+
+
+class GetTokenBlacklistFilterTest(APITestCase):
+    def setUp(self):
+        patcher = mock.patch.object(blacklist, '_filter', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(TOKEN_BLACKLIST_FILTER={'ENABLED': False})
+    def test_disabled(self):
+        self.assertIsNone(get_token_blacklist_filter())
+
+    def test_per_process_cache_rejected(self):
+        for cache_alias in (None, 'default'):
+            with override_settings(TOKEN_BLACKLIST_FILTER={'ENABLED': True, 'CACHE_ALIAS': cache_alias}):
+                with self.assertRaises(ImproperlyConfigured):
+                    get_token_blacklist_filter()
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+                               'shared': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+                       TOKEN_BLACKLIST_FILTER={'ENABLED': True, 'CACHE_ALIAS': 'shared'})
+    def test_shared_cache(self):
+        self.assertEqual(get_token_blacklist_filter().cache_alias, 'shared')
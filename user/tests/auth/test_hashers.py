@@ -0,0 +1,65 @@
+from io import StringIO
+from django.contrib.auth.hashers import identify_hasher
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ...models import MyUser
+
+PROFILES = {
+    'pbkdf2': 'user.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'user.hashers.TunedScryptPasswordHasher',
+}
+FAST_PARAMS = {
+    'pbkdf2': {'iterations': 1000},
+    'scrypt': {'work_factor': 2 ** 10, 'block_size': 8, 'parallelism': 1},
+}
+
+
+@override_settings(PASSWORD_HASHER_PROFILES=PROFILES, PASSWORD_HASHER_PARAMS=FAST_PARAMS)
+class HasherProfilesTest(APITestCase):
+    """
+    Testing hasher profiles and upgrading password hashes on login
+    """
+    def setUp(self):
+        self.url = reverse('token_obtain_pair')
+        self.user = MyUser.objects.create_user(email='test@test.com',
+                                               username='test_user',
+                                               name='Testname',
+                                               surname='Testsurname',
+                                               password='test_password')
+        self.user.is_active = True
+        self.user.save()
+
+    def login(self):
+        response = self.client.post(self.url, {'email': 'test@test.com', 'password': 'test_password'},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+
+    def test_tuned_parameters(self):
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+    def test_rehash_with_new_parameters_on_login(self):
+        with self.settings(PASSWORD_HASHER_PARAMS={**FAST_PARAMS, 'pbkdf2': {'iterations': 2000}}):
+            self.login()
+            self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+
+    def test_rehash_with_new_profile_on_login(self):
+        with self.settings(PASSWORD_HASHERS=[PROFILES['scrypt'], PROFILES['pbkdf2']]):
+            self.login()
+            self.assertEqual(identify_hasher(self.user.password).algorithm, 'scrypt')
+            self.assertTrue(self.user.password.startswith('scrypt$1024$'))
+            self.assertTrue(self.user.check_password('test_password'))
+
+    def test_no_rehash_when_up_to_date(self):
+        password = self.user.password
+        self.login()
+        self.assertEqual(self.user.password, password)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_hashers', duration=0.01, cores=4, stdout=out)
+        self.assertIn('iterations=1000', out.getvalue())
+        self.assertIn('work factor=1024', out.getvalue())
@@ -0,0 +1,77 @@
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ...hashing_pool import HashingPool, HashingPoolSaturated
+from ...models import MyUser
+
+
+@override_settings(PASSWORD_HASHER_PARAMS={'pbkdf2': {'iterations': 1000}})
+class HashingPoolTest(APITestCase):
+    """
+    Testing hashing of passwords in a pool of processes
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pool = HashingPool(workers=1, max_pending=2)
+
+    def setUp(self):
+        self.url = reverse('token_obtain_pair')
+        patcher = mock.patch('user.models.get_hashing_pool', return_value=self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = MyUser.objects.create_user(email='test@test.com',
+                                               username='test_user',
+                                               name='Testname',
+                                               surname='Testsurname',
+                                               password='test_password')
+        self.user.is_active = True
+        self.user.save()
+
+    def test_hashing_in_pool(self):
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(self.user.check_password('test_password'))
+        self.assertFalse(self.user.check_password('wrong_password'))
+        response = self.client.post(self.url, {'email': 'test@test.com', 'password': 'test_password'},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_rehash_on_login(self):
+        self.user.password = make_password('test_password', hasher='pbkdf2_sha1')
+        self.user.save()
+        self.assertTrue(self.user.check_password('test_password'))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+    def test_saturated(self):
+        """
+        Login and registration fail fast with 503 when the pool is full.
+        """
+        with mock.patch('user.models.get_hashing_pool', return_value=HashingPool(workers=1, max_pending=0)):
+            response = self.client.post(self.url, {'email': 'test@test.com', 'password': 'test_password'},
+                                        format='json')
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response['Retry-After'], '1')
+            response = self.client.post(reverse('api_user_creation'), {'email': 'new@test.com', 'name': 'Test',
+                                                                       'surname': 'Test', 'username': 'NewUser',
+                                                                       'password': 'Password'},
+                                        format='json')
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(MyUser.objects.filter(email='new@test.com').exists())
+
+    def test_slots_are_released(self):
+        pool = HashingPool(workers=1, max_pending=1)
+        for _ in range(3):
+            self.assertTrue(pool.check_password('test_password', self.user.password))
+        with mock.patch.object(pool, 'get_executor', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                pool.make_password('test_password')
+        self.assertTrue(pool.make_password('test_password').startswith('pbkdf2_sha256$'))
+
+    def test_saturated_exception(self):
+        pool = HashingPool(workers=1, max_pending=0)
+        with self.assertRaises(HashingPoolSaturated):
+            pool.make_password('test_password')
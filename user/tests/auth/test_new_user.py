@@ -1,7 +1,9 @@
 from rest_framework.test import APITestCase
 from django.urls import reverse
 from rest_framework import status
+from io import StringIO
 from django.core import mail
+from django.core.management import call_command
 from ...serializers import UserSerializer
 from django.contrib.auth import get_user_model
 from django.conf import settings
@@ -187,8 +189,10 @@ class CreateAndVerifyUsersWithEmailsTest(APITestCase):
                                     format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         user = get_user_model()
-        # the user was created and a verification email was sent
+        # the user was created and a verification email was queued, the worker sends it
         self.assertEqual(user.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+        call_command('send_queued_emails', stdout=StringIO())
         self.assertEqual(len(mail.outbox), 1)
         user_object = user.objects.get(name='Test')
 
@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from ...importing import UserImporter
+from ...models import MyUser, QueuedEmail
+
+
+@override_settings(PASSWORD_HASHER_PARAMS={'pbkdf2': {'iterations': 1000}})
+class BulkImportUsersTest(TestCase):
+    """
+    Testing the bulk_import_users command
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        MyUser.objects.create_user(email='taken@test.com', username='Taken', name='Test', surname='User',
+                                   password='Password')
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def import_users(self, path, **options):
+        out, err = StringIO(), StringIO()
+        call_command('bulk_import_users', path, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv(self):
+        path = self.write('users.csv', 'email,name,surname,username,password,bio\n'
+                                       'first@Test.COM,First,User,First,Password1,Hello\n'
+                                       'second@test.com,Second,User,Second,Password2,\n'
+                                       'third@test.com,Third,User,Third,password,\n'
+                                       'taken@test.com,Fourth,User,Fourth,Password4,\n')
+        out, err = self.import_users(path, workers=1, batch_size=2)
+        self.assertIn('Imported 2 users, rejected 2 rows', out)
+        self.assertIn("Line 4: {'password': ['Password must contain at least one uppercase letter']}", err)
+        self.assertIn("Line 5: {'email': ['my user with this email already exists.']}", err)
+        first = MyUser.objects.get(username='First')
+        self.assertEqual((first.email, first.bio, first.is_active), ('first@test.com', 'Hello', False))
+        self.assertTrue(first.check_password('Password1'))
+        self.assertEqual(QueuedEmail.objects.filter(kind=QueuedEmail.INITIAL_VERIFICATION).count(), 2)
+
+    def test_jsonl_in_parallel(self):
+        rows = [{'email': f'user{i}@test.com', 'name': 'Test', 'surname': 'User', 'username': f'User{i}',
+                 'password': f'Password{i}'} for i in range(7)]
+        rows.append(rows[0])
+        path = self.write('users.jsonl', '\n'.join(json.dumps(row) for row in rows) + '\nnot json\n')
+        out, err = self.import_users(path, workers=2, batch_size=3)
+        self.assertIn('Imported 7 users, rejected 2 rows', out)
+        self.assertIn("Line 8: {'email': ['my user with this email already exists.'], "
+                      "'username': ['my user with this username already exists.']}", err)
+        self.assertIn('Line 9', err)
+        self.assertTrue(MyUser.objects.get(username='User6').check_password('Password6'))
+        self.assertEqual(QueuedEmail.objects.count(), 7)
+
+    def test_queries_per_batch(self):
+        """
+        The number of queries depends on the number of batches, not users.
+        """
+        rows = [(i, {'email': f'user{i}@test.com', 'name': 'Test', 'surname': 'User', 'username': f'User{i}',
+                     'password': 'Password'}) for i in range(20)]
+        # uniqueness checks, savepoint, users, emails, savepoint release
+        with self.assertNumQueries(2 * 6):
+            UserImporter(batch_size=10, workers=1).import_rows(rows)
+        self.assertEqual(MyUser.objects.count(), 21)
+
+    def test_concurrent_signup(self):
+        """
+        A user created after the uniqueness checks only rejects the clashing row.
+        """
+        rows = [(i, {'email': f'user{i}@test.com', 'name': 'Test', 'surname': 'User', 'username': f'User{i}',
+                     'password': 'Password'}) for i in range(3)]
+        importer = UserImporter(batch_size=10, workers=1)
+        check_unique = importer.check_unique
+
+        def signup_after_check(batch):
+            unique = check_unique(batch)
+            MyUser.objects.create_user(email='other@test.com', username='User1', name='Test', surname='User',
+                                       password='Password')
+            return unique
+
+        with mock.patch.object(importer, 'check_unique', signup_after_check):
+            importer.import_rows(rows)
+        self.assertEqual(importer.created, 2)
+        self.assertEqual(importer.rejected, [(1, {'username': ['my user with this username already exists.']})])
+        self.assertEqual(set(MyUser.objects.values_list('username', flat=True)), {'Taken', 'User0', 'User1', 'User2'})
+        self.assertEqual(MyUser.objects.get(username='User1').email, 'other@test.com')
+        self.assertEqual(QueuedEmail.objects.count(), 2)
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            self.import_users(os.path.join(self.directory.name, 'missing.csv'))
@@ -0,0 +1,97 @@
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+from unittest import mock
+from django.core import mail
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ...emails.outbox import EmailOutbox
+from ...emails.verification.emails import InitialVerificationEmail
+from ...models import MyUser, QueuedEmail
+
+
+class EmailOutboxTest(APITestCase):
+    """
+    Testing the queue of verification emails and its worker
+    """
+    def setUp(self):
+        self.url_create = reverse('api_user_creation')
+        self.users = []
+        for i in range(3):
+            data = {'email': f'user{i}@test.com', 'name': 'Test', 'surname': 'User',
+                    'username': f'User{i}', 'password': 'Password'}
+            self.users.append(MyUser.objects.create_user(**data))
+            EmailOutbox.enqueue(QueuedEmail.INITIAL_VERIFICATION, self.users[-1])
+
+    def test_registration_does_not_send(self):
+        """
+        Registration succeeds even if SMTP is down - the email waits in the outbox.
+        """
+        with mock.patch.object(InitialVerificationEmail, 'send', side_effect=SMTPException('down')) as send:
+            response = self.client.post(self.url_create, {'email': 'new@test.com', 'name': 'Test', 'surname': 'Test',
+                                                          'username': 'NewUser', 'password': 'Password'},
+                                        format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        send.assert_not_called()
+        user = MyUser.objects.get(email='new@test.com')
+        self.assertEqual(QueuedEmail.objects.get(user=user).status, QueuedEmail.PENDING)
+
+    def test_batch_over_one_connection(self):
+        with mock.patch('user.emails.outbox.get_connection', wraps=mail.get_connection) as get_connection:
+            self.assertEqual(EmailOutbox().send_all(), (3, 0))
+        get_connection.assert_called_once()
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [user.email for user in self.users])
+        self.assertEqual(QueuedEmail.objects.filter(status=QueuedEmail.SENT, attempts=1).count(), 3)
+        # nothing is sent twice
+        self.assertEqual(EmailOutbox().send_all(), (0, 0))
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_batch_size(self):
+        self.assertEqual(EmailOutbox(batch_size=2).send_batch(), (2, 0))
+        self.assertEqual(QueuedEmail.objects.filter(status=QueuedEmail.PENDING).count(), 1)
+
+    def test_retry_with_backoff(self):
+        outbox = EmailOutbox(retry_backoff=60, max_attempts=2)
+        failing_email = self.users[0].email
+        original_send = InitialVerificationEmail.send
+
+        def send(email, connection=None):
+            if email.target.email == failing_email:
+                raise SMTPException('Mailbox unavailable')
+            original_send(email, connection=connection)
+
+        with mock.patch.object(InitialVerificationEmail, 'send', send):
+            self.assertEqual(outbox.send_all(), (2, 1))
+            queued = QueuedEmail.objects.get(user=self.users[0])
+            self.assertEqual((queued.status, queued.attempts), (QueuedEmail.PENDING, 1))
+            self.assertIn('Mailbox unavailable', queued.last_error)
+            self.assertGreater(queued.next_attempt_at, timezone.now() + timedelta(seconds=50))
+            # not due yet
+            self.assertEqual(outbox.send_all(), (0, 0))
+            QueuedEmail.objects.filter(pk=queued.pk).update(next_attempt_at=timezone.now())
+            self.assertEqual(outbox.send_all(), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (QueuedEmail.FAILED, 2))
+        self.assertGreater(queued.next_attempt_at, timezone.now() + timedelta(seconds=110))
+
+    def test_connection_failure(self):
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open', side_effect=OSError('refused')):
+            self.assertEqual(EmailOutbox().send_all(), (0, 3))
+        self.assertEqual(QueuedEmail.objects.filter(status=QueuedEmail.PENDING, attempts=1).count(), 3)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_claimed_emails_are_hidden(self):
+        """
+        Emails claimed by one worker aren't picked by another one until the lease expires.
+        """
+        self.assertEqual(len(EmailOutbox().claim()), 3)
+        self.assertEqual(EmailOutbox().claim(), [])
+
+    def test_command(self):
+        out = StringIO()
+        call_command('send_queued_emails', stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'Sent 3 emails, 0 failed')
+        self.assertEqual(len(mail.outbox), 3)
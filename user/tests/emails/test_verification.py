@@ -0,0 +1,71 @@
+from unittest import mock
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from ...models import MyUser
+from ...emails.verification.utils import EmailVerificationUtils, InitEmailVerificationTokenGenerator, \
+    initial_email_verification_token_generator
+
+
+class InitialVerificationTest(APITestCase):
+    def setUp(self) -> None:
+        self.url = reverse('api_initial_email_verification')
+        self.user = MyUser.objects.create_user(name="First", surname="User", username="User1",
+                                               password="Password", email="testemail@test.test")
+        self.data = {
+            'id': EmailVerificationUtils.encode_user(self.user),
+            'token': initial_email_verification_token_generator.make_token(self.user),
+        }
+
+    def test_activation_queries(self):
+        # select of the user, savepoint, the conditional update, the outstanding token, release
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_active)
+        self.assertEqual(OutstandingToken.objects.filter(user=self.user).count(), 1)
+
+    def test_repeated_click(self):
+        self.client.post(self.url, self.data, format='json')
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(OutstandingToken.objects.filter(user=self.user).count(), 1)
+
+    def test_concurrent_double_activation(self):
+        """
+        The second click is handled completely while the first one is between
+        checking the token and updating the user - only one of them activates
+        the account and gets tokens.
+        """
+        responses = []
+        check_token = InitEmailVerificationTokenGenerator.check_token
+
+        def check_token_and_click_again(generator, user, token):
+            valid = check_token(generator, user, token)
+            if not responses:
+                responses.append(None)
+                responses.append(self.client.post(self.url, self.data, format='json'))
+            return valid
+
+        with mock.patch.object(InitEmailVerificationTokenGenerator, 'check_token', check_token_and_click_again):
+            first = self.client.post(self.url, self.data, format='json')
+        second = responses[1]
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(OutstandingToken.objects.filter(user=self.user).count(), 1)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_active)
+
+    def test_activate_already_active_user(self):
+        MyUser.objects.filter(pk=self.user.pk).update(is_active=True)
+        self.assertEqual(EmailVerificationUtils.activate_user(self.user), {})
+        self.assertFalse(OutstandingToken.objects.exists())
+
+    def test_activated_user_can_use_tokens(self):
+        access = self.client.post(self.url, self.data, format='json').data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = self.client.get(reverse('api_user', args=[self.user.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,110 @@
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils.http import http_date
+from rest_framework import status
+from ..models import MyUser
+from ..cache import user_profile_cache
+
+
+@override_settings(USER_PROFILE_CACHE={'ENABLED': True, 'ALIAS': 'default', 'TIMEOUT': 60})
+class RetrieveUserCacheTest(APITestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        user1_data = {
+            "name": "First",
+            "surname": "User",
+            "username": "User1",
+            "password": "Password",
+            "email": "testemail@test.test"
+        }
+        user2_data = {
+            "name": "Second",
+            "surname": "User",
+            "username": "User2",
+            "password": "Password",
+            "email": "testemail2@test.test",
+            "bio": "That's me"
+        }
+        self.user1 = MyUser.objects.create_user(**user1_data)
+        self.user1.is_active = True
+        self.user1.save()
+        self.user2 = MyUser.objects.create_user(**user2_data)
+        self.user2.is_active = True
+        self.user2.save()
+        self.url = reverse('api_user', args=[self.user2.id])
+
+        token = self.client.post(reverse('token_obtain_pair'), {
+            "email": self.user1.email,
+            "password": "Password"
+        }).data.get("access")
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_cached_profile_without_queries(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second['Last-Modified'], first['Last-Modified'])
+
+    def test_if_none_match(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(response.content)
+        self.assertEqual(response['ETag'], etag)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_if_none_match_takes_precedence(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalidated_by_save(self):
+        etag = self.client.get(self.url)['ETag']
+        self.user2.bio = "Changed bio"
+        self.user2.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['bio'], "Changed bio")
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_invalidated_by_deactivation_and_delete(self):
+        self.client.get(self.url)
+        self.user2.is_active = False
+        self.user2.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+        self.user2.is_active = True
+        self.user2.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.user2.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['message'], 'This user does not exist.')
+
+    def test_invalidation_during_db_read(self):
+        _, generation = user_profile_cache.get(self.user2.id)
+        user_profile_cache.invalidate(self.user2.id)
+        user_profile_cache.set(self.user2.id, {'username': 'Stale'}, generation)
+        self.assertEqual(user_profile_cache.get(self.user2.id)[0], None)
+        self.assertEqual(self.client.get(self.url).data['username'], 'User2')
+
+    @override_settings(USER_PROFILE_CACHE={'ENABLED': False, 'ALIAS': 'default', 'TIMEOUT': 60})
+    def test_disabled(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        # conditional requests still work, the profile is only read from the db
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
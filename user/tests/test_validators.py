@@ -0,0 +1,51 @@
+from io import StringIO
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+from ..admin import UserCreationForm
+from .. import validators
+
+
+class ValidatorsTest(TestCase):
+    """
+    Testing the validators shared by UserSerializer, the admin and bulk imports
+    """
+    def test_name(self):
+        self.assertEqual(validators.validate_name('Anna Maria '), 'Anna Maria ')
+        for value in ('testing3', 'testing  testing', ''):
+            with self.assertRaisesMessage(ValidationError, 'Invalid format of the name'):
+                validators.validate_name(value)
+
+    def test_surname(self):
+        self.assertEqual(validators.validate_surname('Smith-Jones'), 'Smith-Jones')
+        with self.assertRaisesMessage(ValidationError, 'Invalid format of the surname'):
+            validators.validate_surname('test*')
+
+    def test_username(self):
+        self.assertEqual(validators.validate_username('user_one.2'), 'user_one.2')
+        for value in ('<script>', 'ai', 'a' * 31):
+            with self.assertRaisesMessage(ValidationError, 'Invalid format of the username'):
+                validators.validate_username(value)
+
+    def test_password(self):
+        self.assertEqual(validators.validate_password('Password'), 'Password')
+        self.assertEqual(validators.validate_password('passworD'), 'passworD')
+        with self.assertRaisesMessage(ValidationError, 'Password must be at least 8 characters long'):
+            validators.validate_password('Pass')
+        with self.assertRaisesMessage(ValidationError, 'Password must contain at least one uppercase letter'):
+            validators.validate_password('password')
+
+    def test_admin_form(self):
+        data = {'email': 'test@test.com', 'name': 'testing3', 'surname': 'Test', 'username': 'ai',
+                'password1': 'password', 'password2': 'password'}
+        form = UserCreationForm(data=data)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(set(form.errors), {'name', 'username', 'password1'})
+        form = UserCreationForm(data={**data, 'name': 'Test', 'username': 'UserOne',
+                                      'password1': 'Password', 'password2': 'Password'})
+        self.assertTrue(form.is_valid())
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_validators', number=10, repeat=1, stdout=out)
+        self.assertIn('long password', out.getvalue())
@@ -0,0 +1,32 @@
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from .blacklist import get_token_blacklist_filter
+
+
+class UserRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the claims ClaimsJWTAuthentication builds
+    request.user from. Access tokens copy them, also after refreshing.
+    With TOKEN_BLACKLIST_FILTER enabled, the blacklist is checked in
+    the db only for tokens the filter can't rule out.
+    """
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.username
+        token['is_active'] = user.is_active
+        return token
+
+    def check_blacklist(self):
+        blacklist_filter = get_token_blacklist_filter()
+        if blacklist_filter is not None and not blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            return
+        super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_filter = get_token_blacklist_filter()
+        if blacklist_filter is not None:
+            blacklist_filter.add(self.payload[api_settings.JTI_CLAIM], datetime_from_epoch(self.payload['exp']))
+        return result
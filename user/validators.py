@@ -0,0 +1,38 @@
+"""
+Validation rules of user data, shared by UserSerializer, the admin
+UserCreationForm and bulk imports. Patterns are compiled once, at import.
+"""
+import re
+from django.core.exceptions import ValidationError
+
+NAME_PATTERN = re.compile(r'^[A-Za-z]+ {1}[A-Za-z]+$|^[A-Za-z]+$')
+SURNAME_PATTERN = re.compile(r'^[A-Za-z]+[ -]{1}[A-Za-z]+$|^[A-Za-z]+$')
+USERNAME_PATTERN = re.compile(r'^[a-zA-Z0-9_.-]{3,30}$')
+PASSWORD_MIN_LENGTH = 8
+
+
+def validate_name(value):
+    if NAME_PATTERN.fullmatch(value.strip()) is None:
+        raise ValidationError("Invalid format of the name")
+    return value
+
+
+def validate_surname(value):
+    if SURNAME_PATTERN.fullmatch(value.strip()) is None:
+        raise ValidationError("Invalid format of the surname")
+    return value
+
+
+def validate_username(value):
+    if USERNAME_PATTERN.fullmatch(value) is None:
+        raise ValidationError("Invalid format of the username")
+    return value
+
+
+def validate_password(value):
+    if len(value) < PASSWORD_MIN_LENGTH:
+        raise ValidationError("Password must be at least 8 characters long")
+    # any() stops at the first uppercase letter
+    if not any(map(str.isupper, value)):
+        raise ValidationError("Password must contain at least one uppercase letter")
+    return value
@@ -1,10 +1,13 @@
-from .serializers import UserSerializer
+from .serializers import UserSerializer, UserTokenObtainPairSerializer, UserTokenRefreshSerializer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .emails.verification.utils import EmailVerificationUtils, initial_email_verification_token_generator
-from rest_framework_simplejwt.tokens import RefreshToken
+from .emails.verification.utils import EmailVerificationUtils, initial_email_verification_token_generator, \
+    VERIFICATION_FIELDS
+from .tokens import UserRefreshToken
+from .cache import user_profile_cache
 from rest_framework_simplejwt.tokens import TokenError, TokenBackendError
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework import viewsets
 from .custom_permissions import UserViewPermission
 from django.contrib.auth import get_user_model
@@ -27,16 +30,23 @@ class UserView(viewsets.ViewSet):
     def retrieve(self, request, pk=None):
         """
         Responds with user's data or 404 if the user doesn't exist/is inactive.
+        With USER_PROFILE_CACHE enabled profiles are cached and conditional
+        requests for a cached profile get 304 without touching the db.
         """
-        user_model = get_user_model()
-        try:
-            user = user_model.objects.get(pk=pk)
-        except user_model.DoesNotExist:
-            return Response({'message': 'This user does not exist.'}, status=status.HTTP_404_NOT_FOUND)
-        if not user.is_active:
-            return Response({'message': 'This user is not active.'}, status=status.HTTP_404_NOT_FOUND)
-        serializer = UserSerializer(user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        entry, generation = user_profile_cache.get(pk)
+        if entry is None:
+            user_model = get_user_model()
+            try:
+                user = user_model.objects.get(pk=pk)
+            except user_model.DoesNotExist:
+                return Response({'message': 'This user does not exist.'}, status=status.HTTP_404_NOT_FOUND)
+            if not user.is_active:
+                return Response({'message': 'This user is not active.'}, status=status.HTTP_404_NOT_FOUND)
+            serializer = UserSerializer(user)
+            entry = user_profile_cache.set(pk, serializer.data, generation)
+        if user_profile_cache.is_not_modified(request, entry):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=user_profile_cache.headers(entry))
+        return Response(entry['data'], status=status.HTTP_200_OK, headers=user_profile_cache.headers(entry))
 
 
 class InitialVerifyEmailView(APIView):
@@ -51,12 +61,13 @@ class InitialVerifyEmailView(APIView):
         except KeyError:
             return Response({}, status=status.HTTP_400_BAD_REQUEST)
         if pk and token:
-            user = EmailVerificationUtils.decode_user(pk)
-            if user is not None and initial_email_verification_token_generator.check_token(user, token):
-                user.is_active = True
-                user.save()
-                data = EmailVerificationUtils.obtain_tokens(user)
-                return Response(data, status=status.HTTP_200_OK)
+            user = EmailVerificationUtils.decode_user(pk, fields=VERIFICATION_FIELDS)
+            # tokens of active users are never valid, repeated clicks end here
+            if user is not None and not user.is_active and \
+                    initial_email_verification_token_generator.check_token(user, token):
+                data = EmailVerificationUtils.activate_user(user)
+                if data:
+                    return Response(data, status=status.HTTP_200_OK)
         return Response({}, status=status.HTTP_401_UNAUTHORIZED)
 
 
@@ -70,8 +81,23 @@ class TokenBlacklistView(APIView):
         except KeyError:
             return Response(status=status.HTTP_400_BAD_REQUEST)
         try:
-            refresh_token = RefreshToken(refresh)
+            refresh_token = UserRefreshToken(refresh)
         except (TokenError, TokenBackendError):
             return Response(status=status.HTTP_400_BAD_REQUEST)
         refresh_token.blacklist()
         return Response(status=status.HTTP_200_OK)
+
+
+class UserTokenObtainPairView(TokenObtainPairView):
+    """
+    Login. The tokens carry the user's username and status, so
+    authenticated requests don't need to load the user.
+    """
+    serializer_class = UserTokenObtainPairSerializer
+
+
+class UserTokenRefreshView(TokenRefreshView):
+    """
+    Refreshing tokens, with the blacklist checked through the filter
+    """
+    serializer_class = UserTokenRefreshSerializer